@@ -0,0 +1,255 @@
+import argparse
+import json
+import platform
+import sys
+import time
+import timeit
+from datetime import datetime, timedelta, timezone
+from typing import Any, Dict, List, Optional
+
+import runner.codec as codec
+from engine.game_board import GameBoard, GameState, NUM_COLS
+from runner.engine_container import Container, EngineContainer
+from runner.in_process import InProcessEngine, is_in_process
+from runner.run_one import run_one
+from runner.transport import STDIO, add_transport_args
+
+NULL_ENGINE = [sys.executable, "-m", "bench.null_engine"]
+IN_PROCESS_NULL_ENGINE = ["py:bench.null_engine:NullEngine"]
+
+
+def percentiles(samples_ns: List[int]) -> Dict[str, float]:
+    """Summary statistics in microseconds."""
+    ordered = sorted(samples_ns)
+
+    def at(fraction: float) -> float:
+        return ordered[min(int(fraction * len(ordered)), len(ordered) - 1)] / 1_000
+
+    return {
+        "min_us": ordered[0] / 1_000,
+        "p50_us": at(0.50),
+        "p90_us": at(0.90),
+        "p99_us": at(0.99),
+        "max_us": ordered[-1] / 1_000,
+        "mean_us": sum(ordered) / len(ordered) / 1_000,
+    }
+
+
+def quiet_column(board: GameBoard) -> Optional[int]:
+    """A free column whose move leaves the game ongoing, if there is one."""
+    for col in board.all_moves():
+        board.make_move(codec.Move(col))
+        ongoing = board.state() == GameState.ONGOING
+        board.unmake_move()
+        if ongoing:
+            return col
+    return None
+
+
+def start_engine(engine_args: List[str], transport: str = STDIO) -> Container:
+    if is_in_process(engine_args):
+        return InProcessEngine.from_args(engine_args)
+    return EngineContainer(engine_args, transport)
+
+
+def bench_round_trip(
+    engine_args: List[str], num_messages: int, transport: str = STDIO
+) -> Dict[str, Any]:
+    """Time MakeMove -> reply round trips through EngineContainer.
+
+    The moves sent are legal and never end the game, so any engine can be
+    driven. A fresh game starts whenever the current one is about to finish.
+    """
+    engine = start_engine(engine_args, transport)
+    params = codec.Params(
+        your_player=codec.Player.PLAYER_2,
+        time_per_move=timedelta(seconds=10),
+        moves=[],
+    )
+
+    samples: List[int] = []
+    try:
+        # Wait out interpreter startup before timing anything.
+        engine.send_game_params(params)
+        engine.send_move(codec.Move(0))
+        engine.read_message()
+
+        start = time.perf_counter_ns()
+        while len(samples) < num_messages:
+            engine.send_game_params(params)
+            board = GameBoard()
+
+            while len(samples) < num_messages:
+                column = quiet_column(board)
+                if column is None:
+                    break
+                move = codec.Move(column)
+                board.make_move(move)
+
+                sent = time.perf_counter_ns()
+                engine.send_move(move)
+                reply = engine.read_message()
+                samples.append(time.perf_counter_ns() - sent)
+
+                assert isinstance(reply, codec.Move)
+                assert reply.column in board.all_moves()
+                board.make_move(reply)
+                if board.state() != GameState.ONGOING:
+                    break
+        elapsed_ns = time.perf_counter_ns() - start
+    finally:
+        engine.close()
+
+    return {
+        "round_trips": len(samples),
+        # Each round trip is one message in each direction.
+        "messages_per_second": 2 * len(samples) / (elapsed_ns / 1e9),
+        "latency": percentiles(samples),
+    }
+
+
+def bench_codec(number: int) -> Dict[str, Any]:
+    """Time codec encode/decode in-process, with no I/O involved."""
+    move_msg = codec.MoveMsg.make(codec.Move(3))
+    move_bytes = move_msg.encode()
+    params_msg = codec.ParamsMsg.make(
+        codec.Params(
+            your_player=codec.Player.PLAYER_1,
+            time_per_move=timedelta(milliseconds=100),
+            moves=[codec.Move(c % NUM_COLS) for c in range(8)],
+        )
+    )
+    params_bytes = params_msg.encode()
+    decoder = codec.FrameDecoder()
+
+    cases = {
+        "encode_move": lambda: codec.MoveMsg.make(codec.Move(3)).encode(),
+        "decode_move": lambda: codec.decode(move_bytes),
+        "frame_decode_move": lambda: decoder.feed(move_bytes),
+        "encode_params": lambda: params_msg.encode(),
+        "decode_params": lambda: codec.decode(params_bytes),
+    }
+
+    return {
+        name: {"ns_per_op": timeit.timeit(fn, number=number) / number * 1e9}
+        for name, fn in cases.items()
+    }
+
+
+def bench_run_one(
+    engine_args: List[str], num_games: int, transport: str = STDIO
+) -> Dict[str, Any]:
+    """Time complete referee games between two null engines."""
+    player1 = start_engine(engine_args, transport)
+    player2 = start_engine(engine_args, transport)
+
+    samples: List[int] = []
+    try:
+        # The first game pays for interpreter startup; keep it out of the numbers.
+        run_one(player1, player2)
+
+        for _ in range(num_games):
+            start = time.perf_counter_ns()
+            run_one(player1, player2)
+            samples.append(time.perf_counter_ns() - start)
+    finally:
+        player1.close()
+        player2.close()
+
+    total_s = sum(samples) / 1e9
+    return {
+        "games": num_games,
+        "games_per_second": num_games / total_s,
+        "per_game": percentiles(samples),
+    }
+
+
+def compare(current: Dict[str, Any], baseline: Dict[str, Any], prefix: str = ""):
+    """Print every numeric result next to its baseline value."""
+    for key, value in current.items():
+        name = f"{prefix}{key}"
+        if isinstance(value, dict) and isinstance(baseline.get(key), dict):
+            compare(value, baseline[key], f"{name}.")
+        elif isinstance(value, (int, float)) and isinstance(
+            baseline.get(key), (int, float)
+        ):
+            old = baseline[key]
+            ratio = value / old if old else float("inf")
+            print(f"{name:45} {old:14.2f} -> {value:14.2f}  ({ratio:.2f}x)")
+
+
+def main(args: argparse.Namespace):
+    engine_args: List[str] = args.engine or NULL_ENGINE
+
+    results: Dict[str, Any] = {
+        "timestamp": datetime.now(timezone.utc).isoformat(),
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "engine": engine_args,
+        "transport": args.transport,
+        "round_trip": bench_round_trip(engine_args, args.messages, args.transport),
+        "codec": bench_codec(args.codec_ops),
+        "run_one": bench_run_one(engine_args, args.games, args.transport),
+        # The same games without pipes or codec, as a floor for the above.
+        "run_one_in_process": bench_run_one(IN_PROCESS_NULL_ENGINE, args.games),
+    }
+
+    with open(args.output, "w") as f:
+        json.dump(results, f, indent=2)
+
+    baseline: Optional[Dict[str, Any]] = None
+    if args.baseline:
+        with open(args.baseline) as f:
+            baseline = json.load(f)
+
+    if baseline is not None:
+        compare(results, baseline)
+    else:
+        print(json.dumps(results, indent=2))
+
+
+def parse_args() -> argparse.Namespace:
+    parser = argparse.ArgumentParser(
+        formatter_class=argparse.ArgumentDefaultsHelpFormatter
+    )
+
+    parser.add_argument(
+        "--engine",
+        "-e",
+        nargs="+",
+        help="Engine to drive instead of the built-in null engine. A single \
+                        py:module:Class argument runs it in-process",
+    )
+    parser.add_argument(
+        "--messages",
+        type=int,
+        default=5000,
+        help="Number of MakeMove round trips to time",
+    )
+    parser.add_argument(
+        "--games", type=int, default=200, help="Number of run_one games to time"
+    )
+    parser.add_argument(
+        "--codec-ops",
+        type=int,
+        default=100_000,
+        help="Iterations of each codec micro-benchmark",
+    )
+    parser.add_argument(
+        "--output",
+        "-o",
+        default="ipc_bench.json",
+        help="Where to write the results as JSON",
+    )
+    add_transport_args(parser)
+    parser.add_argument(
+        "--baseline",
+        "-b",
+        help="A previous --output file to print a comparison against",
+    )
+
+    return parser.parse_args()
+
+
+if __name__ == "__main__":
+    main(parse_args())
@@ -0,0 +1,39 @@
+import runner.codec as codec
+from engine.engine_main import engine_main
+from engine.engine_base import EngineBase
+from engine.game_board import NUM_COLS, NUM_ROWS
+
+
+class NullEngine(EngineBase):
+    """Answers instantly with the leftmost open column.
+
+    Only column heights are tracked, so the time the runner sees is almost
+    entirely pipe I/O, codec work, and process scheduling.
+    """
+
+    def __init__(self, params: codec.Params):
+        self._friendly = params.your_player
+        self._heights = [0] * NUM_COLS
+        for move in params.moves:
+            self._heights[move.column] += 1
+
+    def on_move(self, move: codec.Move):
+        self._heights[move.column] += 1
+
+    def get_move(self):
+        for c in range(NUM_COLS):
+            if self._heights[c] < NUM_ROWS:
+                return codec.Move(c)
+
+        raise RuntimeError("Board is full")
+
+    def get_friendly(self):
+        return self._friendly
+
+    @classmethod
+    def make(cls, params: codec.Params):
+        return cls(params)
+
+
+if __name__ == "__main__":
+    engine_main(NullEngine)
@@ -0,0 +1,305 @@
+import time
+from typing import Callable, List, Optional
+
+import runner.codec as codec
+from engine.engine_main import engine_main
+from engine.engine_base import EngineBase
+from engine.game_board import (
+    GameBoard,
+    GameState,
+    NUM_CELLS,
+    NUM_COLS,
+    NUM_ROWS,
+    cell_bit,
+)
+from engine.transposition_table import Bound, NO_MOVE, TranspositionTable
+
+# Wins score above any heuristic value and prefer faster wins. Scores depend
+# only on the position (not on the search root), so they are safe to store in
+# the transposition table.
+WIN_SCORE = 10_000
+INFINITY = 2 * WIN_SCORE
+
+CENTER_FIRST = sorted(range(NUM_COLS), key=lambda c: abs(NUM_COLS // 2 - c))
+MOVES = [codec.Move(c) for c in range(NUM_COLS)]
+
+# How often (in nodes) the search looks at the clock.
+CLOCK_CHECK_INTERVAL = 256
+
+
+def win_score(num_moves: int) -> int:
+    """Score for the player who just won with their `num_moves`-th piece."""
+    return WIN_SCORE + NUM_CELLS - num_moves
+
+
+def _cell_weights() -> List[List[int]]:
+    """Number of four-in-a-row lines through each cell, indexed [row][col]."""
+    weights = [[0] * NUM_COLS for _ in range(NUM_ROWS)]
+    for row in range(NUM_ROWS):
+        for col in range(NUM_COLS):
+            for d_row, d_col in ((0, 1), (1, 0), (1, 1), (1, -1)):
+                end_row, end_col = row + 3 * d_row, col + 3 * d_col
+                if 0 <= end_row < NUM_ROWS and 0 <= end_col < NUM_COLS:
+                    for i in range(4):
+                        weights[row + i * d_row][col + i * d_col] += 1
+    return weights
+
+
+def _weight_masks() -> List[tuple[int, int]]:
+    masks: dict[int, int] = {}
+    for row, weight_row in enumerate(_cell_weights()):
+        for col, weight in enumerate(weight_row):
+            masks[weight] = masks.get(weight, 0) | cell_bit(row, col)
+    return sorted(masks.items())
+
+
+WEIGHT_MASKS = _weight_masks()
+
+
+def evaluate(board: GameBoard) -> int:
+    """Static score of a non-terminal position from the side to move's view."""
+    friendly = board.bitboard(board.side_to_move())
+    enemy = board.occupied() ^ friendly
+
+    score = 0
+    for weight, mask in WEIGHT_MASKS:
+        score += weight * ((friendly & mask).bit_count() - (enemy & mask).bit_count())
+    return score
+
+
+class SearchTimeout(Exception):
+    pass
+
+
+class AlphaBetaEngine(EngineBase):
+    """Iterative-deepening negamax with alpha-beta pruning.
+
+    Each call to get_move searches one ply deeper at a time until the deadline
+    derived from time_per_move, and plays the best move of the deepest
+    iteration that finished.
+    """
+
+    _tt: Optional[TranspositionTable] = None
+
+    def __init__(self, params: codec.Params):
+        self._board = GameBoard()
+        for move in params.moves:
+            self._board.make_move(move)
+
+        self._friendly = params.your_player
+        self._time_per_move = params.time_per_move
+        self._deadline = 0.0
+        self._should_stop: Optional[Callable[[], bool]] = None
+        self._nodes = 0
+        self.completed_depth = 0
+
+        # (position_key, completed depth, best move) left by the last ponder.
+        self._pondered: Optional[tuple[int, int, int]] = None
+        self.predicted_move: Optional[codec.Move] = None
+
+    @classmethod
+    def transposition_table(cls) -> TranspositionTable:
+        # Shared across games: scores and moves depend only on the position.
+        if cls._tt is None:
+            cls._tt = TranspositionTable()
+        return cls._tt
+
+    def on_move(self, move: codec.Move):
+        assert self._board.state() == GameState.ONGOING
+        self._board.make_move(move)
+
+    def get_friendly(self):
+        return self._friendly
+
+    @classmethod
+    def make(cls, params: codec.Params):
+        cls.transposition_table()
+        return cls(params)
+
+    def get_move(self):
+        assert self._board.state() == GameState.ONGOING
+
+        book_move = self.book_move(self._board)
+        if book_move is not None:
+            return book_move
+
+        budget = self.move_budget(self._time_per_move)
+        self._deadline = time.perf_counter() + budget
+
+        # If we pondered this very position, pick up where that search left off.
+        start_depth, best_move = 1, NO_MOVE
+        if (
+            self._pondered is not None
+            and self._pondered[0] == self._board.position_key()
+        ):
+            _, pondered_depth, best_move = self._pondered
+            start_depth = pondered_depth + 1
+        self._pondered = None
+
+        return MOVES[self.search(start_depth=start_depth, best_move=best_move)]
+
+    def ponder(self, should_stop: Callable[[], bool]):
+        """Search the position after the opponent's most likely reply."""
+        board = self._board
+        if board.state() != GameState.ONGOING:
+            return
+
+        entry = self.transposition_table().probe(board.zobrist_hash())
+        predicted = entry.move if entry is not None else NO_MOVE
+        if predicted == NO_MOVE or board.column_space(predicted) == 0:
+            predicted = next(c for c in CENTER_FIRST if board.column_space(c) > 0)
+
+        self.predicted_move = MOVES[predicted]
+        board.make_move(MOVES[predicted])
+        try:
+            if board.state() != GameState.ONGOING:
+                return
+
+            self._deadline = float("inf")
+            self._should_stop = should_stop
+            best_move = self.search()
+            if self.completed_depth > 0:
+                self._pondered = (
+                    board.position_key(),
+                    self.completed_depth,
+                    best_move,
+                )
+        finally:
+            self._should_stop = None
+            board.unmake_move()
+
+    def _out_of_time(self) -> bool:
+        if time.perf_counter() > self._deadline:
+            return True
+        return self._should_stop is not None and self._should_stop()
+
+    def search(
+        self,
+        max_depth: int = NUM_CELLS,
+        start_depth: int = 1,
+        best_move: int = NO_MOVE,
+    ) -> int:
+        """Run iterative deepening until the deadline and return a column.
+
+        `start_depth` and `best_move` resume from an earlier search of the
+        same position whose deeper results are still in the table.
+        """
+        board = self._board
+        tt = self.transposition_table()
+        tt.new_search()
+
+        if best_move == NO_MOVE or board.column_space(best_move) == 0:
+            best_move = next(c for c in CENTER_FIRST if board.column_space(c) > 0)
+            start_depth = 1
+        self.completed_depth = start_depth - 1
+        self._nodes = 0
+
+        max_depth = min(max_depth, NUM_CELLS - board.num_moves())
+        for depth in range(start_depth, max_depth + 1):
+            try:
+                score, move = self._search_root(depth, best_move)
+            except SearchTimeout:
+                break
+
+            best_move = move
+            self.completed_depth = depth
+
+            if abs(score) >= WIN_SCORE:
+                break
+
+        return best_move
+
+    def _ordered_moves(self, first: int) -> List[int]:
+        board = self._board
+        moves = [c for c in CENTER_FIRST if board.column_space(c) > 0]
+        if first != NO_MOVE and first in moves:
+            moves.remove(first)
+            moves.insert(0, first)
+        return moves
+
+    def _search_root(self, depth: int, first: int) -> tuple[int, int]:
+        board = self._board
+        alpha, beta = -INFINITY, INFINITY
+        best_move = first
+
+        for col in self._ordered_moves(first):
+            score = self._child_score(col, depth, -beta, -alpha)
+            if score > alpha:
+                alpha, best_move = score, col
+
+        self.transposition_table().store(
+            board.zobrist_hash(), depth, alpha, Bound.EXACT, best_move
+        )
+        return alpha, best_move
+
+    def _child_score(self, col: int, depth: int, alpha: int, beta: int) -> int:
+        """Play `col`, score it for the mover, and take it back.
+
+        `alpha` and `beta` are the child's window, i.e. already negated.
+        """
+        board = self._board
+        board.make_move(MOVES[col])
+        state = board.state()
+
+        if state == GameState.ONGOING:
+            try:
+                score = -self._negamax(depth - 1, alpha, beta)
+            finally:
+                board.unmake_move()
+            return score
+
+        score = 0 if state == GameState.DRAW else win_score(board.num_moves())
+        board.unmake_move()
+        return score
+
+    def _negamax(self, depth: int, alpha: int, beta: int) -> int:
+        self._nodes += 1
+        if self._nodes % CLOCK_CHECK_INTERVAL == 0 and self._out_of_time():
+            raise SearchTimeout()
+
+        if depth == 0:
+            return evaluate(self._board)
+
+        tt = self.transposition_table()
+        key = self._board.zobrist_hash()
+        original_alpha = alpha
+        first = NO_MOVE
+
+        entry = tt.probe(key)
+        if entry is not None:
+            first = entry.move
+            if entry.depth >= depth:
+                if entry.bound == Bound.EXACT:
+                    return entry.score
+                elif entry.bound == Bound.LOWER:
+                    alpha = max(alpha, entry.score)
+                else:
+                    beta = min(beta, entry.score)
+
+                if alpha >= beta:
+                    return entry.score
+
+        best_score, best_move = -INFINITY, NO_MOVE
+        for col in self._ordered_moves(first):
+            score = self._child_score(col, depth, -beta, -alpha)
+
+            if score > best_score:
+                best_score, best_move = score, col
+            if score > alpha:
+                alpha = score
+            if alpha >= beta:
+                break
+
+        if best_score <= original_alpha:
+            bound = Bound.UPPER
+        elif best_score >= beta:
+            bound = Bound.LOWER
+        else:
+            bound = Bound.EXACT
+        tt.store(key, depth, best_score, bound, best_move)
+
+        return best_score
+
+
+if __name__ == "__main__":
+    engine_main(AlphaBetaEngine)
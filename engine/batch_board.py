@@ -0,0 +1,242 @@
+from array import array
+from typing import Iterable, List, Optional, Sequence, Tuple
+
+from engine.game_board import (
+    BOARD_MASK,
+    BOTTOM_MASK,
+    COLUMN_HEIGHT,
+    GameBoard,
+    GameState,
+    NUM_COLS,
+    NUM_ROWS,
+    Player,
+    WIN_SHIFTS,
+)
+
+# Many GameBoard-layout bitboards packed side by side into one Python int,
+# LANE_BITS per board. Every operation on the packed int is a single bignum
+# operation in C that acts on all boards at once, standing in for NumPy
+# vector ops without adding a dependency.
+#
+# The board uses the low 49 bits of each lane and the sentinel bits are
+# always empty, so right shifts by up to 2 * max(WIN_SHIFTS) never carry a
+# set bit from one lane into a position that is ANDed with a set bit of the
+# lane below, and the carry of `mask + bottom` never leaves its column.
+LANE_BITS = 64
+LANE_BYTES = LANE_BITS // 8
+LANE_ONES = (1 << LANE_BITS) - 1
+
+TOP_ROW_MASK = BOTTOM_MASK << (NUM_ROWS - 1)
+
+# Value for apply_moves meaning "leave this board alone".
+NO_MOVE = -1
+# The same for apply_column_bytes, which takes one byte per board.
+NO_MOVE_BYTE = 0xFF
+
+
+def _lane_bytes(value: int) -> bytes:
+    return value.to_bytes(LANE_BYTES, "little")
+
+
+_BOTTOM_BYTES = {c: _lane_bytes(1 << (c * COLUMN_HEIGHT)) for c in range(NUM_COLS)}
+_BOTTOM_BYTES[NO_MOVE] = _lane_bytes(0)
+_MOVED_BYTES = {c: _lane_bytes(LANE_ONES) for c in range(NUM_COLS)}
+_MOVED_BYTES[NO_MOVE] = _lane_bytes(0)
+# Lane values for apply_column_bytes, looked up with map() so that building a
+# whole batch's operands runs no bytecode per board.
+_BOTTOM_LANES = {c: 1 << (c * COLUMN_HEIGHT) for c in range(NUM_COLS)}
+_BOTTOM_LANES[NO_MOVE_BYTE] = 0
+_MOVED_LANES = {c: LANE_ONES for c in range(NUM_COLS)}
+_MOVED_LANES[NO_MOVE_BYTE] = 0
+
+
+class BatchBoard:
+    """N Connect 4 boards advanced in lockstep.
+
+    apply_moves plays one column (or NO_MOVE) on every board, and states()
+    and legal_move_masks() report on all boards, each in a fixed number of
+    bignum operations. Results agree exactly with GameBoard: a finished
+    board keeps the winner as the side to move, and playing on it, or into
+    a full column, is an error.
+    """
+
+    def __init__(self, num_boards: int):
+        self._n = num_boards
+        self._lanes_one = self._replicate(1)
+        self._board_rep = self._replicate(BOARD_MASK)
+        self._top_row_rep = self._replicate(TOP_ROW_MASK)
+        self._column_bit_reps = [self._replicate(1 << c) for c in range(NUM_COLS)]
+
+        self._p1 = 0
+        self._p2 = 0
+        # All-ones lanes where player 1 is to move.
+        self._p1_to_move = self._replicate(LANE_ONES)
+        # _flags() of the current pieces, once computed.
+        self._cached_flags: Optional[Tuple[int, int, int]] = None
+
+    @classmethod
+    def from_move_lists(cls, games: Sequence[Sequence[int]]) -> "BatchBoard":
+        """Boards reached by playing each list of columns from the start."""
+        batch = cls(len(games))
+        for ply in range(max((len(g) for g in games), default=0)):
+            batch.apply_moves([g[ply] if ply < len(g) else NO_MOVE for g in games])
+        return batch
+
+    @classmethod
+    def from_board(cls, board: GameBoard, num_boards: int) -> "BatchBoard":
+        """`num_boards` copies of `board`'s position."""
+        batch = cls(num_boards)
+        batch._p1 = batch._replicate(board.bitboard(Player.PLAYER_1))
+        batch._p2 = batch._replicate(board.bitboard(Player.PLAYER_2))
+        batch._cached_flags = None
+        if board.side_to_move() == Player.PLAYER_2:
+            batch._p1_to_move = 0
+        return batch
+
+    def __len__(self) -> int:
+        return self._n
+
+    def _replicate(self, lane: int) -> int:
+        return int.from_bytes(_lane_bytes(lane) * self._n, "little")
+
+    def _pack(self, lanes: Iterable[int]) -> int:
+        return int.from_bytes(array("Q", lanes).tobytes(), "little")
+
+    def _unpack(self, packed: int) -> array:
+        lanes = array("Q")
+        lanes.frombytes(packed.to_bytes(self._n * LANE_BYTES, "little"))
+        return lanes
+
+    def _low_bytes(self, packed: int) -> bytes:
+        """The low byte of every lane, one byte per board."""
+        return packed.to_bytes(self._n * LANE_BYTES, "little")[::LANE_BYTES]
+
+    def _any_in_lane(self, packed: int) -> int:
+        """Bit 0 of each lane set iff any bit of that lane is set."""
+        # Each step ORs in bits from higher up the same lane; bits leaking in
+        # from the next lane only reach positions that are masked off below.
+        shift = LANE_BITS // 2
+        while shift:
+            packed |= packed >> shift
+            shift //= 2
+        return packed & self._lanes_one
+
+    def _spread(self, flags: int) -> int:
+        """Turn bit-0 lane flags into all-ones lanes."""
+        return flags * LANE_ONES
+
+    def _wins(self, bitboards: int) -> int:
+        fours = 0
+        for shift in WIN_SHIFTS:
+            pairs = bitboards & (bitboards >> shift)
+            fours |= pairs & (pairs >> (2 * shift))
+        return self._any_in_lane(fours)
+
+    def _flags(self) -> Tuple[int, int, int]:
+        """Bit-0 lane flags for (player 1 won, player 2 won, board full)."""
+        if self._cached_flags is None:
+            empty = (self._p1 | self._p2) ^ self._board_rep
+            full = self._any_in_lane(empty) ^ self._lanes_one
+            self._cached_flags = self._wins(self._p1), self._wins(self._p2), full
+        return self._cached_flags
+
+    def apply_moves(self, columns: Sequence[int]):
+        """Play columns[i] on board i for every i; NO_MOVE skips a board."""
+        assert len(columns) == self._n
+
+        try:
+            bottom = int.from_bytes(
+                b"".join([_BOTTOM_BYTES[c] for c in columns]), "little"
+            )
+            moved = int.from_bytes(
+                b"".join([_MOVED_BYTES[c] for c in columns]), "little"
+            )
+        except KeyError as e:
+            raise ValueError(f"Column out of range: {e.args[0]}") from None
+
+        self._apply(bottom, moved)
+
+    def apply_column_bytes(self, columns: bytes):
+        """apply_moves with one byte per board and NO_MOVE_BYTE to skip.
+
+        Faster for large batches, since no Python code runs per board.
+        """
+        assert len(columns) == self._n
+
+        try:
+            bottom = self._pack(map(_BOTTOM_LANES.__getitem__, columns))
+            moved = self._pack(map(_MOVED_LANES.__getitem__, columns))
+        except KeyError as e:
+            raise ValueError(f"Column out of range: {e.args[0]}") from None
+
+        self._apply(bottom, moved)
+
+    def _apply(self, bottom: int, moved: int):
+        p1_won, p2_won, full = self._flags()
+        finished = self._spread(p1_won | p2_won | full)
+
+        mask = self._p1 | self._p2
+        placed = (mask + bottom) & ~mask
+
+        illegal = (placed & ~self._board_rep) | (moved & finished)
+        if illegal:
+            bad = [i for i, lane in enumerate(self._unpack(illegal)) if lane]
+            raise ValueError(f"Illegal move on boards {bad}")
+
+        p1_placed = placed & self._p1_to_move
+        self._p1 |= p1_placed
+        self._p2 |= placed ^ p1_placed
+        self._cached_flags = None
+
+        # Like GameBoard, only flip the side to move if the game goes on.
+        p1_won, p2_won, full = self._flags()
+        ongoing = self._spread((p1_won | p2_won | full) ^ self._lanes_one)
+        self._p1_to_move ^= moved & ongoing
+
+    def states(self) -> bytes:
+        """GameState value of every board, one byte per board."""
+        p1_won, p2_won, full = self._flags()
+        draw = full & ~(p1_won | p2_won)
+
+        codes = (
+            GameState.ONGOING.value * self._lanes_one
+            - (GameState.ONGOING.value - GameState.PLAYER_1_WIN.value) * p1_won
+            - (GameState.ONGOING.value - GameState.PLAYER_2_WIN.value) * p2_won
+            - (GameState.ONGOING.value - GameState.DRAW.value) * draw
+        )
+        return self._low_bytes(codes)
+
+    def state(self, index: int) -> GameState:
+        return GameState(self.states()[index])
+
+    def legal_move_masks(self) -> bytes:
+        """Bit c of byte i is set iff column c is playable on board i."""
+        p1_won, p2_won, full = self._flags()
+        ongoing = self._spread((p1_won | p2_won | full) ^ self._lanes_one)
+        open_tops = ~(self._p1 | self._p2) & self._top_row_rep & ongoing
+
+        legal = 0
+        for col in range(NUM_COLS):
+            top_bit = col * COLUMN_HEIGHT + NUM_ROWS - 1
+            legal |= (open_tops >> (top_bit - col)) & self._column_bit_reps[col]
+        return self._low_bytes(legal)
+
+    def side_to_move(self, index: int) -> Player:
+        p1_to_move = self._low_bytes(self._p1_to_move & self._lanes_one)[index]
+        return Player.PLAYER_1 if p1_to_move else Player.PLAYER_2
+
+    def bitboards(self) -> Tuple[array, array]:
+        """Per-board (player 1, player 2) bitboards in GameBoard's layout."""
+        return self._unpack(self._p1), self._unpack(self._p2)
+
+    def grid(self, index: int) -> List[List[int]]:
+        """Board `index` as rows of 0 (empty), 1 or 2, top row first."""
+        p1, p2 = (int(b[index]) for b in self.bitboards())
+        rows: List[List[int]] = []
+        for row in reversed(range(NUM_ROWS)):
+            cells: List[int] = []
+            for col in range(NUM_COLS):
+                bit = 1 << (col * COLUMN_HEIGHT + row)
+                cells.append(1 if p1 & bit else 2 if p2 & bit else 0)
+            rows.append(cells)
+        return rows
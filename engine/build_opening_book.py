@@ -0,0 +1,82 @@
+import argparse
+from datetime import timedelta
+from typing import Iterator, List, Tuple
+
+import runner.codec as codec
+from engine.alpha_beta_engine import AlphaBetaEngine
+from engine.game_board import GameBoard, GameState
+from engine.opening_book import canonical_key, write_book
+
+
+def opening_positions(max_plies: int) -> Iterator[List[codec.Move]]:
+    """Move lists reaching every ongoing position with fewer than
+    `max_plies` pieces, one per mirror-image pair."""
+    seen: set[int] = set()
+    board = GameBoard()
+
+    def walk() -> Iterator[List[codec.Move]]:
+        key, _ = canonical_key(board)
+        if key in seen:
+            return
+        seen.add(key)
+        yield [codec.Move(c) for c in board.history()]
+
+        if board.num_moves() + 1 >= max_plies:
+            return
+        for col in board.all_moves():
+            board.make_move(codec.Move(col))
+            if board.state() == GameState.ONGOING:
+                yield from walk()
+            board.unmake_move()
+
+    yield from walk()
+
+
+def best_moves(
+    max_plies: int, think_time: timedelta
+) -> Iterator[Tuple[GameBoard, codec.Move]]:
+    for moves in opening_positions(max_plies):
+        board = GameBoard()
+        for move in moves:
+            board.make_move(move)
+
+        engine = AlphaBetaEngine.make(
+            codec.Params(
+                your_player=board.side_to_move(),
+                time_per_move=think_time,
+                moves=moves,
+            )
+        )
+        yield board, engine.get_move()
+
+
+def main(args: argparse.Namespace):
+    entries = list(best_moves(args.plies, timedelta(milliseconds=args.think_ms)))
+    write_book(args.output, entries)
+    print(f"Wrote {len(entries)} positions to {args.output}")
+
+
+def parse_args() -> argparse.Namespace:
+    parser = argparse.ArgumentParser(
+        formatter_class=argparse.ArgumentDefaultsHelpFormatter
+    )
+
+    parser.add_argument("output", help="Path of the book file to write")
+    parser.add_argument(
+        "--plies",
+        type=int,
+        default=4,
+        help="Book every position with fewer than this many pieces",
+    )
+    parser.add_argument(
+        "--think-ms",
+        type=int,
+        default=1000,
+        help="Search time given to each book position",
+    )
+
+    return parser.parse_args()
+
+
+if __name__ == "__main__":
+    main(parse_args())
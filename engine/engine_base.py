@@ -1,9 +1,25 @@
-from typing import Self
+import time
+from datetime import timedelta
+from typing import Callable, ClassVar, Optional, Self
 from abc import ABC, abstractmethod
 import runner.codec as codec
+from engine.game_board import GameBoard
+from engine.opening_book import OpeningBook
+
+# Fraction of time_per_move we allow ourselves, and the fixed slack we keep on
+# top of that for pipe latency and interpreter hiccups.
+TIME_USAGE = 0.9
+SAFETY_MARGIN = timedelta(milliseconds=15)
 
 
 class EngineBase(ABC):
+    # Set by engine_main from --book; shared by every game the process plays.
+    opening_book: ClassVar[Optional[OpeningBook]] = None
+
+    # Set by engine_main, whose process was started for the game it is about
+    # to play. Engines running inside the runner have no startup to pay for.
+    cold_process: ClassVar[bool] = False
+
     @abstractmethod
     def on_move(self, move: codec.Move) -> None: ...
 
@@ -16,3 +32,33 @@ class EngineBase(ABC):
     @classmethod
     @abstractmethod
     def make(cls, params: codec.Params) -> Self: ...
+
+    def book_move(self, board: GameBoard) -> Optional[codec.Move]:
+        """The opening book's move for `board`, if there is a book and it has one.
+
+        Engines call this from get_move before searching.
+        """
+        if self.opening_book is None:
+            return None
+        return self.opening_book.lookup(board)
+
+    def move_budget(self, time_per_move: timedelta) -> float:
+        """Seconds a search may take for a move with `time_per_move` to play it."""
+        budget = (time_per_move * TIME_USAGE - SAFETY_MARGIN).total_seconds()
+
+        if EngineBase.cold_process:
+            # The runner's clock for our first move started before the
+            # interpreter did. CPU time so far is a portable estimate of that
+            # startup; double it since the opponent is usually starting up on
+            # the same cores at the same time.
+            EngineBase.cold_process = False
+            budget -= 2 * time.process_time()
+
+        return max(budget, 0.001)
+
+    def ponder(self, should_stop: Callable[[], bool]) -> None:
+        """Think on the opponent's time until `should_stop()` returns True.
+
+        Called by engine_main --ponder after each of our moves. Work done here
+        should be kept for the get_move that follows; the default does nothing.
+        """
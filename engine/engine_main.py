@@ -1,38 +1,121 @@
-from typing import Optional
+import argparse
+import queue
+import threading
+from typing import Dict, Iterator, Optional
 import runner.codec as codec
 from engine.engine_base import EngineBase
+from engine.opening_book import OpeningBook
+from runner.transport import Transport, engine_transport
 import sys
 
 
-def push_move(engine: EngineBase):
+def push_move(
+    engine: EngineBase,
+    transport: Transport,
+    send_buffer: codec.SendBuffer,
+    game_id: Optional[int] = None,
+):
     move = engine.get_move()
     engine.on_move(move)
-    sys.stdout.buffer.write(codec.MoveMsg.make(move).encode())
-    sys.stdout.flush()
+    transport.send(send_buffer.encode(codec.MoveMsg.make(move, game_id)))
+
+
+def read_frames(transport: Transport) -> Iterator[codec.Frame]:
+    """Messages from the runner, blocking until each one arrives."""
+    decoder = codec.FrameDecoder()
+
+    while chunk := transport.recv():
+        yield from decoder.feed_frames(chunk)
+
+
+class MessageReader:
+    """Reads the runner's messages on a background thread so the main
+    thread can ponder.
+
+    The thread spends its time blocked in a read or select, which releases
+    the GIL, so it costs the pondering search nothing until a message arrives.
+    """
+
+    # Seconds a thread may hold the GIL before yielding. Well under the
+    # default 5ms so a message arriving mid-ponder is noticed promptly.
+    SWITCH_INTERVAL = 0.0005
+
+    def __init__(self, transport: Transport):
+        sys.setswitchinterval(self.SWITCH_INTERVAL)
+
+        # None marks the end of the stream.
+        self._inbox: queue.Queue[Optional[codec.Frame]] = queue.Queue()
+        self._thread = threading.Thread(
+            target=self._run, args=(transport,), daemon=True
+        )
+        self._thread.start()
+
+    def _run(self, transport: Transport):
+        for frame in read_frames(transport):
+            self._inbox.put(frame)
+
+        self._inbox.put(None)
+
+    def has_message(self) -> bool:
+        return not self._inbox.empty()
+
+    def __iter__(self) -> Iterator[codec.Frame]:
+        while (frame := self._inbox.get()) is not None:
+            yield frame
+
+
+def parse_engine_args() -> argparse.Namespace:
+    parser = argparse.ArgumentParser()
+
+    parser.add_argument(
+        "--book",
+        help="Opening book to consult before searching (see build_opening_book)",
+    )
+    parser.add_argument(
+        "--ponder",
+        action="store_true",
+        help="Keep thinking while waiting for the opponent's move",
+    )
+
+    args, _ = parser.parse_known_args()
+    return args
 
 
 def engine_main(engine_cls: type[EngineBase]):
-    engine: Optional[engine_cls] = None
-
-    while True:
-        hdr_bytes = sys.stdin.buffer.read(codec.Header.LENGTH)
-
-        if len(hdr_bytes) == 0:
-            return
-        else:
-            assert len(hdr_bytes) == codec.Header.LENGTH
-
-        hdr = codec.Header.decode(hdr_bytes)
-
-        remaining_data = sys.stdin.buffer.read(hdr.remaining_message_length())
-
-        match hdr.msg_type:
-            case codec.MessageType.MAKE_MOVE:
-                assert engine
-                engine.on_move(codec.MoveMsg.decode(hdr, remaining_data).move)
-                push_move(engine)
-            case codec.MessageType.GAME_START:
-                params = codec.ParamsMsg.decode(hdr, remaining_data).params
-                engine = engine_cls.make(params)
-                if params.your_player == codec.Player.PLAYER_1:
-                    push_move(engine)
+    args = parse_engine_args()
+    # This process was started to play, so its first move pays for startup.
+    EngineBase.cold_process = True
+    if args.book:
+        engine_cls.opening_book = OpeningBook(args.book)
+
+    # stdin and stdout unless the runner chose another transport.
+    transport = engine_transport()
+    send_buffer = codec.SendBuffer()
+    reader = MessageReader(transport) if args.ponder else None
+    messages = reader if reader is not None else read_frames(transport)
+
+    # One engine per game, keyed by the game id of its messages. Version 1
+    # messages have none and all belong to the single game under None.
+    engines: Dict[Optional[int], EngineBase] = {}
+    # The game last played in, which is the one to ponder.
+    engine: Optional[EngineBase] = None
+
+    for game_id, message in messages:
+        match message:
+            case codec.Move():
+                engine = engines[game_id]
+                engine.on_move(message)
+                push_move(engine, transport, send_buffer, game_id)
+            case codec.Params():
+                # A new game under an id in use replaces the old one, so the
+                # table stays as large as the runner's number of game slots.
+                engine = engine_cls.make(message)
+                engines[game_id] = engine
+                # Player 1 moves first, so is to move after an even number.
+                player_1_to_move = len(message.moves) % 2 == 0
+                if (message.your_player == codec.Player.PLAYER_1) == player_1_to_move:
+                    push_move(engine, transport, send_buffer, game_id)
+
+        # Either way it is now the opponent's turn.
+        if reader is not None and engine is not None:
+            engine.ponder(reader.has_message)
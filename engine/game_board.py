@@ -1,7 +1,8 @@
 from runner.codec import Move, Player
 from dataclasses import dataclass
 from enum import Enum
-from typing import List, Optional, Tuple
+from random import Random
+from typing import Dict, List, Optional, Protocol
 
 
 class GameState(Enum):
@@ -13,6 +14,33 @@ class GameState(Enum):
 
 NUM_COLS = 7
 NUM_ROWS = 6
+NUM_CELLS = NUM_COLS * NUM_ROWS
+
+# Bitboard layout: each column owns COLUMN_HEIGHT consecutive bits, bottom row
+# first, with one always-empty sentinel bit on top so that shifts used for win
+# detection never wrap from one column into the next.
+#
+#   6 13 20 27 34 41 48
+#   5 12 19 26 33 40 47
+#   4 11 18 25 32 39 46
+#   3 10 17 24 31 38 45
+#   2  9 16 23 30 37 44
+#   1  8 15 22 29 36 43
+#   0  7 14 21 28 35 42
+COLUMN_HEIGHT = NUM_ROWS + 1
+BOTTOM_MASK = sum(1 << (col * COLUMN_HEIGHT) for col in range(NUM_COLS))
+BOARD_MASK = BOTTOM_MASK * ((1 << NUM_ROWS) - 1)
+
+# Vertical, horizontal, and the two diagonals.
+WIN_SHIFTS = (1, COLUMN_HEIGHT, COLUMN_HEIGHT - 1, COLUMN_HEIGHT + 1)
+
+# One random 64-bit key per (player, bit). The side to move follows from the
+# piece count, so it does not need a key of its own.
+_zobrist_rng = Random(0xC0FFEE)
+ZOBRIST_KEYS: Dict[Player, List[int]] = {
+    player: [_zobrist_rng.getrandbits(64) for _ in range(NUM_COLS * COLUMN_HEIGHT)]
+    for player in Player
+}
 
 
 def opposing_player(player: Player):
@@ -22,10 +50,36 @@ def opposing_player(player: Player):
         return Player.PLAYER_1
 
 
-@dataclass
-class Delta:
-    row_delta: int
-    col_delta: int
+def cell_bit(row: int, col: int) -> int:
+    return 1 << (col * COLUMN_HEIGHT + row)
+
+
+def mirror_key(key: int) -> int:
+    """position_key of the left-right mirror image of a position."""
+    column_mask = (1 << COLUMN_HEIGHT) - 1
+    mirrored = 0
+    for col in range(NUM_COLS):
+        column = (key >> (col * COLUMN_HEIGHT)) & column_mask
+        mirrored |= column << ((NUM_COLS - 1 - col) * COLUMN_HEIGHT)
+    return mirrored
+
+
+def has_four(bitboard: int) -> bool:
+    """Whether the given single-player bitboard contains four in a row."""
+    for shift in WIN_SHIFTS:
+        pairs = bitboard & (bitboard >> shift)
+        if pairs & (pairs >> (2 * shift)):
+            return True
+    return False
+
+
+class MoveListener(Protocol):
+    """Told about every piece placed on or taken off a GameBoard it is
+    attached to. `index` is the piece's bit index in the bitboard layout."""
+
+    def on_make_move(self, player: Player, index: int) -> None: ...
+
+    def on_unmake_move(self, player: Player, index: int) -> None: ...
 
 
 @dataclass
@@ -33,9 +87,6 @@ class Coord:
     row: int
     col: int
 
-    def apply(self, d: Delta):
-        return Coord(row=self.row + d.row_delta, col=self.col + d.col_delta)
-
     def in_bounds(self):
         return (
             self.row >= 0
@@ -48,8 +99,12 @@ class Coord:
 class GameBoard:
     def __init__(self):
         self._state = GameState.ONGOING
-        self.columns: List[List[Player]] = [[] for _ in range(NUM_COLS)]
-        assert len(self.columns) == NUM_COLS
+        self._bitboards: Dict[Player, int] = {Player.PLAYER_1: 0, Player.PLAYER_2: 0}
+        self._heights: List[int] = [0] * NUM_COLS
+        self._num_moves = 0
+        self._history: List[int] = []
+        self._hash = 0
+        self._listeners: List[MoveListener] = []
 
         self._side_to_move = Player.PLAYER_1
 
@@ -59,19 +114,54 @@ class GameBoard:
     def state(self):
         return self._state
 
+    def attach(self, listener: MoveListener):
+        """Have `listener` follow every later make_move and unmake_move."""
+        self._listeners.append(listener)
+
+    def detach(self, listener: MoveListener):
+        self._listeners.remove(listener)
+
+    def bitboard(self, player: Player) -> int:
+        return self._bitboards[player]
+
+    def occupied(self) -> int:
+        return self._bitboards[Player.PLAYER_1] | self._bitboards[Player.PLAYER_2]
+
+    def num_moves(self) -> int:
+        return self._num_moves
+
+    def zobrist_hash(self) -> int:
+        """64-bit Zobrist hash of the pieces on the board, updated incrementally."""
+        return self._hash
+
+    def position_key(self) -> int:
+        """Exact, collision-free 49-bit encoding of the position.
+
+        Each column holds player 1's pieces plus a marker bit just above the
+        top piece, which pins down the height.
+        """
+        return (self.occupied() + BOTTOM_MASK) | self._bitboards[Player.PLAYER_1]
+
+    def history(self) -> List[int]:
+        """Columns played so far, oldest first. Do not mutate."""
+        return self._history
+
     def piece_at(self, coord: Coord) -> Optional[Player]:
         assert coord.in_bounds()
 
-        if coord.row >= len(self.columns[coord.col]):
-            return None
+        bit = cell_bit(coord.row, coord.col)
+        if self._bitboards[Player.PLAYER_1] & bit:
+            return Player.PLAYER_1
+        if self._bitboards[Player.PLAYER_2] & bit:
+            return Player.PLAYER_2
 
-        return self.columns[coord.col][coord.row]
+        return None
 
     def all_moves(self) -> List[int]:
-        return [c for c in range(NUM_COLS) if (NUM_ROWS - len(self.columns[c]) > 0)]
+        return [c for c in range(NUM_COLS) if self._heights[c] < NUM_ROWS]
 
     def column_space(self, col: int):
-        return NUM_ROWS - len(self.columns[col])
+        return NUM_ROWS - self._heights[col]
 
     def side_to_move(self):
         return self._side_to_move
@@ -112,51 +202,53 @@ class GameBoard:
 
         return "\n".join(lines)
 
-    def _check_win(self, pos: Coord):
-        planes = (
-            (Delta(0, 1), Delta(0, -1)),
-            (Delta(1, 1), Delta(-1, -1)),
-            (Delta(1, 0), Delta(-1, 0)),
-            (Delta(1, -1), Delta(-1, 1)),
-        )
-
-        def delta_streak(start_pos: Coord, direction: Delta):
-            def streak_continues(pos: Coord) -> bool:
-                if not pos.in_bounds():
-                    return False
-
-                piece = self.piece_at(pos)
-
-                return piece is not None and piece == self._side_to_move
-
-            length = 0
-            cur_pos = start_pos
-            while streak_continues(cur_pos):
-                length += 1
-                cur_pos = cur_pos.apply(direction)
-
-            return length
-
-        return any(
-            delta_streak(pos, p1) + delta_streak(pos, p2) - 1 >= 4
-            for (p1, p2) in planes
-        )
-
     def make_move(self, move: Move):
-        assert move.column < NUM_COLS
+        col = move.column
+        assert 0 <= col < NUM_COLS
         assert self._state == GameState.ONGOING
-        assert len(self.columns[move.column]) < NUM_ROWS
-
-        start_row, start_col = len(self.columns[move.column]), move.column
 
-        self.columns[move.column].append(self._side_to_move)
-
-        if self._check_win(Coord(row=start_row, col=start_col)):
-            if self._side_to_move == Player.PLAYER_1:
+        height = self._heights[col]
+        assert height < NUM_ROWS
+
+        player = self._side_to_move
+        index = col * COLUMN_HEIGHT + height
+        bitboard = self._bitboards[player] | (1 << index)
+        self._bitboards[player] = bitboard
+        self._hash ^= ZOBRIST_KEYS[player][index]
+        self._heights[col] = height + 1
+        self._num_moves += 1
+        self._history.append(col)
+        for listener in self._listeners:
+            listener.on_make_move(player, index)
+
+        if has_four(bitboard):
+            if player == Player.PLAYER_1:
                 self._state = GameState.PLAYER_1_WIN
             else:
                 self._state = GameState.PLAYER_2_WIN
-        elif all([len(col) == NUM_ROWS for col in self.columns]):
+        elif self._num_moves == NUM_CELLS:
             self._state = GameState.DRAW
         else:
             self.flip_side_to_move()
+
+    def unmake_move(self):
+        """Take back the last move, restoring the side to move and the state."""
+        assert self._history
+
+        col = self._history.pop()
+
+        if self._state == GameState.ONGOING:
+            self.flip_side_to_move()
+        else:
+            # make_move leaves the side to move alone once the game ends.
+            self._state = GameState.ONGOING
+
+        height = self._heights[col] - 1
+        self._heights[col] = height
+        self._num_moves -= 1
+
+        index = col * COLUMN_HEIGHT + height
+        self._bitboards[self._side_to_move] ^= 1 << index
+        self._hash ^= ZOBRIST_KEYS[self._side_to_move][index]
+        for listener in self._listeners:
+            listener.on_unmake_move(self._side_to_move, index)
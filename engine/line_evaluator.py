@@ -0,0 +1,167 @@
+from array import array
+from typing import Dict, List, Tuple
+
+from engine.game_board import (
+    COLUMN_HEIGHT,
+    NUM_COLS,
+    NUM_ROWS,
+    GameBoard,
+    Player,
+    opposing_player,
+)
+
+# Score of a line holding this many pieces of one player and none of the
+# other's. Lines holding pieces of both players can never be completed and
+# score nothing.
+LINE_SCORES = (0, 1, 4, 16, 1000)
+
+FOUR = 4
+
+
+def _lines() -> List[Tuple[int, ...]]:
+    """Bit indices of the four cells of every four-in-a-row line."""
+    lines = []
+    for row in range(NUM_ROWS):
+        for col in range(NUM_COLS):
+            for d_row, d_col in ((0, 1), (1, 0), (1, 1), (1, -1)):
+                end_row, end_col = row + 3 * d_row, col + 3 * d_col
+                if 0 <= end_row < NUM_ROWS and 0 <= end_col < NUM_COLS:
+                    lines.append(
+                        tuple(
+                            (col + i * d_col) * COLUMN_HEIGHT + row + i * d_row
+                            for i in range(FOUR)
+                        )
+                    )
+    return lines
+
+
+LINES = _lines()
+assert len(LINES) == 69
+
+# Indexed by bit index, the numbers of the lines through that cell. Empty
+# for the sentinel bits.
+LINES_THROUGH_CELL: List[Tuple[int, ...]] = [
+    tuple(n for n, line in enumerate(LINES) if index in line)
+    for index in range(NUM_COLS * COLUMN_HEIGHT)
+]
+
+# A line's piece counts are kept as one code, player 1's count times five
+# plus player 2's, so a move adds a fixed step to the code of each line
+# through its cell.
+CODE_STEP = {Player.PLAYER_1: FOUR + 1, Player.PLAYER_2: 1}
+NUM_CODES = (FOUR + 1) ** 2
+
+
+def _code_score(code: int) -> int:
+    """Score of a line with this code, from player 1's view."""
+    player1, player2 = divmod(code, FOUR + 1)
+    if player2 == 0:
+        return LINE_SCORES[player1]
+    if player1 == 0:
+        return -LINE_SCORES[player2]
+    return 0
+
+
+CODE_SCORES = [_code_score(code) for code in range(NUM_CODES)]
+
+
+def _make_tables(player: Player) -> Tuple[List[int], bytes]:
+    """For each code a move by `player` can start from: the change in player
+    1's score, and whether the move completes the line."""
+    step = CODE_STEP[player]
+    deltas = [0] * NUM_CODES
+    completes = bytearray(NUM_CODES)
+    for own in range(FOUR):
+        for other in range(FOUR + 1):
+            code = own * step + other * CODE_STEP[opposing_player(player)]
+            deltas[code] = CODE_SCORES[code + step] - CODE_SCORES[code]
+            completes[code] = own + 1 == FOUR
+    return deltas, bytes(completes)
+
+
+MAKE_TABLES = {player: _make_tables(player) for player in Player}
+
+
+def line_score(board: GameBoard) -> int:
+    """Player 1's LINE_SCORES total, counted from scratch over every line."""
+    player1 = board.bitboard(Player.PLAYER_1)
+    player2 = board.bitboard(Player.PLAYER_2)
+
+    score = 0
+    for line in LINES:
+        code = 0
+        for index in line:
+            if player1 >> index & 1:
+                code += CODE_STEP[Player.PLAYER_1]
+            elif player2 >> index & 1:
+                code += CODE_STEP[Player.PLAYER_2]
+        score += CODE_SCORES[code]
+    return score
+
+
+class LineEvaluator:
+    """Per-line piece counts and their running score, kept up to date as
+    moves are made and unmade on the board it is attached to.
+
+    A move touches only the (at most 13) lines through its cell, so scoring
+    a leaf costs a table lookup per line on the way in and out rather than
+    a rescan of all 69 lines. Counting completed lines as they go also
+    answers "has this player four in a row?" without looking at the board.
+    """
+
+    def __init__(self, board: GameBoard):
+        """Count the pieces already on `board` and attach to it."""
+        self._codes = array("B", bytes(len(LINES)))
+        self._score = 0
+        self._fours: Dict[Player, int] = {Player.PLAYER_1: 0, Player.PLAYER_2: 0}
+
+        for player in Player:
+            bitboard = board.bitboard(player)
+            while bitboard:
+                lowest = bitboard & -bitboard
+                self.on_make_move(player, lowest.bit_length() - 1)
+                bitboard ^= lowest
+
+        self._board = board
+        board.attach(self)
+
+    def detach(self):
+        self._board.detach(self)
+
+    def score(self, player: Player) -> int:
+        """Sum of LINE_SCORES over the lines only `player` has pieces in,
+        less the same for the opponent."""
+        return self._score if player == Player.PLAYER_1 else -self._score
+
+    def has_four(self, player: Player) -> bool:
+        return self._fours[player] > 0
+
+    def on_make_move(self, player: Player, index: int):
+        deltas, completes = MAKE_TABLES[player]
+        step = CODE_STEP[player]
+        codes = self._codes
+
+        score = self._score
+        fours = 0
+        for line in LINES_THROUGH_CELL[index]:
+            code = codes[line]
+            score += deltas[code]
+            fours += completes[code]
+            codes[line] = code + step
+        self._score = score
+        self._fours[player] += fours
+
+    def on_unmake_move(self, player: Player, index: int):
+        deltas, completes = MAKE_TABLES[player]
+        step = CODE_STEP[player]
+        codes = self._codes
+
+        score = self._score
+        fours = 0
+        for line in LINES_THROUGH_CELL[index]:
+            code = codes[line] - step
+            score -= deltas[code]
+            fours += completes[code]
+            codes[line] = code
+        self._score = score
+        self._fours[player] -= fours
@@ -0,0 +1,327 @@
+import argparse
+import math
+import sys
+import time
+from array import array
+from random import Random
+from typing import ClassVar, Optional
+
+import runner.codec as codec
+from engine.alpha_beta_engine import CENTER_FIRST, MOVES
+from engine.batch_board import NO_MOVE_BYTE, BatchBoard
+from engine.engine_base import EngineBase
+from engine.engine_main import engine_main
+from engine.game_board import (
+    BOARD_MASK,
+    BOTTOM_MASK,
+    COLUMN_HEIGHT,
+    GameBoard,
+    GameState,
+    NUM_COLS,
+    Player,
+    opposing_player,
+)
+from engine.solver import winning_cells
+
+# Random playouts run side by side in one BatchBoard to score each new leaf.
+PLAYOUTS_PER_LEAF = 256
+
+# UCT exploration constant, for rewards in [0, 1].
+EXPLORATION = 1.0
+
+# Nodes allocated up front. Each leaf evaluation adds at most NUM_COLS, so
+# this lasts for tens of thousands of evaluations; after that the tree
+# stops growing and leaves are simply evaluated again.
+NODE_CAPACITY = 1 << 17
+
+ROOT = 0
+UNEXPANDED = -1
+
+# GameState value of a win for each player.
+WIN_VALUE = {
+    Player.PLAYER_1: GameState.PLAYER_1_WIN.value,
+    Player.PLAYER_2: GameState.PLAYER_2_WIN.value,
+}
+
+
+def _random_column_table() -> bytes:
+    """Indexed by legal-move mask | random byte << 8, a legal column.
+
+    Taking the random byte modulo the number of legal columns is very nearly
+    uniform (out by at most 1/85), which is plenty for playouts.
+    """
+    table = bytearray(1 << 16)
+    for mask in range(1 << 8):
+        columns = [c for c in range(NUM_COLS) if mask >> c & 1] or [NO_MOVE_BYTE]
+        for r in range(1 << 8):
+            table[mask | r << 8] = columns[r % len(columns)]
+    return bytes(table)
+
+
+RANDOM_COLUMN = _random_column_table()
+
+
+def random_columns(masks: bytes, rng: Random) -> bytes:
+    """A random legal column for each legal_move_masks() byte, or NO_MOVE_BYTE
+    for boards with no legal moves, without running Python code per board."""
+    pairs = bytearray(2 * len(masks))
+    pairs[0::2] = masks
+    pairs[1::2] = rng.randbytes(len(masks))
+
+    index = array("H")
+    index.frombytes(pairs)
+    return bytes(map(RANDOM_COLUMN.__getitem__, index))
+
+
+def playout_score(board: GameBoard, num_playouts: int, rng: Random) -> float:
+    """Mean result of random playouts from an ongoing `board` for the player
+    who made the last move: 1 per win, 0.5 per draw."""
+    batch = BatchBoard.from_board(board, num_playouts)
+
+    while True:
+        masks = batch.legal_move_masks()
+        if masks.count(0) == num_playouts:
+            break
+        batch.apply_column_bytes(random_columns(masks, rng))
+
+    # Every playout has ended, so whatever is not a draw or a win for the
+    # side to move is a win for the player who just moved.
+    states = batch.states()
+    draws = states.count(GameState.DRAW.value)
+    losses = states.count(WIN_VALUE[board.side_to_move()])
+    return (num_playouts - losses - 0.5 * draws) / num_playouts
+
+
+def forced_column(board: GameBoard) -> Optional[int]:
+    """A column that wins at once for the side to move or, failing that, one
+    that blocks the opponent's immediate win. None if neither exists."""
+    mask = board.occupied()
+    playable = (mask + BOTTOM_MASK) & BOARD_MASK
+    player = board.side_to_move()
+
+    for owner in (player, opposing_player(player)):
+        cells = playable & winning_cells(board.bitboard(owner), mask)
+        if cells:
+            return ((cells & -cells).bit_length() - 1) // COLUMN_HEIGHT
+    return None
+
+
+class SearchTree:
+    """MCTS nodes as parallel preallocated arrays, indexed by node number.
+
+    A node's children are contiguous, in CENTER_FIRST order. `value` is the
+    total reward, over its `visits` evaluations, for the player who made the
+    move leading to the node.
+    """
+
+    def __init__(self, capacity: int = NODE_CAPACITY):
+        self.capacity = capacity
+        self.parent = array("l", [UNEXPANDED]) * capacity
+        self.move = array("b", [0]) * capacity
+        self.first_child = array("l", [UNEXPANDED]) * capacity
+        self.num_children = array("b", [0]) * capacity
+        self.visits = array("l", [0]) * capacity
+        self.value = array("d", [0.0]) * capacity
+        self.size = 0
+        self.clear()
+
+    def clear(self):
+        """Forget everything but an unexpanded root."""
+        self.size = 1
+        self.first_child[ROOT] = UNEXPANDED
+        self.visits[ROOT] = 0
+        self.value[ROOT] = 0.0
+
+    def expand(self, node: int, board: GameBoard) -> bool:
+        """Add children for every legal move of `board`, at `node`. False if
+        the tree is full."""
+        columns = [c for c in CENTER_FIRST if board.column_space(c) > 0]
+        first = self.size
+        if first + len(columns) > self.capacity:
+            return False
+
+        for child, column in enumerate(columns, first):
+            self.parent[child] = node
+            self.move[child] = column
+            self.first_child[child] = UNEXPANDED
+            self.visits[child] = 0
+            self.value[child] = 0.0
+
+        self.first_child[node] = first
+        self.num_children[node] = len(columns)
+        self.size = first + len(columns)
+        return True
+
+    def select_child(self, node: int) -> int:
+        """The child with the highest UCT score, trying unvisited ones first."""
+        first = self.first_child[node]
+        visits, value = self.visits, self.value
+        log_parent = math.log(max(visits[node], 1))
+
+        best, best_score = first, -math.inf
+        for child in range(first, first + self.num_children[node]):
+            n = visits[child]
+            if n == 0:
+                return child
+            score = value[child] / n + EXPLORATION * math.sqrt(log_parent / n)
+            if score > best_score:
+                best, best_score = child, score
+        return best
+
+    def backpropagate(self, node: int, reward: float):
+        """Credit `reward`, for the player who moved into `node`, up the tree."""
+        while node != UNEXPANDED:
+            self.visits[node] += 1
+            self.value[node] += reward
+            reward = 1.0 - reward
+            node = self.parent[node]
+
+    def most_visited_child(self, node: int) -> int:
+        first = self.first_child[node]
+        children = range(first, first + self.num_children[node])
+        return max(children, key=self.visits.__getitem__)
+
+
+class MctsEngine(EngineBase):
+    """Monte Carlo tree search with UCT selection.
+
+    Each new leaf is scored by PLAYOUTS_PER_LEAF random playouts run at once
+    in a BatchBoard, so a leaf costs a few dozen bignum operations per ply
+    rather than a Python GameBoard per playout. The search runs until the
+    deadline derived from time_per_move and plays the most visited move.
+    """
+
+    # Set from the command line when run as a program.
+    playouts_per_leaf: ClassVar[int] = PLAYOUTS_PER_LEAF
+    report_stats: ClassVar[bool] = False
+
+    def __init__(self, params: codec.Params):
+        self._board = GameBoard()
+        for move in params.moves:
+            self._board.make_move(move)
+
+        self._friendly = params.your_player
+        self._time_per_move = params.time_per_move
+        self._rng = Random()
+        # Our own, since games may be searched on several threads at once.
+        # Each search starts it afresh.
+        self._tree = SearchTree()
+
+        # Statistics of the last search.
+        self.leaves = 0
+        self.rollouts = 0
+        self.rollouts_per_second = 0.0
+
+    @classmethod
+    def make(cls, params: codec.Params):
+        return cls(params)
+
+    def on_move(self, move: codec.Move):
+        assert self._board.state() == GameState.ONGOING
+        self._board.make_move(move)
+
+    def get_friendly(self):
+        return self._friendly
+
+    def get_move(self):
+        assert self._board.state() == GameState.ONGOING
+
+        book_move = self.book_move(self._board)
+        if book_move is not None:
+            return book_move
+
+        # A short search can miss a one-move threat, so settle those without
+        # searching.
+        column = forced_column(self._board)
+        if column is not None:
+            return MOVES[column]
+
+        start = time.perf_counter()
+        column = self.search(start + self.move_budget(self._time_per_move))
+        elapsed = time.perf_counter() - start
+
+        self.rollouts_per_second = self.rollouts / elapsed if elapsed > 0 else 0.0
+        if self.report_stats:
+            print(
+                f"mcts: {self.rollouts} rollouts in {elapsed:.3f}s "
+                f"({self.rollouts_per_second:,.0f}/s), {self.leaves} leaves, "
+                f"{self._tree.size} nodes",
+                file=sys.stderr,
+            )
+        return MOVES[column]
+
+    def search(self, deadline: float) -> int:
+        """Grow the tree until `deadline` (a perf_counter time), then return
+        the most visited column. Always evaluates at least one leaf."""
+        tree = self._tree
+        tree.clear()
+        tree.expand(ROOT, self._board)
+        self.leaves = self.rollouts = 0
+
+        while True:
+            self._evaluate_leaf(tree)
+            if time.perf_counter() >= deadline:
+                break
+
+        return tree.move[tree.most_visited_child(ROOT)]
+
+    def _evaluate_leaf(self, tree: SearchTree):
+        """Select a leaf by UCT, expand it if it has been seen before, score
+        it and back the score up."""
+        board = self._board
+        node, depth = ROOT, 0
+
+        while tree.first_child[node] != UNEXPANDED:
+            node = tree.select_child(node)
+            board.make_move(MOVES[tree.move[node]])
+            depth += 1
+            if board.state() != GameState.ONGOING:
+                break
+
+        state = board.state()
+        if state == GameState.ONGOING and tree.visits[node] > 0:
+            if tree.expand(node, board):
+                node = tree.first_child[node]
+                board.make_move(MOVES[tree.move[node]])
+                depth += 1
+                state = board.state()
+
+        if state == GameState.ONGOING:
+            reward = playout_score(board, self.playouts_per_leaf, self._rng)
+            self.rollouts += self.playouts_per_leaf
+        elif state == GameState.DRAW:
+            reward = 0.5
+        else:
+            # The game ended on the move into this node, so its mover won.
+            reward = 1.0
+        self.leaves += 1
+
+        for _ in range(depth):
+            board.unmake_move()
+        tree.backpropagate(node, reward)
+
+
+def parse_mcts_args() -> argparse.Namespace:
+    parser = argparse.ArgumentParser(add_help=False)
+
+    parser.add_argument(
+        "--playouts",
+        type=int,
+        default=PLAYOUTS_PER_LEAF,
+        help="Random playouts run together to score each new leaf",
+    )
+    parser.add_argument(
+        "--stats",
+        action="store_true",
+        help="Print rollouts per second after every move to stderr",
+    )
+
+    args, _ = parser.parse_known_args()
+    return args
+
+
+if __name__ == "__main__":
+    mcts_args = parse_mcts_args()
+    MctsEngine.playouts_per_leaf = mcts_args.playouts
+    MctsEngine.report_stats = mcts_args.stats
+    engine_main(MctsEngine)
@@ -0,0 +1,79 @@
+import bisect
+import mmap
+import struct
+from typing import Iterable, Optional, Tuple
+
+from engine.game_board import GameBoard, NUM_COLS, mirror_key
+from runner.codec import Move
+
+# File layout: an 8-byte header, then one little-endian uint64 per position
+# sorted by key. The low 56 bits of a record hold the canonical
+# position_key and the top 8 bits the best move in that canonical position.
+MAGIC = b"C4BK"
+VERSION = 1
+HEADER = struct.Struct("<4sHxx")
+RECORD_SIZE = 8
+KEY_BITS = 56
+KEY_MASK = (1 << KEY_BITS) - 1
+
+
+def canonical_key(board: GameBoard) -> Tuple[int, bool]:
+    """The smaller of the position's key and its mirror's, and whether mirrored."""
+    key = board.position_key()
+    mirrored = mirror_key(key)
+    if mirrored < key:
+        return mirrored, True
+    return key, False
+
+
+def write_book(path: str, entries: Iterable[Tuple[GameBoard, Move]]):
+    """Write a book mapping each board to the move to play in it."""
+    records: dict[int, int] = {}
+    for board, move in entries:
+        key, mirrored = canonical_key(board)
+        column = NUM_COLS - 1 - move.column if mirrored else move.column
+        records[key] = key | (column << KEY_BITS)
+
+    with open(path, "wb") as f:
+        f.write(HEADER.pack(MAGIC, VERSION))
+        for key in sorted(records):
+            f.write(records[key].to_bytes(RECORD_SIZE, "little"))
+
+
+class OpeningBook:
+    """Read-only view of a book file.
+
+    The file is memory-mapped and searched in place, so opening a book costs
+    nothing up front no matter how large it is.
+    """
+
+    def __init__(self, path: str):
+        with open(path, "rb") as f:
+            self._mmap = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+
+        magic, version = HEADER.unpack_from(self._mmap)
+        if magic != MAGIC or version != VERSION:
+            raise ValueError(f"{path} is not a version {VERSION} opening book")
+
+        self._records = memoryview(self._mmap)[HEADER.size :].cast("Q")
+
+    def __len__(self) -> int:
+        return len(self._records)
+
+    def close(self):
+        self._records.release()
+        self._mmap.close()
+
+    def lookup(self, board: GameBoard) -> Optional[Move]:
+        key, mirrored = canonical_key(board)
+
+        index = bisect.bisect_left(self._records, key, key=lambda r: r & KEY_MASK)
+        if index == len(self._records) or self._records[index] & KEY_MASK != key:
+            return None
+
+        column = self._records[index] >> KEY_BITS
+        if mirrored:
+            column = NUM_COLS - 1 - column
+        if board.column_space(column) == 0:
+            return None
+        return Move(column)
@@ -27,11 +27,12 @@ class RandomEngine(EngineBase):
 
     @classmethod
     def make(cls, params: codec.Params):
-        cls._board = GameBoard()
+        engine = cls()
+        engine._board = GameBoard()
         for move in params.moves:
-            cls._board.make_move(move)
-        cls._friendly = params.your_player
-        return cls()
+            engine._board.make_move(move)
+        engine._friendly = params.your_player
+        return engine
 
 
 if __name__ == "__main__":
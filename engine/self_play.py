@@ -0,0 +1,331 @@
+import argparse
+import glob
+import multiprocessing
+import os
+import queue
+import time
+from array import array
+from dataclasses import dataclass
+from datetime import timedelta
+from random import Random
+from typing import Optional, Tuple
+
+import runner.codec as codec
+from engine.engine_base import EngineBase
+from engine.game_board import GameBoard, GameState, Player
+from engine.training_data import (
+    SIDE_CODES,
+    KeySet,
+    Shard,
+    dedup_key,
+    read_shard,
+    write_shard,
+)
+from runner.in_process import load_engine_class
+
+SHARD_PATTERN = "shard-{:06d}.c4sp"
+SHARD_GLOB = "shard-*.c4sp"
+
+# One game's samples on their way from a worker to the writer: the position
+# keys as uint64 bytes, then one byte per sample for the side to move and
+# the chosen move, and the game's final GameState value.
+GameSamples = Tuple[bytes, bytes, bytes, int]
+
+# Seconds between a blocked worker's checks that it should stop.
+QUEUE_POLL_INTERVAL = 0.1
+
+
+@dataclass
+class SelfPlaySettings:
+    # A "py:module:Class" spec, as for in-process engines.
+    engine: str
+    time_per_move: timedelta = timedelta(milliseconds=1)
+    # Uniformly random moves played before the engines take over, so that
+    # deterministic engines do not replay the same game.
+    random_plies: int = 8
+    # Chance of playing a random move in place of the engine's. Such moves
+    # are played but not recorded as samples.
+    explore: float = 0.05
+
+
+def play_game(
+    engine_cls: type[EngineBase], settings: SelfPlaySettings, rng: Random
+) -> GameSamples:
+    """One self-play game, with a sample for every move the engine chose."""
+    board = GameBoard()
+    while board.num_moves() < settings.random_plies:
+        board.make_move(codec.Move(rng.choice(board.all_moves())))
+        if board.state() != GameState.ONGOING:
+            return b"", b"", b"", board.state().value
+
+    opening = [codec.Move(c) for c in board.history()]
+    engines = {
+        player: engine_cls.make(
+            codec.Params(
+                your_player=player,
+                time_per_move=settings.time_per_move,
+                moves=opening,
+            )
+        )
+        for player in Player
+    }
+
+    positions = array("Q")
+    sides = bytearray()
+    moves = bytearray()
+    while board.state() == GameState.ONGOING:
+        player = board.side_to_move()
+        if rng.random() < settings.explore:
+            move = codec.Move(rng.choice(board.all_moves()))
+        else:
+            move = engines[player].get_move()
+            positions.append(board.position_key())
+            sides.append(SIDE_CODES[player])
+            moves.append(move.column)
+
+        for engine in engines.values():
+            engine.on_move(move)
+        board.make_move(move)
+
+    return positions.tobytes(), bytes(sides), bytes(moves), board.state().value
+
+
+def _worker(
+    settings: SelfPlaySettings,
+    seed: int,
+    samples: "multiprocessing.Queue[GameSamples]",
+    stop: "multiprocessing.synchronize.Event",
+):
+    engine_cls = load_engine_class(settings.engine)
+    rng = Random(seed)
+    # Games still buffered for the queue when told to stop are not wanted,
+    # so do not wait to flush them on exit.
+    samples.cancel_join_thread()
+
+    while not stop.is_set():
+        game = play_game(engine_cls, settings, rng)
+        while not stop.is_set():
+            try:
+                samples.put(game, timeout=QUEUE_POLL_INTERVAL)
+                break
+            except queue.Full:
+                pass
+
+
+class ShardWriter:
+    """Collects unique samples into shards of `shard_size` in `directory`.
+
+    A position, or its mirror image, is kept only the first time it is seen.
+    Shards already in the directory are read back on start, so an
+    interrupted run picks up where it stopped. A short last shard, left by
+    close(), is filled up and rewritten under its own number, so every shard
+    but the last is always full.
+    """
+
+    def __init__(self, directory: str, shard_size: int):
+        os.makedirs(directory, exist_ok=True)
+        self._directory = directory
+        self._shard_size = shard_size
+        self._seen = KeySet()
+        self._pending = Shard()
+
+        self.shards = 0
+        self.positions = 0
+        self.duplicates = 0
+        shard = Shard()
+        for path in sorted(glob.glob(os.path.join(directory, SHARD_GLOB))):
+            shard = read_shard(path)
+            for position in shard.positions:
+                self._seen.add(dedup_key(position))
+            self.shards += 1
+            self.positions += len(shard)
+
+        if 0 < len(shard) < shard_size:
+            self._pending = shard
+            self.shards -= 1
+
+    def add_game(self, game: GameSamples):
+        position_bytes, sides, moves, result = game
+        positions = array("Q")
+        positions.frombytes(position_bytes)
+
+        for i, position in enumerate(positions):
+            if not self._seen.add(dedup_key(position)):
+                self.duplicates += 1
+                continue
+
+            pending = self._pending
+            pending.positions.append(position)
+            pending.sides.append(sides[i])
+            pending.results.append(result)
+            pending.moves.append(moves[i])
+            self.positions += 1
+
+            if len(pending) == self._shard_size:
+                self._write_pending()
+
+    def _write_pending(self):
+        path = os.path.join(self._directory, SHARD_PATTERN.format(self.shards))
+        write_shard(path, self._pending)
+        self._pending = Shard()
+        self.shards += 1
+
+    def close(self):
+        """Write any remaining samples as a final, shorter shard."""
+        if self._pending:
+            self._write_pending()
+
+
+def generate(
+    directory: str,
+    settings: SelfPlaySettings,
+    target_positions: int,
+    jobs: int = 1,
+    shard_size: int = 1 << 16,
+    queue_games: int = 1024,
+    seed: Optional[int] = None,
+    report_interval: float = 10.0,
+) -> ShardWriter:
+    """Play self-play games in `jobs` worker processes until `directory`
+    holds `target_positions` unique samples."""
+    writer = ShardWriter(directory, shard_size)
+    if writer.positions >= target_positions:
+        return writer
+
+    # A resumed run gets fresh seeds, so it does not replay the games it
+    # already has.
+    if seed is None:
+        seed = Random().getrandbits(32)
+    seeds = Random(f"{seed}/{writer.positions}")
+
+    samples: "multiprocessing.Queue[GameSamples]" = multiprocessing.Queue(queue_games)
+    stop = multiprocessing.Event()
+    workers = [
+        multiprocessing.Process(
+            target=_worker,
+            args=(settings, seeds.getrandbits(64), samples, stop),
+            daemon=True,
+        )
+        for _ in range(jobs)
+    ]
+    for worker in workers:
+        worker.start()
+
+    start = time.monotonic()
+    last_report = start
+    start_positions = writer.positions
+    games = 0
+    try:
+        while writer.positions < target_positions:
+            try:
+                writer.add_game(samples.get(timeout=1))
+            except queue.Empty:
+                if not any(worker.is_alive() for worker in workers):
+                    raise RuntimeError("Every self-play worker has exited")
+                continue
+            games += 1
+
+            now = time.monotonic()
+            if now - last_report >= report_interval:
+                last_report = now
+                report(writer, games, writer.positions - start_positions, now - start)
+    finally:
+        stop.set()
+        # Workers blocked on a full queue notice the stop flag on their own.
+        for worker in workers:
+            worker.join(timeout=5)
+            if worker.is_alive():
+                worker.kill()
+        writer.close()
+
+    report(writer, games, writer.positions - start_positions, time.monotonic() - start)
+    return writer
+
+
+def report(writer: ShardWriter, games: int, new_positions: int, elapsed: float):
+    seen = new_positions + writer.duplicates
+    duplicate_share = writer.duplicates / seen if seen else 0.0
+    print(
+        f"{writer.positions} positions in {writer.shards} shards; "
+        f"{new_positions / elapsed:,.0f} positions/s, "
+        f"{new_positions / elapsed * 3600 / 1e6:.1f}M/hour, "
+        f"{games / elapsed:,.0f} games/s, {duplicate_share:.0%} duplicates",
+        flush=True,
+    )
+
+
+def main(args: argparse.Namespace):
+    generate(
+        args.output,
+        SelfPlaySettings(
+            engine=args.engine,
+            time_per_move=timedelta(milliseconds=args.think_ms),
+            random_plies=args.random_plies,
+            explore=args.explore,
+        ),
+        target_positions=args.positions,
+        jobs=args.jobs,
+        shard_size=args.shard_size,
+        seed=args.seed,
+    )
+
+
+def parse_args() -> argparse.Namespace:
+    parser = argparse.ArgumentParser(
+        formatter_class=argparse.ArgumentDefaultsHelpFormatter,
+        description="Generate training data from self-play games: shards of \
+                        (position, side to move, final result, chosen move) \
+                        samples, each position kept once.",
+    )
+
+    parser.add_argument(
+        "output", help="Directory of shards, resumed if it already has some"
+    )
+    parser.add_argument(
+        "--engine",
+        "-e",
+        default="py:engine.alpha_beta_engine:AlphaBetaEngine",
+        help="The py:module:Class EngineBase subclass to play both sides",
+    )
+    parser.add_argument(
+        "--positions",
+        "-n",
+        type=int,
+        default=1_000_000,
+        help="Stop once the output holds this many unique positions",
+    )
+    parser.add_argument(
+        "-j",
+        "--jobs",
+        type=int,
+        default=os.cpu_count() or 1,
+        help="Number of worker processes playing games",
+    )
+    parser.add_argument(
+        "--think-ms",
+        type=int,
+        default=1,
+        help="time_per_move given to the engine",
+    )
+    parser.add_argument(
+        "--random-plies",
+        type=int,
+        default=8,
+        help="Random moves at the start of each game, for variety",
+    )
+    parser.add_argument(
+        "--explore",
+        type=float,
+        default=0.05,
+        help="Chance of a random move in place of the engine's later on",
+    )
+    parser.add_argument(
+        "--shard-size", type=int, default=1 << 16, help="Samples per shard"
+    )
+    parser.add_argument("--seed", type=int, help="Seed for reproducible runs")
+
+    return parser.parse_args()
+
+
+if __name__ == "__main__":
+    main(parse_args())
@@ -0,0 +1,115 @@
+import argparse
+import sys
+import time
+from typing import Iterator, Optional, TextIO
+
+import runner.codec as codec
+from engine.game_board import GameBoard, GameState, NUM_COLS
+from engine.solved_store import SolvedStore
+from engine.solver import Solver
+
+
+def parse_position(moves: str) -> GameBoard:
+    """The board after `moves`, columns written as digits, e.g. "3323".
+
+    Raises ValueError for anything but an ongoing game.
+    """
+    board = GameBoard()
+    for ply, c in enumerate(moves):
+        if not c.isdigit() or int(c) >= NUM_COLS:
+            raise ValueError(f"{c!r} at ply {ply} is not a column 0-{NUM_COLS - 1}")
+        col = int(c)
+        if board.column_space(col) == 0:
+            raise ValueError(f"Column {col} is full at ply {ply}")
+        board.make_move(codec.Move(col))
+        if board.state() != GameState.ONGOING:
+            raise ValueError(f"The game ends at ply {ply}")
+    return board
+
+
+def read_positions(sources: list[str], stream: TextIO) -> Iterator[str]:
+    """Move strings from the command line, or one per line of `stream`."""
+    if sources:
+        yield from sources
+        return
+    for line in stream:
+        line = line.strip()
+        if line and not line.startswith("#"):
+            yield line
+
+
+def format_scores(scores: list[Optional[int]]) -> str:
+    return " ".join("-" if s is None else str(s) for s in scores)
+
+
+def main(args: argparse.Namespace):
+    store = SolvedStore(args.store) if args.store else None
+    solver = Solver(store, tt_bytes=args.tt_mb * 1024 * 1024)
+
+    try:
+        for moves in read_positions(args.positions, sys.stdin):
+            try:
+                board = parse_position(moves)
+            except ValueError as e:
+                print(f"{moves} error: {e}")
+                continue
+
+            solver.nodes = 0
+            start = time.perf_counter()
+            if args.analyze:
+                result = format_scores(solver.analyze(board))
+            else:
+                result = str(solver.solve(board))
+            elapsed = time.perf_counter() - start
+
+            line = f"{moves} {result}"
+            if args.verbose:
+                line += f" nodes={solver.nodes} time={elapsed * 1000:.1f}ms"
+            print(line, flush=True)
+    finally:
+        if store is not None:
+            store.close()
+
+
+def parse_args() -> argparse.Namespace:
+    parser = argparse.ArgumentParser(
+        formatter_class=argparse.ArgumentDefaultsHelpFormatter,
+        description="Exact scores of Connect 4 positions for the side to move. \
+                        0 is a draw; a positive score is a win, higher the \
+                        sooner it comes, and a negative one a loss.",
+    )
+
+    parser.add_argument(
+        "positions",
+        nargs="*",
+        help="Positions as the columns played, e.g. 3323. Read one per line \
+                from stdin if none are given",
+    )
+    parser.add_argument(
+        "--store",
+        help="Solved-position file to read from and add to; created if missing",
+    )
+    parser.add_argument(
+        "--analyze",
+        action="store_true",
+        help="Print the score of every column rather than of the position, \
+                - for a full column",
+    )
+    parser.add_argument(
+        "--tt-mb",
+        type=int,
+        default=64,
+        help="Transposition table size in megabytes",
+    )
+    parser.add_argument(
+        "--verbose",
+        "-v",
+        action="store_true",
+        help="Print node counts and solve times",
+    )
+
+    return parser.parse_args()
+
+
+if __name__ == "__main__":
+    main(parse_args())
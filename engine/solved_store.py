@@ -0,0 +1,134 @@
+import mmap
+import os
+import struct
+from typing import Iterator, Optional, Self, Tuple
+
+# File layout: HEADER, then 2**log2_slots little-endian uint64 slots forming
+# an open-addressing hash table with linear probing. An empty slot is 0; a
+# full one holds a key in the low KEY_BITS bits and the score plus
+# SCORE_OFFSET in the top 8. Keys are never 0, so no flag bit is needed.
+MAGIC = b"C4SV"
+VERSION = 1
+# magic, version, log2 of the slot count, number of positions stored
+HEADER = struct.Struct("<4sHBxQ")
+SLOT_SIZE = 8
+KEY_BITS = 56
+KEY_MASK = (1 << KEY_BITS) - 1
+SCORE_OFFSET = 128
+
+INITIAL_LOG2_SLOTS = 16
+# The table doubles before more than this fraction of slots are full.
+MAX_LOAD = 0.5
+
+_HASH_MULTIPLIER = 0x9E3779B97F4A7C15
+_UINT64_MASK = (1 << 64) - 1
+
+
+class SolvedStore:
+    """Persistent map from position keys to exact scores.
+
+    The file is memory-mapped read-write, so lookups touch only the pages
+    they need and new entries are written in place. When it fills up it is
+    rebuilt at twice the size and swapped in atomically. Only one process
+    should write to a store at a time.
+    """
+
+    def __init__(self, path: str):
+        self._path = path
+        if not os.path.exists(path):
+            _create(path, INITIAL_LOG2_SLOTS)
+        self._open()
+
+    def _open(self):
+        self._file = open(self._path, "r+b")
+        self._mmap = mmap.mmap(self._file.fileno(), 0)
+
+        magic, version, log2_slots, count = HEADER.unpack_from(self._mmap)
+        if magic != MAGIC or version != VERSION:
+            raise ValueError(f"{self._path} is not a version {VERSION} solved store")
+
+        self._log2_slots = log2_slots
+        self._mask = (1 << log2_slots) - 1
+        self._count = count
+        self._slots = memoryview(self._mmap)[HEADER.size :].cast("Q")
+
+    def __len__(self) -> int:
+        return self._count
+
+    def __enter__(self) -> Self:
+        return self
+
+    def __exit__(self, *_):
+        self.close()
+
+    def _first_slot(self, key: int) -> int:
+        return ((key * _HASH_MULTIPLIER) & _UINT64_MASK) >> (64 - self._log2_slots)
+
+    def get(self, key: int) -> Optional[int]:
+        slots, mask = self._slots, self._mask
+        slot = self._first_slot(key)
+        while record := slots[slot]:
+            if record & KEY_MASK == key:
+                return (record >> KEY_BITS) - SCORE_OFFSET
+            slot = (slot + 1) & mask
+        return None
+
+    def put(self, key: int, score: int):
+        assert 0 < key <= KEY_MASK
+        if self._count + 1 > MAX_LOAD * (self._mask + 1):
+            self._grow()
+
+        if _insert(self._slots, self._mask, self._first_slot(key), key, score):
+            self._count += 1
+            HEADER.pack_into(
+                self._mmap, 0, MAGIC, VERSION, self._log2_slots, self._count
+            )
+
+    def items(self) -> Iterator[Tuple[int, int]]:
+        for record in self._slots:
+            if record:
+                yield record & KEY_MASK, (record >> KEY_BITS) - SCORE_OFFSET
+
+    def _grow(self):
+        entries = list(self.items())
+        log2_slots = self._log2_slots + 1
+
+        tmp_path = self._path + ".tmp"
+        _create(tmp_path, log2_slots)
+        with SolvedStore(tmp_path) as bigger:
+            for key, score in entries:
+                bigger.put(key, score)
+
+        self._close_mapping()
+        os.replace(tmp_path, self._path)
+        self._open()
+
+    def flush(self):
+        self._mmap.flush()
+
+    def _close_mapping(self):
+        self._slots.release()
+        self._mmap.close()
+        self._file.close()
+
+    def close(self):
+        self.flush()
+        self._close_mapping()
+
+
+def _insert(slots: memoryview, mask: int, slot: int, key: int, score: int) -> bool:
+    """Store `score` for `key`, probing from `slot`. True if the key is new."""
+    record = key | ((score + SCORE_OFFSET) << KEY_BITS)
+    while existing := slots[slot]:
+        if existing & KEY_MASK == key:
+            slots[slot] = record
+            return False
+        slot = (slot + 1) & mask
+    slots[slot] = record
+    return True
+
+
+def _create(path: str, log2_slots: int):
+    with open(path, "wb") as f:
+        f.write(HEADER.pack(MAGIC, VERSION, log2_slots, 0))
+        f.truncate(HEADER.size + SLOT_SIZE * (1 << log2_slots))
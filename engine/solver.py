@@ -0,0 +1,229 @@
+from typing import List, Optional
+
+from engine.game_board import (
+    BOARD_MASK,
+    BOTTOM_MASK,
+    COLUMN_HEIGHT,
+    GameBoard,
+    GameState,
+    NUM_CELLS,
+    NUM_COLS,
+    NUM_ROWS,
+    mirror_key,
+)
+from engine.solved_store import SolvedStore
+from engine.transposition_table import Bound, TranspositionTable
+
+CENTER_FIRST = sorted(range(NUM_COLS), key=lambda c: abs(NUM_COLS // 2 - c))
+COLUMN_MASKS = [
+    ((1 << NUM_ROWS) - 1) << (col * COLUMN_HEIGHT) for col in range(NUM_COLS)
+]
+
+_MIX_MULTIPLIER = 0x9E3779B97F4A7C15
+_UINT64_MASK = (1 << 64) - 1
+
+
+def winning_cells(position: int, mask: int) -> int:
+    """Empty cells that would complete four in a row for `position`'s owner."""
+    # Vertical: only the cell directly above three stacked pieces.
+    cells = (position << 1) & (position << 2) & (position << 3)
+
+    for shift in (COLUMN_HEIGHT, COLUMN_HEIGHT - 1, COLUMN_HEIGHT + 1):
+        pair = (position << shift) & (position << 2 * shift)
+        cells |= pair & (position << 3 * shift)
+        cells |= pair & (position >> shift)
+        pair = (position >> shift) & (position >> 2 * shift)
+        cells |= pair & (position << shift)
+        cells |= pair & (position >> 3 * shift)
+
+    return cells & (BOARD_MASK ^ mask)
+
+
+def _tt_key(key: int) -> int:
+    # The table indexes by the low bits of the key, which in a raw position
+    # key only describe the first column. Mix them; the mapping is a
+    # bijection, so distinct positions still never share a key.
+    mixed = (key * _MIX_MULTIPLIER) & _UINT64_MASK
+    return mixed ^ (mixed >> 32)
+
+
+def _store_key(position: int, mask: int) -> int:
+    # Same marker-bit encoding as GameBoard.position_key, so it is never 0,
+    # but of the side to move's pieces. Mirror images have the same score.
+    key = (mask + BOTTOM_MASK) | position
+    return min(key, mirror_key(key))
+
+
+class Solver:
+    """Exact game-theoretic scores of Connect 4 positions.
+
+    Negamax with alpha-beta pruning, run as a sequence of null-window
+    searches that narrow the score down by bisection. Positions are worked
+    on as a pair of bitboards: the side to move's pieces and all pieces.
+
+    Scores follow the usual convention for solved Connect 4: 0 is a draw,
+    and a side to move that wins with its k-th remaining piece scores
+    (NUM_CELLS + 1 - num_moves) // 2 - k + 1, so faster wins score higher.
+    Losses are negative, measured the same way for the opponent.
+
+    Exact results are saved to `store`, if given, and looked up there before
+    searching, so a store shared across runs answers repeated queries at
+    once.
+    """
+
+    def __init__(
+        self,
+        store: Optional[SolvedStore] = None,
+        tt_bytes: int = 64 * 1024 * 1024,
+    ):
+        self._store = store
+        self._tt = TranspositionTable(tt_bytes)
+        self.nodes = 0
+
+    def solve(self, board: GameBoard) -> int:
+        """Score of `board` for the side to move, with perfect play."""
+        if board.state() != GameState.ONGOING:
+            raise ValueError("The game is already over")
+
+        position = board.bitboard(board.side_to_move())
+        return self._solve(position, board.occupied(), board.num_moves())
+
+    def analyze(self, board: GameBoard) -> List[Optional[int]]:
+        """Score of each column for the side to move; None if it is full."""
+        if board.state() != GameState.ONGOING:
+            raise ValueError("The game is already over")
+
+        position = board.bitboard(board.side_to_move())
+        mask = board.occupied()
+        num_moves = board.num_moves()
+        winning = winning_cells(position, mask)
+
+        scores: List[Optional[int]] = []
+        for col in range(NUM_COLS):
+            move = (mask + BOTTOM_MASK) & COLUMN_MASKS[col]
+            if not move:
+                scores.append(None)
+            elif move & winning:
+                scores.append((NUM_CELLS + 1 - num_moves) // 2)
+            elif num_moves + 1 == NUM_CELLS:
+                scores.append(0)
+            else:
+                # The opponent moves next, so their score is negated.
+                scores.append(
+                    -self._solve(position ^ mask, mask | move, num_moves + 1)
+                )
+        return scores
+
+    def best_move(self, board: GameBoard) -> int:
+        """A column with the best score, preferring central ones on ties."""
+        scores = self.analyze(board)
+        return max(
+            (c for c in CENTER_FIRST if scores[c] is not None),
+            key=lambda c: scores[c],
+        )
+
+    def _solve(self, position: int, mask: int, num_moves: int) -> int:
+        if self._store is None:
+            return self._null_window_search(position, mask, num_moves)
+
+        key = _store_key(position, mask)
+        stored = self._store.get(key)
+        if stored is not None:
+            return stored
+
+        score = self._null_window_search(position, mask, num_moves)
+        self._store.put(key, score)
+        return score
+
+    def _null_window_search(self, position: int, mask: int, num_moves: int) -> int:
+        if winning_cells(position, mask) & (mask + BOTTOM_MASK):
+            return (NUM_CELLS + 1 - num_moves) // 2
+
+        low = -((NUM_CELLS - num_moves) // 2)
+        high = (NUM_CELLS + 1 - num_moves) // 2
+
+        # Each search only asks whether the score beats `guess`. Guesses
+        # near 0 first, since most positions are close to a draw.
+        while low < high:
+            guess = low + (high - low) // 2
+            if guess <= 0 and int(low / 2) < guess:
+                guess = int(low / 2)
+            elif guess >= 0 and int(high / 2) > guess:
+                guess = int(high / 2)
+
+            score = self._negamax(position, mask, num_moves, guess, guess + 1)
+            if score <= guess:
+                high = score
+            else:
+                low = score
+
+        return low
+
+    def _negamax(
+        self, position: int, mask: int, num_moves: int, alpha: int, beta: int
+    ) -> int:
+        """Score within [alpha, beta] of a position the side to move cannot
+        win at once, as a bound if it falls outside."""
+        self.nodes += 1
+
+        playable = (mask + BOTTOM_MASK) & BOARD_MASK
+        opponent_wins = winning_cells(position ^ mask, mask)
+        forced = playable & opponent_wins
+        if forced:
+            if forced & (forced - 1):
+                # Two threats to block at once.
+                return -((NUM_CELLS - num_moves) // 2)
+            playable = forced
+        # Never play directly below a cell the opponent wins with.
+        candidates = playable & ~(opponent_wins >> 1)
+        if not candidates:
+            return -((NUM_CELLS - num_moves) // 2)
+
+        if num_moves >= NUM_CELLS - 2:
+            return 0
+
+        # The opponent cannot win next move, and nor can we.
+        low = -((NUM_CELLS - 2 - num_moves) // 2)
+        if alpha < low:
+            alpha = low
+            if alpha >= beta:
+                return alpha
+        high = (NUM_CELLS - 1 - num_moves) // 2
+
+        tt_key = _tt_key(position + mask)
+        entry = self._tt.probe(tt_key)
+        if entry is not None:
+            if entry.bound == Bound.LOWER:
+                if alpha < entry.score:
+                    alpha = entry.score
+                    if alpha >= beta:
+                        return alpha
+            elif entry.score < high:
+                high = entry.score
+        if beta > high:
+            beta = high
+            if alpha >= beta:
+                return beta
+
+        # Moves that set up the most threats first, then central ones.
+        ordered = []
+        for order, col in enumerate(CENTER_FIRST):
+            move = candidates & COLUMN_MASKS[col]
+            if move:
+                threats = winning_cells(position | move, mask).bit_count()
+                ordered.append((-threats, order, move))
+        ordered.sort()
+
+        remaining = NUM_CELLS - num_moves
+        for _, _, move in ordered:
+            score = -self._negamax(
+                position ^ mask, mask | move, num_moves + 1, -beta, -alpha
+            )
+            if score >= beta:
+                self._tt.store(tt_key, remaining, score, Bound.LOWER)
+                return score
+            if score > alpha:
+                alpha = score
+
+        self._tt.store(tt_key, remaining, alpha, Bound.UPPER)
+        return alpha
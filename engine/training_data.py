@@ -0,0 +1,170 @@
+import os
+import struct
+import zlib
+from array import array
+from dataclasses import dataclass, field
+from typing import Iterator, Tuple
+
+from engine.game_board import COLUMN_HEIGHT, GameState, NUM_COLS, mirror_key
+from runner.codec import Player
+
+# Shard layout: HEADER, then one zlib stream holding the samples column by
+# column: `count` uint64 position keys, then `count` bytes each of side to
+# move, final result and chosen move. Positions are GameBoard.position_key()
+# values, sides are 1 or 2 and results are GameState values.
+MAGIC = b"C4SP"
+VERSION = 1
+# magic, version, sample count
+HEADER = struct.Struct("<4sHxxI")
+
+SIDE_CODES = {Player.PLAYER_1: 1, Player.PLAYER_2: 2}
+SIDES = {code: player for player, code in SIDE_CODES.items()}
+
+COLUMN_MASK = (1 << COLUMN_HEIGHT) - 1
+
+
+@dataclass
+class Sample:
+    position: int
+    side_to_move: Player
+    result: GameState
+    move: int
+
+
+@dataclass
+class Shard:
+    """Samples stored column by column, ready to hand to an array library."""
+
+    positions: array = field(default_factory=lambda: array("Q"))
+    sides: bytearray = field(default_factory=bytearray)
+    results: bytearray = field(default_factory=bytearray)
+    moves: bytearray = field(default_factory=bytearray)
+
+    def __len__(self) -> int:
+        return len(self.positions)
+
+    def append(self, sample: Sample):
+        self.positions.append(sample.position)
+        self.sides.append(SIDE_CODES[sample.side_to_move])
+        self.results.append(sample.result.value)
+        self.moves.append(sample.move)
+
+    def samples(self) -> Iterator[Sample]:
+        for i in range(len(self)):
+            yield Sample(
+                position=self.positions[i],
+                side_to_move=SIDES[self.sides[i]],
+                result=GameState(self.results[i]),
+                move=self.moves[i],
+            )
+
+
+def position_bitboards(key: int) -> Tuple[int, int]:
+    """(player 1, player 2) bitboards of a GameBoard.position_key()."""
+    occupied = 0
+    for col in range(NUM_COLS):
+        column = (key >> (col * COLUMN_HEIGHT)) & COLUMN_MASK
+        # The marker bit sits just above the top piece.
+        occupied |= ((1 << (column.bit_length() - 1)) - 1) << (col * COLUMN_HEIGHT)
+    player1 = key & occupied
+    return player1, occupied ^ player1
+
+
+def dedup_key(position: int) -> int:
+    """The same for a position and its mirror image."""
+    return min(position, mirror_key(position))
+
+
+def write_shard(path: str, shard: Shard):
+    """Write `shard` to `path` atomically, so a crash never leaves half a shard."""
+    payload = (
+        shard.positions.tobytes()
+        + bytes(shard.sides)
+        + bytes(shard.results)
+        + bytes(shard.moves)
+    )
+
+    temp_path = path + ".tmp"
+    with open(temp_path, "wb") as f:
+        f.write(HEADER.pack(MAGIC, VERSION, len(shard)))
+        f.write(zlib.compress(payload))
+    os.replace(temp_path, path)
+
+
+def read_shard(path: str) -> Shard:
+    with open(path, "rb") as f:
+        data = f.read()
+
+    magic, version, count = HEADER.unpack_from(data)
+    if magic != MAGIC or version != VERSION:
+        raise ValueError(f"{path} is not a version {VERSION} training data shard")
+
+    payload = zlib.decompress(data[HEADER.size :])
+    positions_end = count * 8
+    if len(payload) != positions_end + 3 * count:
+        raise ValueError(f"{path} does not hold {count} samples")
+
+    shard = Shard()
+    shard.positions.frombytes(payload[:positions_end])
+    shard.sides = bytearray(payload[positions_end : positions_end + count])
+    results_start = positions_end + count
+    moves_start = results_start + count
+    shard.results = bytearray(payload[results_start:moves_start])
+    shard.moves = bytearray(payload[moves_start:])
+    return shard
+
+
+class KeySet:
+    """A set of non-zero position keys in one flat array.
+
+    Open addressing with linear probing at 8 bytes a slot, where a Python
+    set would spend around 80 bytes on each of tens of millions of keys.
+    """
+
+    MAX_LOAD = 0.6
+
+    def __init__(self, capacity: int = 1 << 16):
+        assert capacity & (capacity - 1) == 0, "capacity must be a power of two"
+        self._slots = array("Q", bytes(8 * capacity))
+        self._count = 0
+
+    def __len__(self) -> int:
+        return self._count
+
+    def add(self, key: int) -> bool:
+        """Add `key`, returning False if it was already present."""
+        assert key != 0
+        if self._count + 1 > self.MAX_LOAD * len(self._slots):
+            self._grow()
+
+        slots = self._slots
+        mask = len(slots) - 1
+        # Keys are structured, so scatter them before probing.
+        index = ((key * 0x9E3779B97F4A7C15) >> 20) & mask
+        while True:
+            slot = slots[index]
+            if slot == key:
+                return False
+            if slot == 0:
+                slots[index] = key
+                self._count += 1
+                return True
+            index = (index + 1) & mask
+
+    def __contains__(self, key: int) -> bool:
+        slots = self._slots
+        mask = len(slots) - 1
+        index = ((key * 0x9E3779B97F4A7C15) >> 20) & mask
+        while (slot := slots[index]) != 0:
+            if slot == key:
+                return True
+            index = (index + 1) & mask
+        return False
+
+    def _grow(self):
+        old = self._slots
+        self._slots = array("Q", bytes(16 * len(old)))
+        self._count = 0
+        for key in old:
+            if key:
+                self.add(key)
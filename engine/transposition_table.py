@@ -0,0 +1,102 @@
+from array import array
+from dataclasses import dataclass
+from enum import IntEnum
+from typing import Optional
+
+
+class Bound(IntEnum):
+    EXACT = 0
+    LOWER = 1
+    UPPER = 2
+
+
+NO_MOVE = -1
+
+
+@dataclass
+class TTEntry:
+    depth: int
+    score: int
+    bound: Bound
+    move: int
+
+
+# Per-slot storage across the parallel arrays below:
+# key (8) + score (2) + depth (1) + bound (1) + move (1) + generation (1).
+BYTES_PER_ENTRY = 14
+
+
+class TranspositionTable:
+    """Fixed-size hash table keyed by Zobrist hash.
+
+    Entries live in parallel typed arrays sized up front from `max_bytes`, so
+    the table never grows. A slot is overwritten by a deeper search of any
+    position, by any search of the same position, or by anything once the
+    stored entry is from an older `new_search` generation.
+    """
+
+    def __init__(self, max_bytes: int = 16 * 1024 * 1024):
+        assert max_bytes >= BYTES_PER_ENTRY
+
+        # Largest power of two that fits, so the slot index is a single mask.
+        num_slots = 1 << ((max_bytes // BYTES_PER_ENTRY).bit_length() - 1)
+        self._mask = num_slots - 1
+
+        self._keys = array("Q", bytes(8 * num_slots))
+        self._scores = array("h", bytes(2 * num_slots))
+        self._depths = array("B", bytes(num_slots))
+        self._bounds = array("B", bytes(num_slots))
+        self._moves = array("b", bytes(num_slots))
+        # Generation 0 marks an empty slot; live generations are 1..255.
+        self._generations = array("B", bytes(num_slots))
+        self._generation = 1
+
+    def __len__(self) -> int:
+        return self._mask + 1
+
+    def size_bytes(self) -> int:
+        return len(self) * BYTES_PER_ENTRY
+
+    def new_search(self):
+        """Age existing entries so they yield to entries from the new search."""
+        self._generation = self._generation % 255 + 1
+
+    def clear(self):
+        num_slots = len(self)
+        self._generations = array("B", bytes(num_slots))
+        self._generation = 1
+
+    def probe(self, key: int) -> Optional[TTEntry]:
+        slot = key & self._mask
+        if self._generations[slot] == 0 or self._keys[slot] != key:
+            return None
+
+        return TTEntry(
+            depth=self._depths[slot],
+            score=self._scores[slot],
+            bound=Bound(self._bounds[slot]),
+            move=self._moves[slot],
+        )
+
+    def store(
+        self, key: int, depth: int, score: int, bound: Bound, move: int = NO_MOVE
+    ):
+        slot = key & self._mask
+        same_key = self._generations[slot] != 0 and self._keys[slot] == key
+
+        if (
+            not same_key
+            and self._generations[slot] == self._generation
+            and self._depths[slot] > depth
+        ):
+            return
+
+        if same_key and move == NO_MOVE:
+            move = self._moves[slot]
+
+        self._keys[slot] = key
+        self._scores[slot] = score
+        self._depths[slot] = depth
+        self._bounds[slot] = bound
+        self._moves[slot] = move
+        self._generations[slot] = self._generation
@@ -0,0 +1,125 @@
+import argparse
+from dataclasses import dataclass
+from typing import Optional
+
+from engine.game_board import (
+    BOARD_MASK,
+    BOTTOM_MASK,
+    GameBoard,
+    GameState,
+    NUM_CELLS,
+    opposing_player,
+)
+from engine.solver import winning_cells
+from runner.codec import Player
+
+# Values of a proof, for the side to move.
+WIN = 1
+DRAW = 0
+LOSS = -1
+
+
+@dataclass
+class AdjudicationSettings:
+    # Plies of lookahead the proof search may use. At 0 only positions the
+    # side to move wins at once or loses to a double threat are decided.
+    depth: int = 4
+    # No adjudication before this many pieces are on the board.
+    min_moves: int = 0
+
+
+@dataclass
+class Adjudication:
+    result: GameState
+    reason: str
+
+
+def _prove(position: int, mask: int, num_moves: int, depth: int) -> Optional[int]:
+    """WIN, DRAW or LOSS for the side to move if play within `depth` plies
+    decides it, else None. `position` holds the side to move's pieces."""
+    playable = (mask + BOTTOM_MASK) & BOARD_MASK
+    if winning_cells(position, mask) & playable:
+        return WIN
+    if num_moves == NUM_CELLS:
+        return DRAW
+
+    opponent_wins = winning_cells(position ^ mask, mask)
+    forced = playable & opponent_wins
+    if forced & (forced - 1):
+        return LOSS
+    if depth == 0:
+        return None
+    if forced:
+        playable = forced
+
+    best: Optional[int] = LOSS
+    while playable:
+        move = playable & -playable
+        playable ^= move
+
+        score = _prove(position ^ mask, mask | move, num_moves + 1, depth - 1)
+        if score is None:
+            best = None
+        elif -score == WIN:
+            return WIN
+        elif best is not None and -score > best:
+            best = -score
+    # Only a win settles a position that has unproven moves left.
+    return best
+
+
+def adjudicate(
+    board: GameBoard, settings: AdjudicationSettings
+) -> Optional[Adjudication]:
+    """The result an ongoing game is bound to reach, if it is already decided.
+
+    The game is decided when bounded search proves a forced win or draw for
+    one side against any defence, so play-out could only confirm it.
+    """
+    if board.num_moves() < settings.min_moves:
+        return None
+
+    side = board.side_to_move()
+    position = board.bitboard(side)
+    mask = board.occupied()
+    proof = _prove(position, mask, board.num_moves(), settings.depth)
+    if proof is None:
+        return None
+
+    if proof == DRAW:
+        return Adjudication(GameState.DRAW, "neither side can avoid a draw")
+
+    winner = side if proof == WIN else opposing_player(side)
+    result = (
+        GameState.PLAYER_1_WIN if winner == Player.PLAYER_1 else GameState.PLAYER_2_WIN
+    )
+    return Adjudication(result, f"{winner} has a forced win")
+
+
+def add_adjudication_args(parser: argparse.ArgumentParser):
+    parser.add_argument(
+        "--adjudicate",
+        action="store_true",
+        help="End games early once a bounded search proves the result",
+    )
+    parser.add_argument(
+        "--adjudicate-depth",
+        type=int,
+        default=AdjudicationSettings.depth,
+        help="With --adjudicate, plies the proof search looks ahead",
+    )
+    parser.add_argument(
+        "--adjudicate-after",
+        type=int,
+        default=AdjudicationSettings.min_moves,
+        help="With --adjudicate, pieces on the board before it starts",
+    )
+
+
+def adjudication_from_args(args: argparse.Namespace) -> Optional[AdjudicationSettings]:
+    """The settings chosen by add_adjudication_args' flags: None for none."""
+    if not args.adjudicate:
+        return None
+    return AdjudicationSettings(
+        depth=args.adjudicate_depth, min_moves=args.adjudicate_after
+    )
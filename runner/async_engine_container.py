@@ -0,0 +1,76 @@
+import asyncio
+from datetime import timedelta
+from typing import List, Optional, Self
+import runner.codec as codec
+
+
+class AsyncEngineContainer:
+    """An engine subprocess driven from an asyncio event loop.
+
+    Unlike EngineContainer, reads can be bounded by a deadline, so a hung
+    engine costs at most one time_per_move and never blocks the other games
+    running on the same loop.
+    """
+
+    def __init__(self, process: asyncio.subprocess.Process):
+        self._engine = process
+        self._send_buffer = codec.SendBuffer()
+
+    @classmethod
+    async def start(cls, args: List[str]) -> Self:
+        process = await asyncio.create_subprocess_exec(
+            *args,
+            stdin=asyncio.subprocess.PIPE,
+            stdout=asyncio.subprocess.PIPE,
+            start_new_session=True,
+        )
+        return cls(process)
+
+    def alive(self) -> bool:
+        return self._engine.returncode is None
+
+    async def read_message(
+        self, timeout: Optional[timedelta] = None
+    ) -> codec.AnyMessage:
+        """Read one message.
+
+        Raises asyncio.TimeoutError if it does not arrive within `timeout`,
+        and asyncio.IncompleteReadError if the engine closes its stdout.
+        """
+        reader = self._engine.stdout
+        assert reader
+
+        return await asyncio.wait_for(
+            codec.async_decode(reader),
+            timeout.total_seconds() if timeout is not None else None,
+        )
+
+    async def send_move(self, to_move: codec.Move):
+        await self._write(self._send_buffer.encode(codec.MoveMsg.make(to_move)))
+
+    async def send_game_params(self, to_make: codec.Params):
+        await self._write(self._send_buffer.encode(codec.ParamsMsg.make(to_make)))
+
+    async def _write(self, msg: codec.Buffer):
+        writer = self._engine.stdin
+        assert writer
+
+        writer.write(msg)
+        await writer.drain()
+
+    async def kill(self):
+        """Kill the engine and reap it. Safe to call on a dead engine."""
+        if self.alive():
+            self._engine.kill()
+        await self._engine.wait()
+
+    async def close(self):
+        """Ask the engine to exit by closing its stdin, killing it if it lingers."""
+        writer = self._engine.stdin
+        if writer and not writer.is_closing():
+            writer.close()
+
+        try:
+            await asyncio.wait_for(self._engine.wait(), timeout=1)
+        except asyncio.TimeoutError:
+            await self.kill()
@@ -1,10 +1,9 @@
 from dataclasses import dataclass
 import struct
 import datetime
-from typing import Self, List, Protocol
+from typing import Any, Self, List, Optional, Protocol, Tuple
 from enum import Enum
 from typing import IO, Union
-from io import BytesIO
 
 
 class MessageType(Enum):
@@ -22,24 +21,79 @@ class Move:
     column: int
 
 
+Buffer = Union[bytes, bytearray, memoryview]
+
+# Set in a header's type byte when a GameId follows the MessageLength, so
+# one engine process can play many games over a single pipe. Headers without
+# it are version 1, as before, and belong to the only game in progress.
+GAME_ID_FLAG = 0x80
+MAX_GAME_ID = 0xFFFF
+
+
 @dataclass
 class Header:
     msg_type: MessageType
     msg_length: int
+    game_id: Optional[int] = None
 
     FORMAT_STRING = "<BH"
-    LENGTH = struct.calcsize(FORMAT_STRING)
+    STRUCT = struct.Struct(FORMAT_STRING)
+    LENGTH = STRUCT.size
+
+    GAME_ID_FORMAT_STRING = "<BHH"
+    GAME_ID_STRUCT = struct.Struct(GAME_ID_FORMAT_STRING)
+    GAME_ID_LENGTH = GAME_ID_STRUCT.size
+
+    @classmethod
+    def length_for(cls, game_id: Optional[int]) -> int:
+        return cls.LENGTH if game_id is None else cls.GAME_ID_LENGTH
+
+    @classmethod
+    def extra_length(cls, type_byte: int) -> int:
+        """Bytes of header still to come after the first LENGTH, given the
+        first byte."""
+        return cls.GAME_ID_LENGTH - cls.LENGTH if type_byte & GAME_ID_FLAG else 0
+
+    def length(self) -> int:
+        return self.LENGTH if self.game_id is None else self.GAME_ID_LENGTH
 
     def encode(self) -> bytes:
-        return struct.pack(self.FORMAT_STRING, self.msg_type.value, self.msg_length)
+        if self.game_id is None:
+            return self.STRUCT.pack(self.msg_type.value, self.msg_length)
+
+        return self.GAME_ID_STRUCT.pack(
+            self.msg_type.value | GAME_ID_FLAG, self.msg_length, self.game_id
+        )
+
+    def encode_into(self, buffer: bytearray, offset: int = 0) -> int:
+        """Write the header at `offset` and return the offset just past it."""
+        if self.game_id is None:
+            self.STRUCT.pack_into(buffer, offset, self.msg_type.value, self.msg_length)
+        else:
+            self.GAME_ID_STRUCT.pack_into(
+                buffer,
+                offset,
+                self.msg_type.value | GAME_ID_FLAG,
+                self.msg_length,
+                self.game_id,
+            )
+        return offset + self.length()
 
     @classmethod
-    def decode(cls, data: bytes) -> Self:
-        (msg_type, msg_length) = struct.unpack(cls.FORMAT_STRING, data)
-        return cls(msg_type=MessageType(msg_type), msg_length=msg_length)
+    def decode(cls, data: Buffer, offset: int = 0) -> Self:
+        (type_byte, msg_length) = cls.STRUCT.unpack_from(data, offset)
+        if not type_byte & GAME_ID_FLAG:
+            return cls(msg_type=MessageType(type_byte), msg_length=msg_length)
+
+        (_, _, game_id) = cls.GAME_ID_STRUCT.unpack_from(data, offset)
+        return cls(
+            msg_type=MessageType(type_byte & ~GAME_ID_FLAG),
+            msg_length=msg_length,
+            game_id=game_id,
+        )
 
     def remaining_message_length(self) -> int:
-        return self.msg_length - self.LENGTH
+        return self.msg_length - self.length()
 
 
 @dataclass
@@ -48,23 +102,51 @@ class MoveMsg:
     move: Move
 
     FORMAT_STRING = "<B"
-    LENGTH = Header.LENGTH + struct.calcsize(FORMAT_STRING)
+    STRUCT = struct.Struct(FORMAT_STRING)
+    LENGTH = Header.LENGTH + STRUCT.size
+
+    # Header and body in one go, for the message sent on every ply.
+    FULL_STRUCT = struct.Struct(Header.FORMAT_STRING + FORMAT_STRING[1:])
 
     @staticmethod
-    def make(move: Move):
-        hdr = Header(msg_type=MessageType.MAKE_MOVE, msg_length=MoveMsg.LENGTH)
+    def make(move: Move, game_id: Optional[int] = None):
+        if game_id is None:
+            hdr = Header(msg_type=MessageType.MAKE_MOVE, msg_length=MoveMsg.LENGTH)
+        else:
+            hdr = Header(
+                msg_type=MessageType.MAKE_MOVE,
+                msg_length=Header.GAME_ID_LENGTH + MoveMsg.STRUCT.size,
+                game_id=game_id,
+            )
         return MoveMsg(header=hdr, move=move)
 
     def encode(self) -> bytes:
-        return self.header.encode() + struct.pack(
-            MoveMsg.FORMAT_STRING, self.move.column
+        if self.header.game_id is not None:
+            return self.header.encode() + self.STRUCT.pack(self.move.column)
+
+        return self.FULL_STRUCT.pack(
+            self.header.msg_type.value, self.header.msg_length, self.move.column
         )
 
-    @classmethod
-    def decode(cls, header: Header, data: bytes) -> Self:
-        return cls(
-            header=header, move=Move(struct.unpack(MoveMsg.FORMAT_STRING, data)[0])
+    def encode_into(self, buffer: bytearray, offset: int = 0) -> int:
+        """Write the message at `offset` and return the offset just past it."""
+        if self.header.game_id is not None:
+            offset = self.header.encode_into(buffer, offset)
+            self.STRUCT.pack_into(buffer, offset, self.move.column)
+            return offset + self.STRUCT.size
+
+        self.FULL_STRUCT.pack_into(
+            buffer,
+            offset,
+            self.header.msg_type.value,
+            self.header.msg_length,
+            self.move.column,
         )
+        return offset + self.LENGTH
+
+    @classmethod
+    def decode(cls, header: Header, data: Buffer, offset: int = 0) -> Self:
+        return cls(header=header, move=Move(cls.STRUCT.unpack_from(data, offset)[0]))
 
 
 @dataclass
@@ -80,50 +162,65 @@ class ParamsMsg:
     params: Params
 
     FIXED_FORMAT_STRING = "<cLB"
-    FIXED_LENGTH = struct.calcsize(FIXED_FORMAT_STRING)
+    FIXED_STRUCT = struct.Struct(FIXED_FORMAT_STRING)
+    FIXED_LENGTH = FIXED_STRUCT.size
 
     @staticmethod
     def VARIABLE_FORMAT_STRING(num_moves: int):
         return f"<{num_moves}s"
 
     @staticmethod
-    def make(params: Params):
-        msg_length = Header.LENGTH + ParamsMsg.FIXED_LENGTH + len(params.moves)
+    def make(params: Params, game_id: Optional[int] = None):
+        msg_length = (
+            Header.length_for(game_id) + ParamsMsg.FIXED_LENGTH + len(params.moves)
+        )
         return ParamsMsg(
-            header=Header(msg_type=MessageType.GAME_START, msg_length=msg_length),
+            header=Header(
+                msg_type=MessageType.GAME_START,
+                msg_length=msg_length,
+                game_id=game_id,
+            ),
             params=params,
         )
 
     def encode(self) -> bytes:
+        buffer = bytearray(self.header.msg_length)
+        self.encode_into(buffer)
+        return bytes(buffer)
+
+    def encode_into(self, buffer: bytearray, offset: int = 0) -> int:
+        """Write the message at `offset` and return the offset just past it."""
+        offset = self.header.encode_into(buffer, offset)
+
         num_moves = len(self.params.moves)
-        return (
-            self.header.encode()
-            + struct.pack(
-                ParamsMsg.FIXED_FORMAT_STRING,
-                self.params.your_player.value,
-                int(self.params.time_per_move.total_seconds() * 1000),
-                num_moves,
-            )
-            + struct.pack(
-                self.VARIABLE_FORMAT_STRING(num_moves),
-                b"".join(m.column.to_bytes(1, "little") for m in self.params.moves),
-            )
+        self.FIXED_STRUCT.pack_into(
+            buffer,
+            offset,
+            self.params.your_player.value,
+            int(self.params.time_per_move.total_seconds() * 1000),
+            num_moves,
+        )
+        offset += self.FIXED_LENGTH
+
+        buffer[offset : offset + num_moves] = bytes(
+            m.column for m in self.params.moves
         )
+        return offset + num_moves
 
     @classmethod
-    def decode(cls, header: Header, data: bytes) -> Self:
-        buf = BytesIO(data)
-        (your_player, ms_per_move, num_moves) = struct.unpack(
-            cls.FIXED_FORMAT_STRING, buf.read(cls.FIXED_LENGTH)
+    def decode(cls, header: Header, data: Buffer, offset: int = 0) -> Self:
+        (your_player, ms_per_move, num_moves) = cls.FIXED_STRUCT.unpack_from(
+            data, offset
         )
 
         time_per_move = datetime.timedelta(milliseconds=ms_per_move)
 
-        variable_fmt = cls.VARIABLE_FORMAT_STRING(num_moves)
-        variable_length = struct.calcsize(variable_fmt)
-        moves: List[Move] = [
-            Move(b) for b in struct.unpack(variable_fmt, buf.read(variable_length))[0]
-        ]
+        moves_start = offset + cls.FIXED_LENGTH
+        moves_data = memoryview(data)[moves_start : moves_start + num_moves]
+        if len(moves_data) != num_moves:
+            raise struct.error(f"Expected {num_moves} moves, got {len(moves_data)}")
+
+        moves: List[Move] = [Move(b) for b in moves_data]
 
         return cls(
             header=header,
@@ -135,31 +232,106 @@ class ParamsMsg:
         )
 
 
-AnyMessage = Union[Move, Params]
+class SendBuffer:
+    """One bytearray that every message sent on a connection is encoded
+    into, so a send allocates no bytes object of its own.
 
+    Each view returned by encode is only good until the next call.
+    """
 
-def decode(data: bytes) -> AnyMessage:
-    buffer = BytesIO(data)
-    hdr = Header.decode(buffer.read(Header.LENGTH))
-    rest = buffer.read(hdr.remaining_message_length())
+    def __init__(self, size: int = 64):
+        self._buffer = bytearray(size)
+        self._view = memoryview(self._buffer)
+
+    def encode(self, msg: Union[MoveMsg, ParamsMsg]) -> memoryview:
+        if msg.header.msg_length > len(self._buffer):
+            self._buffer = bytearray(msg.header.msg_length)
+            self._view = memoryview(self._buffer)
+        return self._view[: msg.encode_into(self._buffer)]
+
+
+AnyMessage = Union[Move, Params]
+# A message and the game it belongs to; None for a version 1 header.
+Frame = Tuple[Optional[int], AnyMessage]
 
+
+def decode_body(hdr: Header, data: Buffer, offset: int = 0) -> AnyMessage:
+    """Decode the message body that starts at `offset`, given its header."""
     match hdr.msg_type:
         case MessageType.GAME_START:
-            return ParamsMsg.decode(hdr, rest).params
+            return ParamsMsg.decode(hdr, data, offset).params
         case MessageType.MAKE_MOVE:
-            return MoveMsg.decode(hdr, rest).move
+            return MoveMsg.decode(hdr, data, offset).move
+
+
+def decode(data: Buffer) -> AnyMessage:
+    hdr = Header.decode(data)
+    return decode_body(hdr, data, hdr.length())
+
+
+def decode_frame(data: Buffer) -> Frame:
+    hdr = Header.decode(data)
+    return hdr.game_id, decode_body(hdr, data, hdr.length())
 
 
 def decode_buffer(buffer: IO[bytes]) -> AnyMessage:
     hdr_bytes = buffer.read(Header.LENGTH)
+    if not hdr_bytes:
+        raise EOFError("Stream closed")
+    hdr_bytes += buffer.read(Header.extra_length(hdr_bytes[0]))
     hdr = Header.decode(hdr_bytes)
     rest = buffer.read(hdr.remaining_message_length())
 
-    match hdr.msg_type:
-        case MessageType.GAME_START:
-            return ParamsMsg.decode(hdr, rest).params
-        case MessageType.MAKE_MOVE:
-            return MoveMsg.decode(hdr, rest).move
+    return decode_body(hdr, rest)
+
+
+class FrameDecoder:
+    """Incremental decoder for a byte stream of messages.
+
+    Feed it whatever chunks the transport hands over (e.g. from os.read);
+    messages split across chunks are held until complete, and several
+    messages in one chunk are all returned.
+    """
+
+    def __init__(self):
+        self._buffer = bytearray()
+
+    def pending_bytes(self) -> int:
+        return len(self._buffer)
+
+    def feed(self, chunk: Buffer) -> List[AnyMessage]:
+        """Add `chunk` to the stream and return every message it completes."""
+        return self._feed(chunk, with_game_ids=False)
+
+    def feed_frames(self, chunk: Buffer) -> List[Frame]:
+        """feed, keeping each message's game id."""
+        return self._feed(chunk, with_game_ids=True)
+
+    def _feed(self, chunk: Buffer, with_game_ids: bool) -> List[Any]:
+        self._buffer += chunk
+
+        decoded: List[Any] = []
+        offset = 0
+        with memoryview(self._buffer) as view:
+            while len(view) - offset >= Header.LENGTH:
+                # Wait for the game id too, if the type byte says one follows.
+                if view[offset] & GAME_ID_FLAG and (
+                    len(view) - offset < Header.GAME_ID_LENGTH
+                ):
+                    break
+                hdr = Header.decode(view, offset)
+                header_length = hdr.length()
+                if hdr.msg_length < header_length:
+                    raise ValueError(f"Invalid message length {hdr.msg_length}")
+                if len(view) - offset < hdr.msg_length:
+                    break
+
+                message = decode_body(hdr, view, offset + header_length)
+                decoded.append((hdr.game_id, message) if with_game_ids else message)
+                offset += hdr.msg_length
+
+        del self._buffer[:offset]
+        return decoded
 
 
 class AsyncBuffer(Protocol):
@@ -168,11 +340,8 @@ class AsyncBuffer(Protocol):
 
 async def async_decode(buffer: AsyncBuffer) -> AnyMessage:
     hdr_bytes = await buffer.readexactly(Header.LENGTH)
+    hdr_bytes += await buffer.readexactly(Header.extra_length(hdr_bytes[0]))
     hdr = Header.decode(hdr_bytes)
     rest = await buffer.readexactly(hdr.remaining_message_length())
 
-    match hdr.msg_type:
-        case MessageType.GAME_START:
-            return ParamsMsg.decode(hdr, rest).params
-        case MessageType.MAKE_MOVE:
-            return MoveMsg.decode(hdr, rest).move
+    return decode_body(hdr, rest)
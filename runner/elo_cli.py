@@ -1,10 +1,31 @@
 import argparse
+import threading
+from concurrent.futures import (
+    Future,
+    ProcessPoolExecutor,
+    ThreadPoolExecutor,
+    as_completed,
+)
 from dataclasses import dataclass
-from typing import Self
+from datetime import timedelta
+from typing import Optional, Self, Sequence
 from engine.game_board import Player
 from itertools import product
-from runner.engine_container import EngineContainer
-from runner.run_one import GameResult, run_one
+from multiprocessing.util import Finalize
+from runner.adjudication import (
+    AdjudicationSettings,
+    add_adjudication_args,
+    adjudication_from_args,
+)
+from runner.engine_pool import EnginePool
+from runner.in_process import InProcessEngine, is_in_process
+from runner.multiplexed_engine import MultiplexedEngine
+from runner.game_record import GameRecord, GameRecordSink, GameRecordWriter
+from runner.latency import LatencyTelemetry
+from runner.openings import Opening, add_opening_args, openings_from_args
+from runner.rating_fit import ResultTable, fit_bradley_terry
+from runner.run_one import AnyContainer, GameResult, run_one
+from runner.transport import STDIO, add_transport_args
 
 
 @dataclass
@@ -41,21 +62,52 @@ class Rating:
         self.elo = self.elo + self.settings.adjustment_factor * (score - expected_score)
 
 
-def run_match(playerA: EngineContainer, playerB: EngineContainer) -> MatchResult:
-    """Run a match between playerA and playerB.
-
-    MatchResult is returned from playerB's perspective
+def run_match(
+    playerA: AnyContainer,
+    playerB: AnyContainer,
+    recorder: Optional[GameRecordSink] = None,
+    ids: tuple[int, int] = (0, 1),
+    time_per_move: timedelta = timedelta(milliseconds=100000),
+    telemetry: Optional[LatencyTelemetry] = None,
+    opening: Sequence[int] = (),
+    adjudication: Optional[AdjudicationSettings] = None,
+) -> MatchResult:
+    """Run a match between playerA and playerB: a game each way round, both
+    from the position after `opening`.
+
+    MatchResult is returned from playerA's perspective. Both games are
+    recorded to `recorder` and `telemetry`, if given, with the players named
+    by `ids`, and adjudicated per `adjudication`.
     """
 
     res = MatchResult()
-
-    round_one = run_one(playerA, playerB)
+    idA, idB = ids
+
+    round_one = run_one(
+        playerA,
+        playerB,
+        time_per_move,
+        recorder=recorder,
+        player_ids=(idA, idB),
+        telemetry=telemetry,
+        opening=opening,
+        adjudication=adjudication,
+    )
 
     res.draws += round_one == GameResult.DRAW
     res.wins += round_one == GameResult.PLAYER_1_WIN
     res.losses += round_one == GameResult.PLAYER_2_WIN
 
-    round_two = run_one(playerB, playerA)
+    round_two = run_one(
+        playerB,
+        playerA,
+        time_per_move,
+        recorder=recorder,
+        player_ids=(idB, idA),
+        telemetry=telemetry,
+        opening=opening,
+        adjudication=adjudication,
+    )
 
     res.draws += round_two == GameResult.DRAW
     res.wins += round_two == GameResult.PLAYER_2_WIN
@@ -64,41 +116,346 @@ def run_match(playerA: EngineContainer, playerB: EngineContainer) -> MatchResult
     return res
 
 
+def schedule_matches(
+    engine_ids: list[int], allowed_games: int
+) -> list[tuple[int, int]]:
+    """The (playerA, playerB) pairings compute_elo plays, in rating order."""
+    num_rounds = allowed_games // (len(engine_ids) ** 2)
+
+    return [
+        (id1, id2)
+        for _ in range(num_rounds)
+        for id1, id2 in product(engine_ids, engine_ids)
+        if id1 != id2
+    ]
+
+
+def apply_match(
+    engine_ratings: dict[int, Rating], id1: int, id2: int, match_result: MatchResult
+):
+    first_rating = engine_ratings[id1]
+    second_rating = engine_ratings[id2]
+
+    first_rating.update(second_rating, match_result)
+    second_rating.update(first_rating, match_result.flip())
+
+
+def match_opening(openings: Sequence[Opening], match_index: int) -> Opening:
+    """The opening the `match_index`-th scheduled match starts from.
+
+    The suite is cycled through in order, so every opening gets the same
+    share of matches, give or take one.
+    """
+    if not openings:
+        return ()
+    return openings[match_index % len(openings)]
+
+
 def compute_elo(
-    engines: dict[int, EngineContainer],
+    engines: dict[int, AnyContainer],
     settings: RatingAdjustmentSettings,
     allowed_games: int = 50,
+    recorder: Optional[GameRecordSink] = None,
+    time_per_move: timedelta = timedelta(milliseconds=100000),
+    telemetry: Optional[LatencyTelemetry] = None,
+    openings: Sequence[Opening] = (),
+    adjudication: Optional[AdjudicationSettings] = None,
 ) -> dict[int, Rating]:
-    engine_ids = engines.keys()
-    engine_ratings = {engine_id: Rating(settings) for engine_id in engine_ids}
+    engine_ratings = {engine_id: Rating(settings) for engine_id in engines}
+
+    schedule = schedule_matches(list(engines), allowed_games)
+    for index, (id1, id2) in enumerate(schedule):
+        match_result = run_match(
+            engines[id1],
+            engines[id2],
+            recorder,
+            (id1, id2),
+            time_per_move,
+            telemetry,
+            match_opening(openings, index),
+            adjudication,
+        )
+        apply_match(engine_ratings, id1, id2, match_result)
+
+    return engine_ratings
+
+
+# Per worker process: the engine command lines, and the engines started from
+# them on first use. Each worker owns its own engine processes.
+_worker_engine_args: dict[int, list[str]] = {}
+_worker_engines: dict[int, AnyContainer] = {}
+_worker_pool: Optional[EnginePool] = None
+_worker_time_per_move = timedelta(milliseconds=100000)
+_worker_adjudication: Optional[AdjudicationSettings] = None
+
+
+def _init_worker(
+    engine_args: dict[int, list[str]],
+    time_per_move: timedelta,
+    adjudication: Optional[AdjudicationSettings],
+    transport: str,
+):
+    global _worker_time_per_move, _worker_adjudication, _worker_pool
+    _worker_pool = EnginePool(transport=transport)
+    # Close the worker's engines as it exits. Pool workers leave through
+    # os._exit, which skips atexit, but multiprocessing still runs its own
+    # finalizers first.
+    Finalize(_worker_pool, _worker_pool.shutdown, exitpriority=10)
+    _worker_engine_args.update(engine_args)
+    _worker_time_per_move = time_per_move
+    _worker_adjudication = adjudication
+
+
+def _worker_engine(engine_id: int) -> AnyContainer:
+    assert _worker_pool is not None, "not in a worker started by _init_worker"
+    if engine_id not in _worker_engines:
+        _worker_engines[engine_id] = _worker_pool.engine(
+            _worker_engine_args[engine_id]
+        )
+    return _worker_engines[engine_id]
+
+
+def _run_match_in_worker(
+    id1: int, id2: int, opening: Opening
+) -> tuple[MatchResult, list[GameRecord], LatencyTelemetry]:
+    records: list[GameRecord] = []
+    telemetry = LatencyTelemetry()
+    match_result = run_match(
+        _worker_engine(id1),
+        _worker_engine(id2),
+        records,
+        (id1, id2),
+        _worker_time_per_move,
+        telemetry,
+        opening,
+        _worker_adjudication,
+    )
+    return match_result, records, telemetry
+
+
+MatchOutput = tuple[MatchResult, list[GameRecord], LatencyTelemetry]
 
-    num_rounds = allowed_games // (len(engines) ** 2)
 
-    for _ in range(num_rounds):
-        for id1, id2 in product(engine_ids, engine_ids):
-            if id1 == id2:
-                continue
+def _apply_in_order(
+    engine_ratings: dict[int, Rating],
+    schedule: list[tuple[int, int]],
+    futures: dict[Future[MatchOutput], int],
+    recorder: Optional[GameRecordSink],
+    telemetry: Optional[LatencyTelemetry],
+):
+    """Fold in each match's output as it finishes, in schedule order."""
+    finished: dict[int, MatchOutput] = {}
+    next_to_apply = 0
 
-            match_result = run_match(engines[id1], engines[id2])
+    for future in as_completed(futures):
+        finished[futures[future]] = future.result()
 
-            first_rating = engine_ratings[id1]
-            second_rating = engine_ratings[id2]
+        while next_to_apply in finished:
+            id1, id2 = schedule[next_to_apply]
+            match_result, records, match_telemetry = finished.pop(next_to_apply)
+            apply_match(engine_ratings, id1, id2, match_result)
+            if recorder is not None:
+                for record in records:
+                    recorder.append(record)
+            if telemetry is not None:
+                telemetry.merge(match_telemetry)
+            next_to_apply += 1
 
-            first_rating.update(second_rating, match_result)
-            second_rating.update(first_rating, match_result.flip())
+
+def compute_elo_parallel(
+    engine_args: dict[int, list[str]],
+    settings: RatingAdjustmentSettings,
+    allowed_games: int = 50,
+    jobs: Optional[int] = None,
+    recorder: Optional[GameRecordSink] = None,
+    time_per_move: timedelta = timedelta(milliseconds=100000),
+    telemetry: Optional[LatencyTelemetry] = None,
+    openings: Sequence[Opening] = (),
+    adjudication: Optional[AdjudicationSettings] = None,
+    transport: str = STDIO,
+) -> dict[int, Rating]:
+    """compute_elo, with matches played concurrently across `jobs` processes.
+
+    Results, and game records, are folded in the same order compute_elo
+    would produce them, so the output does not depend on which match
+    finishes first.
+    """
+    engine_ratings = {engine_id: Rating(settings) for engine_id in engine_args}
+    schedule = schedule_matches(list(engine_args), allowed_games)
+
+    with ProcessPoolExecutor(
+        max_workers=jobs,
+        initializer=_init_worker,
+        initargs=(engine_args, time_per_move, adjudication, transport),
+    ) as pool:
+        futures = {
+            pool.submit(
+                _run_match_in_worker, id1, id2, match_opening(openings, index)
+            ): index
+            for index, (id1, id2) in enumerate(schedule)
+        }
+        _apply_in_order(engine_ratings, schedule, futures, recorder, telemetry)
 
     return engine_ratings
 
 
-def main(args: argparse.Namespace):
-    container_args: dict[int, list[str]] = dict(enumerate(args.engine))
-    engine_containers: dict[int, EngineContainer] = {
-        i: EngineContainer(args) for (i, args) in container_args.items()
+def compute_elo_multiplexed(
+    engine_args: dict[int, list[str]],
+    settings: RatingAdjustmentSettings,
+    allowed_games: int = 50,
+    jobs: Optional[int] = None,
+    recorder: Optional[GameRecordSink] = None,
+    time_per_move: timedelta = timedelta(milliseconds=100000),
+    telemetry: Optional[LatencyTelemetry] = None,
+    openings: Sequence[Opening] = (),
+    adjudication: Optional[AdjudicationSettings] = None,
+    transport: str = STDIO,
+) -> dict[int, Rating]:
+    """compute_elo_parallel, but with `jobs` matches in flight on threads
+    that share a single MultiplexedEngine process per engine, rather than a
+    copy of every engine per worker process.
+    """
+    engine_ratings = {engine_id: Rating(settings) for engine_id in engine_args}
+    schedule = schedule_matches(list(engine_args), allowed_games)
+
+    multiplexed = {
+        engine_id: MultiplexedEngine(args, transport)
+        for engine_id, args in engine_args.items()
+        if not is_in_process(args)
     }
+    # Each thread plays its matches over its own game slot on every engine.
+    slots = threading.local()
+
+    def thread_engines() -> dict[int, AnyContainer]:
+        if not hasattr(slots, "engines"):
+            slots.engines = {
+                engine_id: (
+                    InProcessEngine.from_args(args)
+                    if is_in_process(args)
+                    else multiplexed[engine_id].channel()
+                )
+                for engine_id, args in engine_args.items()
+            }
+        return slots.engines
+
+    def play(id1: int, id2: int, opening: Opening) -> MatchOutput:
+        engines = thread_engines()
+        records: list[GameRecord] = []
+        match_telemetry = LatencyTelemetry()
+        match_result = run_match(
+            engines[id1],
+            engines[id2],
+            records,
+            (id1, id2),
+            time_per_move,
+            match_telemetry,
+            opening,
+            adjudication,
+        )
+        return match_result, records, match_telemetry
+
+    try:
+        with ThreadPoolExecutor(max_workers=jobs) as pool:
+            futures = {
+                pool.submit(play, id1, id2, match_opening(openings, index)): index
+                for index, (id1, id2) in enumerate(schedule)
+            }
+            _apply_in_order(engine_ratings, schedule, futures, recorder, telemetry)
+    finally:
+        for engine in multiplexed.values():
+            engine.close()
 
-    ratings = compute_elo(engine_containers, RatingAdjustmentSettings())
+    return engine_ratings
+
+
+class _FanOut:
+    """Hands every game record to several sinks."""
+
+    def __init__(self, sinks: list[GameRecordSink]):
+        self._sinks = sinks
 
-    print(f"{[(*container_args[id], ratings[id].elo) for id in container_args]}")
+    def append(self, record: GameRecord):
+        for sink in self._sinks:
+            sink.append(record)
+
+
+def main(args: argparse.Namespace):
+    container_args: dict[int, list[str]] = dict(enumerate(args.engine))
+    writer = GameRecordWriter(args.record) if args.record else None
+    table = ResultTable() if args.rating == "batch" else None
+
+    telemetry = LatencyTelemetry() if args.latency_json else None
+    time_per_move = timedelta(milliseconds=args.timeout)
+    openings = openings_from_args(args)
+    adjudication = adjudication_from_args(args)
+
+    sinks: list[GameRecordSink] = [s for s in (writer, table) if s is not None]
+    recorder = _FanOut(sinks) if sinks else None
+
+    if args.multiplex:
+        ratings = compute_elo_multiplexed(
+            container_args,
+            RatingAdjustmentSettings(),
+            allowed_games=args.games,
+            jobs=args.jobs,
+            recorder=recorder,
+            time_per_move=time_per_move,
+            telemetry=telemetry,
+            openings=openings,
+            adjudication=adjudication,
+            transport=args.transport,
+        )
+    elif args.jobs > 1:
+        ratings = compute_elo_parallel(
+            container_args,
+            RatingAdjustmentSettings(),
+            allowed_games=args.games,
+            jobs=args.jobs,
+            recorder=recorder,
+            time_per_move=time_per_move,
+            telemetry=telemetry,
+            openings=openings,
+            adjudication=adjudication,
+            transport=args.transport,
+        )
+    else:
+        with EnginePool(transport=args.transport) as pool:
+            engines: dict[int, AnyContainer] = {
+                i: pool.engine(args) for (i, args) in container_args.items()
+            }
+            ratings = compute_elo(
+                engines,
+                RatingAdjustmentSettings(),
+                allowed_games=args.games,
+                recorder=recorder,
+                time_per_move=time_per_move,
+                telemetry=telemetry,
+                openings=openings,
+                adjudication=adjudication,
+            )
+
+    if writer is not None:
+        writer.close()
+
+    if telemetry is not None:
+        telemetry.write_json(
+            args.latency_json,
+            {id: " ".join(engine) for id, engine in container_args.items()},
+        )
+
+    if table is not None:
+        fitted = fit_bradley_terry(table, RatingAdjustmentSettings().initial_elo)
+        if not fitted:
+            print("No games were played.")
+        for id in container_args:
+            if id in fitted:
+                f = fitted[id]
+                print(
+                    f"{' '.join(container_args[id])}: {f.elo:.1f} "
+                    f"(95% CI {f.lower:.1f} .. {f.upper:.1f})"
+                )
+    else:
+        print(f"{[(*container_args[id], ratings[id].elo) for id in container_args]}")
 
 
 def parse_args() -> argparse.Namespace:
@@ -113,15 +470,63 @@ def parse_args() -> argparse.Namespace:
         action="append",
         nargs="+",
         required=True,
-        help="One of any number of engines to have participate in the elo arena",
+        help="One of any number of engines to have participate in the elo arena. \
+                        A single py:module:Class argument, e.g. \
+                        py:engine.random_engine:RandomEngine, runs an EngineBase \
+                        subclass in-process instead of starting a program",
     )
     parser.add_argument(
         "-t",
         "--timeout",
+        type=int,
         default=100,
         help="The allowed delay between receiving and responding \
                         to a message",
     )
+    parser.add_argument(
+        "-n",
+        "--games",
+        type=int,
+        default=50,
+        help="Total number of games to play, split evenly between every \
+                        ordered pair of engines",
+    )
+    parser.add_argument(
+        "-j",
+        "--jobs",
+        type=int,
+        default=1,
+        help="Number of worker processes to play matches in parallel. \
+                        Each worker starts its own copy of every engine",
+    )
+    parser.add_argument(
+        "--multiplex",
+        action="store_true",
+        help="Play the --jobs concurrent matches as threads sharing one \
+                        process per engine, with games told apart by id. \
+                        Engines must support game ids, as engine_main does",
+    )
+    parser.add_argument(
+        "--rating",
+        choices=["online", "batch"],
+        default="online",
+        help="online: sequential K-factor Elo updates after each match. \
+                        batch: one Bradley-Terry maximum-likelihood fit over \
+                        all games, with confidence intervals",
+    )
+    parser.add_argument(
+        "--record",
+        help="Append every game to this game record file. Engines are \
+                        identified by their position in the --engine list",
+    )
+    add_opening_args(parser)
+    add_adjudication_args(parser)
+    add_transport_args(parser)
+    parser.add_argument(
+        "--latency-json",
+        help="Write per-engine think time percentiles, deadline margins and \
+                        timeout counts to this JSON file at the end of the run",
+    )
 
     return parser.parse_args()
 
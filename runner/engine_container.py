@@ -1,38 +1,91 @@
-import os
 import asyncio
 import subprocess
-from typing import TypeVar, List, Optional, Coroutine, Any, Union
+import time
+from collections import deque
+from typing import TypeVar, List, Optional, Coroutine, Any, Union, Deque, Protocol
 import runner.codec as codec
+from runner.transport import STDIO, spawn
 from datetime import timedelta
 
 
+class Container(Protocol):
+    """What run_one needs from an engine, wherever the engine runs."""
+
+    args: List[str]
+
+    def healthy(self) -> bool: ...
+
+    def read_message(self, timeout: Optional[timedelta] = None) -> Any: ...
+
+    def send_move(self, to_move: codec.Move) -> None: ...
+
+    def send_game_params(self, to_make: codec.Params) -> None: ...
+
+    def close(self) -> None: ...
+
+
 class EngineContainer:
-    def __init__(self, args: List[str]):
+    def __init__(self, args: List[str], transport: str = STDIO):
+        """Start the engine `args`, talking to it over `transport` (see
+        runner.transport)."""
         self._loop = asyncio.new_event_loop()
 
-        self._engine = subprocess.Popen(
-            args,
-            stdin=subprocess.PIPE,
-            stdout=subprocess.PIPE,
-            bufsize=0,
-            start_new_session=True,
-        )
+        self.args = args
+        self._hung = False
+        self._decoder = codec.FrameDecoder()
+        self._send_buffer = codec.SendBuffer()
+        self._pending: Deque[codec.AnyMessage] = deque()
+        self._engine, self._transport = spawn(args, transport)
 
-    def read_message(self):
-        reader = self._engine.stdout
-        assert reader
+    def healthy(self) -> bool:
+        """Whether the engine is running and its pipe is in step with us."""
+        return not self._hung and self._engine.poll() is None
 
-        return codec.decode_buffer(reader)
+    def read_message(self, timeout: Optional[timedelta] = None):
+        """Read one message, waiting at most `timeout` for it to arrive.
 
-    def send_move(self, to_move: codec.Move):
-        writer = self._engine.stdin
-        assert writer
+        Raises TimeoutError if it does not arrive in time, after which the
+        engine is no longer healthy: a late reply would be read as the answer
+        to the next question. Raises EOFError if the engine has exited.
+        """
+        deadline = None
+        if timeout is not None:
+            deadline = time.monotonic() + timeout.total_seconds()
+
+        while not self._pending:
+            remaining = None
+            if deadline is not None:
+                remaining = max(deadline - time.monotonic(), 0)
+
+            chunk = self._transport.recv(remaining)
+            if chunk is None:
+                self._hung = True
+                raise TimeoutError(f"No reply from {self.args} within {timeout}")
+            if not chunk:
+                raise EOFError(f"{self.args} exited")
+
+            self._pending.extend(self._decoder.feed(chunk))
 
-        writer.write(codec.MoveMsg.make(to_move).encode())
+        return self._pending.popleft()
+
+    def send_move(self, to_move: codec.Move):
+        self._transport.send(self._send_buffer.encode(codec.MoveMsg.make(to_move)))
 
     def send_game_params(self, to_make: codec.Params):
-        writer = self._engine.stdin
-        assert writer
+        msg = self._send_buffer.encode(codec.ParamsMsg.make(to_make))
+        self._transport.send(msg)
+
+    def kill(self):
+        if self._engine.poll() is None:
+            self._engine.kill()
+        self._engine.wait()
+
+    def close(self, grace: timedelta = timedelta(seconds=1)):
+        """Close our end of the transport so the engine exits, killing it if
+        it lingers."""
+        self._transport.close()
 
-        msg = codec.ParamsMsg.make(to_make).encode()
-        writer.write(msg)
+        try:
+            self._engine.wait(grace.total_seconds())
+        except subprocess.TimeoutExpired:
+            self.kill()
@@ -0,0 +1,103 @@
+from collections import deque
+from datetime import timedelta
+from typing import Deque, Dict, List, Optional, Self, Tuple, Union
+import runner.codec as codec
+from runner.engine_container import EngineContainer
+from runner.in_process import InProcessEngine, is_in_process
+from runner.transport import STDIO
+
+
+class ManagedEngine:
+    """Drop-in replacement for EngineContainer backed by an EnginePool.
+
+    At the start of every game the current process is checked, and if it
+    has crashed or hung it is killed and replaced by one of the pool's warm
+    spares, so one misbehaving game does not poison the rest of a tournament.
+    """
+
+    def __init__(self, pool: "EnginePool", args: List[str]):
+        self.args = args
+        self.respawns = 0
+        self._pool = pool
+        self._current = pool.take(args)
+
+    def healthy(self) -> bool:
+        return self._current.healthy()
+
+    def read_message(self, timeout: Optional[timedelta] = None):
+        return self._current.read_message(timeout)
+
+    def send_move(self, to_move: codec.Move):
+        self._current.send_move(to_move)
+
+    def send_game_params(self, to_make: codec.Params):
+        if not self._current.healthy():
+            self._current.kill()
+            self._current = self._pool.take(self.args)
+            self.respawns += 1
+
+        self._current.send_game_params(to_make)
+
+    def close(self):
+        self._current.close()
+
+
+class EnginePool:
+    """Owns every engine process for a run, keeping warm spares ready.
+
+    Spares are started as soon as one is handed out, so the interpreter
+    startup of a replacement overlaps with play instead of counting against
+    the replacement's first move. Every process is reached over `transport`.
+    """
+
+    def __init__(self, spares_per_engine: int = 1, transport: str = STDIO):
+        self._spares_per_engine = spares_per_engine
+        self._transport = transport
+        self._spares: Dict[Tuple[str, ...], Deque[EngineContainer]] = {}
+        self._engines: List[Union[ManagedEngine, InProcessEngine]] = []
+
+    def __enter__(self) -> Self:
+        return self
+
+    def __exit__(self, *_):
+        self.shutdown()
+
+    def engine(self, args: List[str]) -> Union[ManagedEngine, InProcessEngine]:
+        """An engine for `args`: a managed process, or for a single
+        "py:module:Class" argument an InProcessEngine."""
+        engine: Union[ManagedEngine, InProcessEngine]
+        if is_in_process(args):
+            engine = InProcessEngine.from_args(args)
+        else:
+            engine = ManagedEngine(self, args)
+        self._engines.append(engine)
+        return engine
+
+    def take(self, args: List[str]) -> EngineContainer:
+        """A live process for `args`, preferring an already-started spare."""
+        spares = self._spares.setdefault(tuple(args), deque())
+
+        container: Optional[EngineContainer] = None
+        while spares and container is None:
+            candidate = spares.popleft()
+            if candidate.healthy():
+                container = candidate
+            else:
+                candidate.kill()
+
+        while len(spares) < self._spares_per_engine:
+            spares.append(EngineContainer(args, self._transport))
+
+        if container is None:
+            container = EngineContainer(args, self._transport)
+        return container
+
+    def shutdown(self):
+        for managed in self._engines:
+            managed.close()
+        for spares in self._spares.values():
+            for spare in spares:
+                spare.close()
+
+        self._engines.clear()
+        self._spares.clear()
@@ -0,0 +1,157 @@
+import struct
+from dataclasses import dataclass, field
+from enum import Enum
+from typing import BinaryIO, Iterator, List, Protocol, Self, Tuple
+
+from engine.game_board import GameState
+
+# File layout: FILE_HEADER once, then per game a GAME_HEADER followed by
+# `num_moves` uint16 think times and the moves packed two per byte (a column
+# fits in a nibble; the first move of each pair is in the low nibble).
+MAGIC = b"C4GR"
+VERSION = 2
+FILE_HEADER = struct.Struct("<4sBxxx")
+# player 1 id, player 2 id, result, end reason, number of moves, and how many
+# of those moves were a set opening rather than played by the engines
+GAME_HEADER = struct.Struct("<HHBBBB")
+# Version 1 files have no opening length; their games all start from empty.
+V1_GAME_HEADER = struct.Struct("<HHBBB")
+
+# Think times are stored in units of THINK_TIME_UNIT_US microseconds and
+# saturate at the largest uint16, i.e. about 6.5 seconds.
+THINK_TIME_UNIT_US = 100
+MAX_THINK_TIME_UNITS = 0xFFFF
+
+
+class EndReason(Enum):
+    COMPLETED = 0
+    TIMEOUT = 1
+    DISCONNECTED = 2
+    ILLEGAL_MOVE = 3
+    ADJUDICATED = 4
+
+
+@dataclass
+class GameRecord:
+    player1: int
+    player2: int
+    result: GameState
+    reason: EndReason = EndReason.COMPLETED
+    # Including the opening, whose think times are 0.
+    moves: List[int] = field(default_factory=list)
+    think_times_us: List[int] = field(default_factory=list)
+    opening_length: int = 0
+
+    def encode(self) -> bytes:
+        num_moves = len(self.moves)
+        assert len(self.think_times_us) == num_moves
+
+        think_units = [
+            min(t // THINK_TIME_UNIT_US, MAX_THINK_TIME_UNITS)
+            for t in self.think_times_us
+        ]
+        packed_moves = bytes(
+            self.moves[i] | (self.moves[i + 1] << 4 if i + 1 < num_moves else 0)
+            for i in range(0, num_moves, 2)
+        )
+
+        return (
+            GAME_HEADER.pack(
+                self.player1,
+                self.player2,
+                self.result.value,
+                self.reason.value,
+                num_moves,
+                self.opening_length,
+            )
+            + struct.pack(f"<{num_moves}H", *think_units)
+            + packed_moves
+        )
+
+    @classmethod
+    def decode(cls, header: bytes, body: bytes) -> Self:
+        if len(header) == V1_GAME_HEADER.size:
+            fields = (*V1_GAME_HEADER.unpack(header), 0)
+        else:
+            fields = GAME_HEADER.unpack(header)
+        player1, player2, result, reason, num_moves, opening_length = fields
+
+        think_units = struct.unpack_from(f"<{num_moves}H", body)
+        moves: List[int] = []
+        for byte in body[2 * num_moves :]:
+            moves.append(byte & 0xF)
+            moves.append(byte >> 4)
+
+        return cls(
+            player1=player1,
+            player2=player2,
+            result=GameState(result),
+            reason=EndReason(reason),
+            moves=moves[:num_moves],
+            think_times_us=[u * THINK_TIME_UNIT_US for u in think_units],
+            opening_length=opening_length,
+        )
+
+
+def body_length(num_moves: int) -> int:
+    return 2 * num_moves + (num_moves + 1) // 2
+
+
+class GameRecordSink(Protocol):
+    """Anything run_one can hand finished games to, e.g. a writer or a list."""
+
+    def append(self, record: GameRecord, /) -> None: ...
+
+
+class GameRecordWriter:
+    """Appends games to a record file, creating it if needed."""
+
+    def __init__(self, path: str):
+        self._file: BinaryIO = open(path, "ab")
+
+        if self._file.tell() == 0:
+            self._file.write(FILE_HEADER.pack(MAGIC, VERSION))
+        else:
+            with open(path, "rb") as f:
+                _check_file_header(f, path)
+
+    def __enter__(self) -> Self:
+        return self
+
+    def __exit__(self, *_):
+        self.close()
+
+    def append(self, record: GameRecord):
+        self._file.write(record.encode())
+        self._file.flush()
+
+    def close(self):
+        self._file.close()
+
+
+def _check_file_header(
+    f: BinaryIO, path: str, versions: Tuple[int, ...] = (VERSION,)
+) -> int:
+    magic, version = FILE_HEADER.unpack(f.read(FILE_HEADER.size))
+    if magic != MAGIC or version not in versions:
+        expected = " or ".join(str(v) for v in versions)
+        raise ValueError(f"{path} is not a version {expected} game record file")
+    return version
+
+
+def read_records(path: str) -> Iterator[GameRecord]:
+    """Stream every game in a record file, one at a time."""
+    with open(path, "rb") as f:
+        version = _check_file_header(f, path, (1, VERSION))
+        game_header = V1_GAME_HEADER if version == 1 else GAME_HEADER
+
+        while header := f.read(game_header.size):
+            if len(header) != game_header.size:
+                raise ValueError(f"{path} ends with a truncated game")
+
+            num_moves = header[V1_GAME_HEADER.size - 1]
+            body = f.read(body_length(num_moves))
+            if len(body) != body_length(num_moves):
+                raise ValueError(f"{path} ends with a truncated game")
+
+            yield GameRecord.decode(header, body)
@@ -0,0 +1,124 @@
+import importlib
+import time
+import traceback
+from datetime import timedelta
+from typing import List, Optional
+
+import runner.codec as codec
+from engine.engine_base import EngineBase
+
+# Engine command lines of the form ["py:package.module:ClassName"] name an
+# EngineBase subclass to run in-process instead of a program to start.
+IN_PROCESS_PREFIX = "py:"
+
+
+def is_in_process(args: List[str]) -> bool:
+    return len(args) == 1 and args[0].startswith(IN_PROCESS_PREFIX)
+
+
+def load_engine_class(spec: str) -> type[EngineBase]:
+    """The class named by a "py:module:Class" spec."""
+    module_name, _, class_name = spec.removeprefix(IN_PROCESS_PREFIX).partition(":")
+    if not module_name or not class_name:
+        raise ValueError(f"{spec!r} is not of the form {IN_PROCESS_PREFIX}module:Class")
+
+    engine_cls = getattr(importlib.import_module(module_name), class_name)
+    if not (isinstance(engine_cls, type) and issubclass(engine_cls, EngineBase)):
+        raise ValueError(f"{spec!r} is not an EngineBase subclass")
+    return engine_cls
+
+
+class InProcessEngine:
+    """Drop-in replacement for EngineContainer that runs the engine as a
+    Python object in this process, skipping the pipes and the codec.
+
+    Messages are turned into the calls engine_main would make. The engine
+    thinks inside read_message, so the referee's timer sees its think time,
+    but it cannot be interrupted: a move that overruns is still returned in
+    full before TimeoutError is raised. An exception from the engine is
+    reported like a crash: EOFError from read_message, BrokenPipeError from
+    the send methods, until the next game's params.
+
+    Engines share the process with the runner and with each other, so
+    class-level state, such as AlphaBetaEngine's transposition table, is
+    shared between both sides of a self-play game. Run matches under
+    elo_cli --jobs to keep each worker's engines apart from the runner.
+    """
+
+    def __init__(self, engine_cls: type[EngineBase], args: Optional[List[str]] = None):
+        self.args = args or [
+            f"{IN_PROCESS_PREFIX}{engine_cls.__module__}:{engine_cls.__qualname__}"
+        ]
+        self._engine_cls = engine_cls
+        self._engine: Optional[EngineBase] = None
+        self._to_move = False
+        self._crashed = False
+
+    @classmethod
+    def from_args(cls, args: List[str]) -> "InProcessEngine":
+        return cls(load_engine_class(args[0]), args)
+
+    def healthy(self) -> bool:
+        return not self._crashed
+
+    def _crash(self, what: str):
+        traceback.print_exc()
+        print(f"{self.args} raised in {what}")
+        self._engine = None
+        self._crashed = True
+
+    def read_message(self, timeout: Optional[timedelta] = None):
+        """The engine's next move, computed now.
+
+        Raises TimeoutError if the engine has no move to make, or took longer
+        than `timeout` to make it, and EOFError if it raised.
+        """
+        if self._engine is None:
+            raise EOFError(f"{self.args} is not in a game")
+        if not self._to_move:
+            raise TimeoutError(f"{self.args} is waiting for its opponent")
+
+        start = time.perf_counter()
+        try:
+            move = self._engine.get_move()
+            self._engine.on_move(move)
+        except Exception as e:
+            self._crash("get_move")
+            raise EOFError(f"{self.args} raised {e!r}") from e
+        elapsed = timedelta(seconds=time.perf_counter() - start)
+        self._to_move = False
+
+        if timeout is not None and elapsed > timeout:
+            raise TimeoutError(f"No reply from {self.args} within {timeout}")
+        return move
+
+    def send_move(self, to_move: codec.Move):
+        if self._engine is None:
+            raise BrokenPipeError(f"{self.args} is not in a game")
+
+        try:
+            self._engine.on_move(to_move)
+        except Exception as e:
+            self._crash("on_move")
+            raise BrokenPipeError(f"{self.args} raised {e!r}") from e
+        self._to_move = True
+
+    def send_game_params(self, to_make: codec.Params):
+        self._crashed = False
+        try:
+            self._engine = self._engine_cls.make(to_make)
+        except Exception as e:
+            self._crash("make")
+            raise BrokenPipeError(f"{self.args} raised {e!r}") from e
+
+        # Player 1 moves first, so is to move after an even number.
+        player_1_to_move = len(to_make.moves) % 2 == 0
+        self._to_move = (to_make.your_player == codec.Player.PLAYER_1) == (
+            player_1_to_move
+        )
+
+    def kill(self):
+        self._engine = None
+
+    def close(self):
+        self._engine = None
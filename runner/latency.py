@@ -0,0 +1,190 @@
+import json
+from array import array
+from datetime import timedelta
+from typing import Any, Dict, Optional
+
+# Log-linear buckets: exact below 2**SUB_BUCKET_BITS microseconds, then
+# 2**SUB_BUCKET_BITS buckets per power of two, so every recorded value is
+# within about 6% of the true one.
+SUB_BUCKET_BITS = 4
+SUB_BUCKETS = 1 << SUB_BUCKET_BITS
+# Values are clamped to 2**MAX_VALUE_BITS microseconds, about 13 days.
+MAX_VALUE_BITS = 40
+NUM_BUCKETS = (MAX_VALUE_BITS - SUB_BUCKET_BITS + 1) * SUB_BUCKETS
+MAX_VALUE_US = (1 << MAX_VALUE_BITS) - 1
+
+# A move that leaves less than this fraction of time_per_move unused counts as
+# a near timeout.
+NEAR_TIMEOUT_FRACTION = 0.1
+
+
+def bucket_index(value_us: int) -> int:
+    if value_us < SUB_BUCKETS:
+        return value_us
+    shift = value_us.bit_length() - SUB_BUCKET_BITS - 1
+    return (shift + 1) * SUB_BUCKETS + (value_us >> shift) - SUB_BUCKETS
+
+
+def bucket_upper_bound(index: int) -> int:
+    """The largest value, in microseconds, that lands in bucket `index`."""
+    if index < SUB_BUCKETS:
+        return index
+    shift = index // SUB_BUCKETS - 1
+    sub_bucket = index % SUB_BUCKETS + SUB_BUCKETS
+    return ((sub_bucket + 1) << shift) - 1
+
+
+class LatencyHistogram:
+    """Fixed-size histogram of durations, in microseconds.
+
+    Recording is a handful of integer operations and never allocates, so it
+    is cheap enough to leave on for every move of every game.
+    """
+
+    def __init__(self):
+        self._counts = array("Q", bytes(8 * NUM_BUCKETS))
+        self.count = 0
+        self.total_us = 0
+        self.min_us = MAX_VALUE_US
+        self.max_us = 0
+
+    def record(self, value_us: int):
+        value_us = min(max(value_us, 0), MAX_VALUE_US)
+        self._counts[bucket_index(value_us)] += 1
+        self.count += 1
+        self.total_us += value_us
+        if value_us < self.min_us:
+            self.min_us = value_us
+        if value_us > self.max_us:
+            self.max_us = value_us
+
+    def merge(self, other: "LatencyHistogram"):
+        for index, count in enumerate(other._counts):
+            if count:
+                self._counts[index] += count
+        self.count += other.count
+        self.total_us += other.total_us
+        self.min_us = min(self.min_us, other.min_us)
+        self.max_us = max(self.max_us, other.max_us)
+
+    def percentile(self, fraction: float) -> int:
+        """Upper bound of the value below which `fraction` of samples fall."""
+        if self.count == 0:
+            return 0
+
+        rank = max(1, round(fraction * self.count))
+        seen = 0
+        for index, count in enumerate(self._counts):
+            seen += count
+            if seen >= rank:
+                return min(max(bucket_upper_bound(index), self.min_us), self.max_us)
+        return self.max_us
+
+    def summary(self, *fractions: float) -> Dict[str, float]:
+        """min/max/mean and the requested percentiles, in milliseconds."""
+        if self.count == 0:
+            return {"count": 0}
+
+        summary: Dict[str, float] = {
+            "count": self.count,
+            "min_ms": self.min_us / 1_000,
+            "mean_ms": self.total_us / self.count / 1_000,
+        }
+        for fraction in fractions:
+            summary[f"p{100 * fraction:g}_ms"] = self.percentile(fraction) / 1_000
+        summary["max_ms"] = self.max_us / 1_000
+        return summary
+
+
+class EngineLatency:
+    """Think times of one engine, overall and by the ply they were played at."""
+
+    def __init__(self):
+        self.think = LatencyHistogram()
+        # Time left before the deadline when the move arrived.
+        self.margin = LatencyHistogram()
+        self.by_ply: Dict[int, LatencyHistogram] = {}
+        self.near_timeouts = 0
+        self.timeouts = 0
+
+    def record_move(self, ply: int, think_us: int, deadline_us: int):
+        self.think.record(think_us)
+        if ply not in self.by_ply:
+            self.by_ply[ply] = LatencyHistogram()
+        self.by_ply[ply].record(think_us)
+
+        margin_us = deadline_us - think_us
+        self.margin.record(margin_us)
+        if margin_us < NEAR_TIMEOUT_FRACTION * deadline_us:
+            self.near_timeouts += 1
+
+    def record_timeout(self):
+        self.timeouts += 1
+
+    def merge(self, other: "EngineLatency"):
+        self.think.merge(other.think)
+        self.margin.merge(other.margin)
+        for ply, histogram in other.by_ply.items():
+            if ply not in self.by_ply:
+                self.by_ply[ply] = LatencyHistogram()
+            self.by_ply[ply].merge(histogram)
+        self.near_timeouts += other.near_timeouts
+        self.timeouts += other.timeouts
+
+    def to_json(self) -> Dict[str, Any]:
+        return {
+            "moves": self.think.count,
+            "timeouts": self.timeouts,
+            "near_timeouts": self.near_timeouts,
+            "think": self.think.summary(0.5, 0.95, 0.99),
+            # The low tail is what matters for the margin.
+            "deadline_margin": self.margin.summary(0.01, 0.05, 0.5),
+            "think_by_ply": {
+                str(ply): self.by_ply[ply].summary(0.5, 0.95, 0.99)
+                for ply in sorted(self.by_ply)
+            },
+        }
+
+
+class LatencyTelemetry:
+    """EngineLatency for every engine in a run, keyed by engine id."""
+
+    def __init__(self):
+        self.engines: Dict[int, EngineLatency] = {}
+
+    def engine(self, engine_id: int) -> EngineLatency:
+        if engine_id not in self.engines:
+            self.engines[engine_id] = EngineLatency()
+        return self.engines[engine_id]
+
+    def record_move(
+        self, engine_id: int, ply: int, think_us: int, time_per_move: timedelta
+    ):
+        deadline_us = time_per_move // timedelta(microseconds=1)
+        self.engine(engine_id).record_move(ply, think_us, deadline_us)
+
+    def record_timeout(self, engine_id: int):
+        self.engine(engine_id).record_timeout()
+
+    def merge(self, other: "LatencyTelemetry"):
+        for engine_id, latency in other.engines.items():
+            self.engine(engine_id).merge(latency)
+
+    def to_json(self, names: Optional[Dict[int, str]] = None) -> Dict[str, Any]:
+        """Per-engine summaries, labelled by `names` where given."""
+        names = names or {}
+        return {
+            "engines": [
+                {
+                    "id": engine_id,
+                    "name": names.get(engine_id, str(engine_id)),
+                    **self.engines[engine_id].to_json(),
+                }
+                for engine_id in sorted(self.engines)
+            ]
+        }
+
+    def write_json(self, path: str, names: Optional[Dict[int, str]] = None):
+        with open(path, "w") as f:
+            json.dump(self.to_json(names), f, indent=2)
+            f.write("\n")
@@ -0,0 +1,172 @@
+import subprocess
+import threading
+import time
+from collections import deque
+from datetime import timedelta
+from typing import Deque, Dict, List, Optional, Union
+import runner.codec as codec
+from runner.transport import STDIO, spawn
+
+
+class MultiplexedEngine:
+    """One engine process playing any number of games at once over one connection.
+
+    Every game is a GameChannel with its own game id, which run_one drives
+    like an EngineContainer, so games can be refereed concurrently from
+    separate threads. Messages are tagged with the game id (see SPEC.md), so
+    the engine must understand them; any engine built on engine_main does.
+
+    The engine plays its games one message at a time. A game's think time
+    as seen by the referee therefore includes waiting behind the engine's
+    other games, so keep the concurrency low enough for time_per_move.
+    """
+
+    def __init__(self, args: List[str], transport: str = STDIO):
+        self.args = args
+        self._engine, self._transport = spawn(args, transport)
+        # Guards the transport's sending side and the buffer messages are
+        # encoded into.
+        self._write_lock = threading.Lock()
+        self._send_buffer = codec.SendBuffer()
+
+        # Guards everything below. Only one thread reads the engine at a time;
+        # it hands every message to its game's inbox and wakes the others.
+        self._decoder = codec.FrameDecoder()
+        self._lock = threading.Lock()
+        self._arrived = threading.Condition(self._lock)
+        self._reading = False
+        self._exited = False
+        # Keyed like frames, though version 1 (None) frames are never routed.
+        self._inboxes: Dict[Optional[int], Deque[codec.AnyMessage]] = {}
+        self._free_ids: List[int] = []
+        self._next_id = 0
+
+    def healthy(self) -> bool:
+        return not self._exited and self._engine.poll() is None
+
+    def channel(self) -> "GameChannel":
+        """A new game slot on this engine."""
+        return GameChannel(self, self._open_id())
+
+    def _open_id(self) -> int:
+        with self._lock:
+            if self._free_ids:
+                game_id = self._free_ids.pop()
+            elif self._next_id <= codec.MAX_GAME_ID:
+                game_id = self._next_id
+                self._next_id += 1
+            else:
+                raise RuntimeError(f"{self.args} has run out of game ids")
+
+            self._inboxes[game_id] = deque()
+            return game_id
+
+    def _close_id(self, game_id: int, reusable: bool):
+        with self._lock:
+            del self._inboxes[game_id]
+            if reusable:
+                self._free_ids.append(game_id)
+
+    def _send(self, msg: Union[codec.MoveMsg, codec.ParamsMsg]):
+        with self._write_lock:
+            self._transport.send(self._send_buffer.encode(msg))
+
+    def _receive(
+        self, game_id: int, timeout: Optional[timedelta]
+    ) -> codec.AnyMessage:
+        deadline = None
+        if timeout is not None:
+            deadline = time.monotonic() + timeout.total_seconds()
+
+        with self._lock:
+            inbox = self._inboxes[game_id]
+            while not inbox:
+                if self._exited:
+                    raise EOFError(f"{self.args} exited")
+
+                remaining = None
+                if deadline is not None:
+                    remaining = max(deadline - time.monotonic(), 0)
+
+                if self._reading:
+                    if not self._arrived.wait(remaining) and not inbox:
+                        raise TimeoutError(
+                            f"No reply from {self.args} within {timeout}"
+                        )
+                    continue
+
+                self._reading = True
+                self._lock.release()
+                try:
+                    chunk = self._transport.recv(remaining)
+                finally:
+                    self._lock.acquire()
+                    self._reading = False
+                    self._arrived.notify_all()
+
+                if chunk is None:
+                    raise TimeoutError(f"No reply from {self.args} within {timeout}")
+                if not chunk:
+                    self._exited = True
+                    continue
+
+                for frame_id, message in self._decoder.feed_frames(chunk):
+                    # Replies to abandoned games have no inbox and are dropped.
+                    frame_inbox = self._inboxes.get(frame_id)
+                    if frame_inbox is not None:
+                        frame_inbox.append(message)
+
+            return inbox.popleft()
+
+    def kill(self):
+        if self._engine.poll() is None:
+            self._engine.kill()
+        self._engine.wait()
+
+    def close(self, grace: timedelta = timedelta(seconds=1)):
+        """Close our end of the transport so the engine exits, killing it if
+        it lingers."""
+        self._transport.close()
+
+        try:
+            self._engine.wait(grace.total_seconds())
+        except subprocess.TimeoutExpired:
+            self.kill()
+
+
+class GameChannel:
+    """One game slot on a MultiplexedEngine, used like an EngineContainer.
+
+    A game that times out is abandoned: the next game on this channel gets a
+    fresh id, so a late reply to the old one cannot be taken for its own.
+    """
+
+    def __init__(self, engine: MultiplexedEngine, game_id: int):
+        self.args = engine.args
+        self.game_id = game_id
+        self._engine = engine
+        self._hung = False
+
+    def healthy(self) -> bool:
+        return not self._hung and self._engine.healthy()
+
+    def read_message(self, timeout: Optional[timedelta] = None):
+        try:
+            return self._engine._receive(self.game_id, timeout)
+        except TimeoutError:
+            self._hung = True
+            raise
+
+    def send_move(self, to_move: codec.Move):
+        self._engine._send(codec.MoveMsg.make(to_move, self.game_id))
+
+    def send_game_params(self, to_make: codec.Params):
+        if self._hung:
+            self._engine._close_id(self.game_id, reusable=False)
+            self.game_id = self._engine._open_id()
+            self._hung = False
+
+        self._engine._send(codec.ParamsMsg.make(to_make, self.game_id))
+
+    def close(self):
+        self._engine._close_id(self.game_id, reusable=not self._hung)
@@ -0,0 +1,153 @@
+import argparse
+from random import Random
+from typing import Iterator, List, Optional, Sequence, Tuple
+
+import runner.codec as codec
+from engine.alpha_beta_engine import evaluate
+from engine.game_board import GameBoard, GameState, NUM_COLS, mirror_key
+
+# An opening is the columns played so far, from the empty board.
+Opening = Tuple[int, ...]
+
+# Largest static evaluation, for the side to move, of a generated opening.
+DEFAULT_MAX_IMBALANCE = 4
+
+
+def parse_opening(text: str) -> Opening:
+    """Columns written as digits, e.g. "3323" for 3, 3, 2, 3."""
+    if not all(c.isdigit() and int(c) < NUM_COLS for c in text):
+        raise ValueError(f"{text!r} is not a string of columns 0-{NUM_COLS - 1}")
+    return tuple(int(c) for c in text)
+
+
+def format_opening(opening: Sequence[int]) -> str:
+    return "".join(str(c) for c in opening)
+
+
+def replay(opening: Sequence[int]) -> GameBoard:
+    """The board after `opening`, which must leave the game ongoing.
+
+    Raises ValueError for a move into a full column, or one that ends the
+    game.
+    """
+    board = GameBoard()
+    for ply, col in enumerate(opening):
+        if not 0 <= col < NUM_COLS or board.column_space(col) == 0:
+            raise ValueError(f"Illegal move {col} at ply {ply} of {opening}")
+        board.make_move(codec.Move(col))
+        if board.state() != GameState.ONGOING:
+            raise ValueError(f"{opening} ends the game at ply {ply}")
+    return board
+
+
+def load_openings(path: str) -> List[Opening]:
+    """One opening per line; blank lines and lines starting with # skipped."""
+    openings: List[Opening] = []
+    with open(path) as f:
+        for line_number, line in enumerate(f, 1):
+            line = line.strip()
+            if not line or line.startswith("#"):
+                continue
+            try:
+                opening = parse_opening(line)
+                replay(opening)
+            except ValueError as e:
+                raise ValueError(f"{path}:{line_number}: {e}") from None
+            openings.append(opening)
+    return openings
+
+
+def write_openings(path: str, openings: Sequence[Sequence[int]]):
+    with open(path, "w") as f:
+        for opening in openings:
+            f.write(format_opening(opening) + "\n")
+
+
+def _immediate_wins(board: GameBoard) -> int:
+    """How many columns win on the spot for the side to move."""
+    wins = 0
+    for col in board.all_moves():
+        board.make_move(codec.Move(col))
+        wins += board.state() in (GameState.PLAYER_1_WIN, GameState.PLAYER_2_WIN)
+        board.unmake_move()
+    return wins
+
+
+def _is_quiet(board: GameBoard) -> bool:
+    """Neither side can win next move, so the opening hands nobody a tactic."""
+    if _immediate_wins(board):
+        return False
+    board.flip_side_to_move()
+    try:
+        return _immediate_wins(board) == 0
+    finally:
+        board.flip_side_to_move()
+
+
+def _balanced_positions(plies: int, max_imbalance: int) -> Iterator[Opening]:
+    seen: set[int] = set()
+    board = GameBoard()
+
+    def walk() -> Iterator[Opening]:
+        if board.num_moves() == plies:
+            key = board.position_key()
+            key = min(key, mirror_key(key))
+            if key not in seen:
+                seen.add(key)
+                if abs(evaluate(board)) <= max_imbalance and _is_quiet(board):
+                    yield tuple(board.history())
+            return
+
+        for col in board.all_moves():
+            board.make_move(codec.Move(col))
+            if board.state() == GameState.ONGOING:
+                yield from walk()
+            board.unmake_move()
+
+    yield from walk()
+
+
+def generate_openings(
+    plies: int,
+    count: Optional[int] = None,
+    max_imbalance: int = DEFAULT_MAX_IMBALANCE,
+    seed: int = 0,
+) -> List[Opening]:
+    """Distinct `plies`-move openings that favour neither side.
+
+    Mirror images count as one opening. Positions where either side can win
+    at once, or whose static evaluation is more than `max_imbalance` from
+    even, are left out. With `count`, a reproducible sample of that many.
+    """
+    openings = sorted(_balanced_positions(plies, max_imbalance))
+    if count is not None and count < len(openings):
+        openings = sorted(Random(seed).sample(openings, count))
+    return openings
+
+
+def add_opening_args(parser: argparse.ArgumentParser):
+    group = parser.add_mutually_exclusive_group()
+    group.add_argument(
+        "--openings",
+        help="File of start positions, one string of columns per line. \
+                        Each is played twice with colours swapped",
+    )
+    group.add_argument(
+        "--opening-plies",
+        type=int,
+        help="Generate balanced openings of this many moves instead",
+    )
+    parser.add_argument(
+        "--num-openings",
+        type=int,
+        help="With --opening-plies, how many openings to sample",
+    )
+
+
+def openings_from_args(args: argparse.Namespace) -> List[Opening]:
+    """The suite chosen by add_opening_args' flags: empty for none."""
+    if args.openings:
+        return load_openings(args.openings)
+    if args.opening_plies:
+        return generate_openings(args.opening_plies, args.num_openings)
+    return []
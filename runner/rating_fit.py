@@ -0,0 +1,155 @@
+import math
+from dataclasses import dataclass
+from typing import Dict, Iterable, List, Tuple
+
+from engine.game_board import GameState
+from runner.game_record import GameRecord
+
+ELO_PER_NATURAL_LOG = 400 / math.log(10)
+
+
+@dataclass
+class FittedRating:
+    elo: float
+    # Bounds of the confidence interval around `elo`.
+    lower: float
+    upper: float
+
+
+class ResultTable:
+    """Win/draw/loss counts between every pair of engines.
+
+    A GameRecordSink, so run_one and compute_elo can fill it directly.
+    """
+
+    def __init__(self):
+        # (winner, loser) -> games; draws are keyed by the sorted pair.
+        self.wins: Dict[Tuple[int, int], int] = {}
+        self.draws: Dict[Tuple[int, int], int] = {}
+        self.engine_ids: set[int] = set()
+
+    def add_game(self, player1: int, player2: int, result: GameState):
+        self.engine_ids.update((player1, player2))
+
+        if result == GameState.PLAYER_1_WIN:
+            key = (player1, player2)
+            self.wins[key] = self.wins.get(key, 0) + 1
+        elif result == GameState.PLAYER_2_WIN:
+            key = (player2, player1)
+            self.wins[key] = self.wins.get(key, 0) + 1
+        else:
+            key = (min(player1, player2), max(player1, player2))
+            self.draws[key] = self.draws.get(key, 0) + 1
+
+    def append(self, record: GameRecord):
+        self.add_game(record.player1, record.player2, record.result)
+
+    def add_records(self, records: Iterable[GameRecord]):
+        for record in records:
+            self.append(record)
+
+
+def _invert(matrix: List[List[float]]) -> List[List[float]]:
+    """Gauss-Jordan inverse with partial pivoting."""
+    n = len(matrix)
+    aug = [row[:] + [float(i == j) for j in range(n)] for i, row in enumerate(matrix)]
+
+    for col in range(n):
+        pivot = max(range(col, n), key=lambda r: abs(aug[r][col]))
+        if abs(aug[pivot][col]) < 1e-12:
+            raise ValueError("Singular matrix")
+        aug[col], aug[pivot] = aug[pivot], aug[col]
+
+        scale = aug[col][col]
+        aug[col] = [x / scale for x in aug[col]]
+        for r in range(n):
+            if r != col and aug[r][col] != 0:
+                factor = aug[r][col]
+                aug[r] = [x - factor * y for x, y in zip(aug[r], aug[col])]
+
+    return [row[n:] for row in aug]
+
+
+def fit_bradley_terry(
+    table: ResultTable,
+    initial_elo: float = 1500,
+    prior_draws: float = 2,
+    confidence_z: float = 1.96,
+    tolerance: float = 1e-10,
+    max_iterations: int = 100_000,
+) -> Dict[int, FittedRating]:
+    """Maximum-likelihood Bradley-Terry ratings for every engine in `table`.
+
+    Draws count as half a win for each side. Like BayesElo, `prior_draws`
+    virtual draws are added between every pair that played, which keeps
+    ratings finite when one engine won every game. The average rating is
+    pinned to `initial_elo`, and intervals are `confidence_z` standard
+    errors from the observed Fisher information, relative to that average.
+    An empty table has no ratings to fit and gives an empty dict.
+    """
+    ids = sorted(table.engine_ids)
+    n = len(ids)
+    if n == 0:
+        return {}
+    index = {engine_id: i for i, engine_id in enumerate(ids)}
+
+    # Scores and game counts, with draws (real and virtual) split evenly.
+    score = [[0.0] * n for _ in range(n)]
+    for (winner, loser), count in table.wins.items():
+        score[index[winner]][index[loser]] += count
+    for (a, b), count in table.draws.items():
+        score[index[a]][index[b]] += count / 2
+        score[index[b]][index[a]] += count / 2
+    for i in range(n):
+        for j in range(n):
+            if i != j and (score[i][j] or score[j][i]):
+                score[i][j] += prior_draws / 2
+
+    games = [[score[i][j] + score[j][i] for j in range(n)] for i in range(n)]
+    total_score = [sum(row) for row in score]
+
+    # Minorization-maximization (Hunter 2004): each step provably increases
+    # the likelihood, and needs no step size.
+    strength = [1.0] * n
+    for _ in range(max_iterations):
+        updated = []
+        for i in range(n):
+            denominator = sum(
+                games[i][j] / (strength[i] + strength[j])
+                for j in range(n)
+                if games[i][j]
+            )
+            updated.append(total_score[i] / denominator if denominator else 1.0)
+
+        geometric_mean = math.exp(sum(math.log(s) for s in updated) / n)
+        updated = [s / geometric_mean for s in updated]
+
+        converged = max(abs(math.log(u / s)) for u, s in zip(updated, strength))
+        strength = updated
+        if converged < tolerance:
+            break
+
+    log_strength = [math.log(s) for s in strength]
+
+    # The information matrix is a weighted graph Laplacian, singular along
+    # the all-equal direction; (L + J/n)^-1 - J/n is its pseudo-inverse.
+    information = [[0.0] * n for _ in range(n)]
+    for i in range(n):
+        for j in range(n):
+            if i != j and games[i][j]:
+                p = strength[i] / (strength[i] + strength[j])
+                weight = games[i][j] * p * (1 - p)
+                information[i][j] -= weight
+                information[i][i] += weight
+    covariance = _invert([[x + 1 / n for x in row] for row in information])
+
+    ratings: Dict[int, FittedRating] = {}
+    for engine_id, i in index.items():
+        elo = initial_elo + ELO_PER_NATURAL_LOG * log_strength[i]
+        stderr = ELO_PER_NATURAL_LOG * math.sqrt(max(covariance[i][i] - 1 / n, 0))
+        ratings[engine_id] = FittedRating(
+            elo=elo,
+            lower=elo - confidence_z * stderr,
+            upper=elo + confidence_z * stderr,
+        )
+    return ratings
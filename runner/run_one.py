@@ -1,10 +1,17 @@
 import argparse
-from runner.engine_container import EngineContainer
+import asyncio
+import struct
+from runner.adjudication import AdjudicationSettings, adjudicate
+from runner.async_engine_container import AsyncEngineContainer
+from runner.engine_container import Container
+from runner.game_record import EndReason, GameRecord, GameRecordSink
+from runner.latency import LatencyTelemetry
 import engine.game_board as game_board
 from datetime import timedelta
 import runner.codec as codec
 from runner.timer import Timer
 from enum import Enum, auto
+from typing import List, Optional, Sequence, Tuple
 
 
 class GameResult(Enum):
@@ -13,45 +20,232 @@ class GameResult(Enum):
     PLAYER_2_WIN = game_board.GameState.PLAYER_2_WIN
 
 
+def forfeit(player: codec.Player) -> GameResult:
+    if player == codec.Player.PLAYER_1:
+        return GameResult.PLAYER_2_WIN
+    else:
+        return GameResult.PLAYER_1_WIN
+
+
+# EngineContainer, ManagedEngine or InProcessEngine.
+AnyContainer = Container
+
+
 def run_one(
-    player1: EngineContainer,
-    player2: EngineContainer,
+    player1: AnyContainer,
+    player2: AnyContainer,
     time_per_move: timedelta = timedelta(milliseconds=100000),
+    recorder: Optional[GameRecordSink] = None,
+    player_ids: Tuple[int, int] = (0, 1),
+    telemetry: Optional[LatencyTelemetry] = None,
+    opening: Sequence[int] = (),
+    adjudication: Optional[AdjudicationSettings] = None,
 ) -> GameResult:
+    """Referee one game, starting from the position after `opening`.
+
+    If `recorder` is given, the game is appended to it as a GameRecord naming
+    the players by `player_ids`. Likewise each move's think time, and any
+    timeout, is added to `telemetry`. The opening must be legal and leave the
+    game ongoing (see runner.openings.replay). With `adjudication`, the game
+    stops as soon as its result is proven, and is recorded as ADJUDICATED.
+    """
+    moves: List[int] = list(opening)
+    think_times_us: List[int] = [0] * len(opening)
+
+    result, reason = _play_one(
+        player1, player2, time_per_move, moves, think_times_us, adjudication
+    )
+
+    if telemetry is not None:
+        for ply in range(len(opening), len(think_times_us)):
+            telemetry.record_move(
+                player_ids[ply % 2], ply + 1, think_times_us[ply], time_per_move
+            )
+        if reason == EndReason.TIMEOUT:
+            telemetry.record_timeout(player_ids[len(moves) % 2])
+
+    if recorder is not None:
+        recorder.append(
+            GameRecord(
+                player1=player_ids[0],
+                player2=player_ids[1],
+                result=result.value,
+                reason=reason,
+                moves=moves,
+                think_times_us=think_times_us,
+                opening_length=len(opening),
+            )
+        )
+
+    return result
+
+
+def _play_one(
+    player1: AnyContainer,
+    player2: AnyContainer,
+    time_per_move: timedelta,
+    moves: List[int],
+    think_times_us: List[int],
+    adjudication: Optional[AdjudicationSettings] = None,
+) -> Tuple[GameResult, EndReason]:
+    """Play from the position after `moves`, appending each move played."""
     players = {
         codec.Player.PLAYER_1: player1,
         codec.Player.PLAYER_2: player2,
     }
     timer = Timer()
 
-    for player_type, player in players.items():
-        player.send_game_params(
-            codec.Params(your_player=player_type, time_per_move=time_per_move, moves=[])
-        )
-
     board = game_board.GameBoard()
+    for col in moves:
+        board.make_move(codec.Move(col))
+
+    # Adjudicate before either engine is told about a position, so neither
+    # is left thinking about a game that is already over.
+    decided = _adjudicate(board, adjudication)
+    if decided is not None:
+        return decided
+
+    # The side to move replies to its params with a move, so it hears last:
+    # if the other side cannot start, no move is left unread in a pipe to be
+    # taken for the reply to the next game's params.
+    to_move = board.side_to_move()
+    for player_type in (game_board.opposing_player(to_move), to_move):
+        try:
+            players[player_type].send_game_params(
+                codec.Params(
+                    your_player=player_type,
+                    time_per_move=time_per_move,
+                    moves=[codec.Move(col) for col in moves],
+                )
+            )
+        except BrokenPipeError:
+            print(f"Player {player_type} is not running")
+            return forfeit(player_type), EndReason.DISCONNECTED
 
     while board.state() == game_board.GameState.ONGOING:
         friendly = players[board.side_to_move()]
         enemy = players[game_board.opposing_player(board.side_to_move())]
 
         timer.start()
-        move_made = friendly.read_message()
+        try:
+            move_made = friendly.read_message(time_per_move)
+        except TimeoutError:
+            print(f"Player {board.side_to_move()} timed out. Took {timer.stop()}")
+            return forfeit(board.side_to_move()), EndReason.TIMEOUT
+        except EOFError:
+            print(f"Player {board.side_to_move()} exited mid-game.")
+            return forfeit(board.side_to_move()), EndReason.DISCONNECTED
 
         time_taken = timer.stop()
         if time_taken > time_per_move:
             print(f"Player {board.side_to_move()} timed out. Took {time_taken}")
 
-            if board.side_to_move() == game_board.Player.PLAYER_1:
-                return GameResult.PLAYER_2_WIN
-            else:
-                return GameResult.PLAYER_1_WIN
+            return forfeit(board.side_to_move()), EndReason.TIMEOUT
+
+        if (
+            not isinstance(move_made, codec.Move)
+            or move_made.column not in board.all_moves()
+        ):
+            print(f"Player {board.side_to_move()} sent an illegal move {move_made}.")
+            return forfeit(board.side_to_move()), EndReason.ILLEGAL_MOVE
+
+        board.make_move(move_made)
+        moves.append(move_made.column)
+        think_times_us.append(time_taken // timedelta(microseconds=1))
+
+        if board.state() == game_board.GameState.ONGOING:
+            decided = _adjudicate(board, adjudication)
+            if decided is not None:
+                return decided
+
+            try:
+                enemy.send_move(move_made)
+            except BrokenPipeError:
+                print(f"Player {board.side_to_move()} exited mid-game.")
+                return forfeit(board.side_to_move()), EndReason.DISCONNECTED
+
+    return GameResult(board.state()), EndReason.COMPLETED
+
+
+def _adjudicate(
+    board: game_board.GameBoard, adjudication: Optional[AdjudicationSettings]
+) -> Optional[Tuple[GameResult, EndReason]]:
+    """The adjudicated result of an ongoing game, if it is decided."""
+    if adjudication is None:
+        return None
+
+    decided = adjudicate(board, adjudication)
+    if decided is None:
+        return None
+
+    print(f"Adjudicated after {board.num_moves()} moves: {decided.reason}.")
+    return GameResult(decided.result), EndReason.ADJUDICATED
+
+
+async def async_run_one(
+    player1: AsyncEngineContainer,
+    player2: AsyncEngineContainer,
+    time_per_move: timedelta = timedelta(milliseconds=100000),
+) -> GameResult:
+    """run_one for AsyncEngineContainers, enforcing time_per_move as a deadline.
+
+    An engine that times out, dies, or sends anything but a legal move
+    forfeits immediately and is killed, since its pipe can no longer be
+    trusted to be in sync with the protocol.
+    """
+    players = {
+        codec.Player.PLAYER_1: player1,
+        codec.Player.PLAYER_2: player2,
+    }
+
+    # Player 1 replies to its params with a move, so hears last, as in
+    # _play_one.
+    for player_type in (codec.Player.PLAYER_2, codec.Player.PLAYER_1):
+        player = players[player_type]
+        try:
+            await player.send_game_params(
+                codec.Params(
+                    your_player=player_type, time_per_move=time_per_move, moves=[]
+                )
+            )
+        except ConnectionError:
+            print(f"Player {player_type} is not running")
+            await player.kill()
+            return forfeit(player_type)
+
+    board = game_board.GameBoard()
+
+    while board.state() == game_board.GameState.ONGOING:
+        friendly = players[board.side_to_move()]
+        enemy = players[game_board.opposing_player(board.side_to_move())]
+
+        try:
+            move_made = await friendly.read_message(time_per_move)
+        except asyncio.TimeoutError:
+            print(f"Player {board.side_to_move()} timed out.")
+            await friendly.kill()
+            return forfeit(board.side_to_move())
+        except (asyncio.IncompleteReadError, ValueError, struct.error):
+            print(f"Player {board.side_to_move()} sent a malformed message.")
+            await friendly.kill()
+            return forfeit(board.side_to_move())
 
-        assert isinstance(move_made, codec.Move)
+        if (
+            not isinstance(move_made, codec.Move)
+            or move_made.column not in board.all_moves()
+        ):
+            print(f"Player {board.side_to_move()} sent an illegal move {move_made}.")
+            await friendly.kill()
+            return forfeit(board.side_to_move())
 
         board.make_move(move_made)
 
         if board.state() == game_board.GameState.ONGOING:
-            enemy.send_move(move_made)
+            try:
+                await enemy.send_move(move_made)
+            except ConnectionError:
+                print(f"Player {board.side_to_move()} exited mid-game.")
+                await enemy.kill()
+                return forfeit(board.side_to_move())
 
     return GameResult(board.state())
@@ -3,38 +3,95 @@ import runner.engine_container as engine_container
 import engine.game_board as game_board
 from datetime import timedelta
 import runner.codec as codec
+from runner.adjudication import (
+    AdjudicationSettings,
+    adjudicate,
+    add_adjudication_args,
+    adjudication_from_args,
+)
+from runner.latency import LatencyTelemetry
+from runner.openings import parse_opening, replay
 from runner.timer import Timer
+from typing import Optional
+from runner.transport import add_transport_args
+
+
+def _is_decided(
+    board: game_board.GameBoard, adjudication: Optional[AdjudicationSettings]
+) -> bool:
+    if adjudication is None:
+        return False
+
+    decided = adjudicate(board, adjudication)
+    if decided is None:
+        return False
+
+    print(f"Adjudicated: {decided.reason}. Result {decided.result.name}")
+    return True
 
 
 def main(args: argparse.Namespace):
     print(f"{args=}")
     timeout = timedelta(milliseconds=args.timeout)
     timer = Timer()
+    telemetry = LatencyTelemetry()
+    player_ids = {codec.Player.PLAYER_1: 0, codec.Player.PLAYER_2: 1}
+    adjudication = adjudication_from_args(args)
 
     players = {
-        codec.Player.PLAYER_1: engine_container.EngineContainer(args.player1),
-        codec.Player.PLAYER_2: engine_container.EngineContainer(args.player2),
+        codec.Player.PLAYER_1: engine_container.EngineContainer(
+            args.player1, args.transport
+        ),
+        codec.Player.PLAYER_2: engine_container.EngineContainer(
+            args.player2, args.transport
+        ),
     }
 
-    for player_type, player in players.items():
-        player.send_game_params(
-            codec.Params(your_player=player_type, time_per_move=timeout, moves=[])
-        )
+    opening = parse_opening(args.opening)
+    board = replay(opening)
+
+    if opening:
+        print(f"Starting from opening {args.opening}\n{board}")
 
-    board = game_board.GameBoard()
+    # Adjudicate before an engine is sent each position, so neither is left
+    # thinking about a game that is already over.
+    game_over = _is_decided(board, adjudication)
 
-    while board.state() == game_board.GameState.ONGOING:
+    if not game_over:
+        for player_type, player in players.items():
+            player.send_game_params(
+                codec.Params(
+                    your_player=player_type,
+                    time_per_move=timeout,
+                    moves=[codec.Move(col) for col in opening],
+                )
+            )
+
+    while not game_over and board.state() == game_board.GameState.ONGOING:
         friendly = players[board.side_to_move()]
         enemy = players[game_board.opposing_player(board.side_to_move())]
 
         timer.start()
-        move_made = friendly.read_message()
+        try:
+            move_made = friendly.read_message(timeout)
+        except TimeoutError:
+            print(f"Player {board.side_to_move()} timed out. Took {timer.stop()}")
+            telemetry.record_timeout(player_ids[board.side_to_move()])
+            break
 
         time_taken = timer.stop()
         if time_taken > timeout:
             print(f"Player {board.side_to_move()} timed out. Took {time_taken}")
+            telemetry.record_timeout(player_ids[board.side_to_move()])
             break
 
+        telemetry.record_move(
+            player_ids[board.side_to_move()],
+            board.num_moves() + 1,
+            time_taken // timedelta(microseconds=1),
+            timeout,
+        )
+
         assert isinstance(move_made, codec.Move)
 
         player_name = (
@@ -48,7 +105,15 @@ def main(args: argparse.Namespace):
         print(f"{board}")
 
         if board.state() == game_board.GameState.ONGOING:
-            enemy.send_move(move_made)
+            game_over = _is_decided(board, adjudication)
+            if not game_over:
+                enemy.send_move(move_made)
+
+    if args.latency_json:
+        telemetry.write_json(
+            args.latency_json,
+            {0: " ".join(args.player1), 1: " ".join(args.player2)},
+        )
 
 
 def parse_args():
@@ -79,6 +144,18 @@ def parse_args():
     parser.add_argument(
         "--player2", "-p2", required=True, nargs="+", help="See --player1"
     )
+    parser.add_argument(
+        "--opening",
+        default="",
+        help="Start from the position after these columns, e.g. 3323",
+    )
+    add_adjudication_args(parser)
+    add_transport_args(parser)
+    parser.add_argument(
+        "--latency-json",
+        help="Write each player's think time percentiles, deadline margins \
+                        and timeout counts to this JSON file at the end",
+    )
 
     return parser.parse_args()
 
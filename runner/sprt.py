@@ -0,0 +1,134 @@
+import math
+from dataclasses import dataclass
+from datetime import timedelta
+from enum import Enum
+from typing import Callable, Optional, Sequence
+
+from runner.adjudication import AdjudicationSettings
+from runner.elo_cli import MatchResult, run_match
+from runner.game_record import GameRecordSink
+from runner.openings import Opening
+from runner.run_one import AnyContainer
+
+# Pseudo-count added to each outcome when estimating the score variance, so
+# that a run of identical results has a finite, conservative LLR instead of
+# a zero variance.
+OUTCOME_PSEUDO_COUNT = 0.5
+
+
+class SprtOutcome(Enum):
+    # H1 accepted: the candidate is at least elo1 stronger.
+    ACCEPT = "accept"
+    # H0 accepted: the candidate is at most elo0 stronger.
+    REJECT = "reject"
+    # max_games ran out before either bound was crossed.
+    INCONCLUSIVE = "inconclusive"
+
+
+@dataclass
+class SprtSettings:
+    elo0: float = 0
+    elo1: float = 5
+    alpha: float = 0.05
+    beta: float = 0.05
+    max_games: int = 20_000
+
+    def lower_bound(self) -> float:
+        return math.log(self.beta / (1 - self.alpha))
+
+    def upper_bound(self) -> float:
+        return math.log((1 - self.beta) / self.alpha)
+
+
+@dataclass
+class SprtResult:
+    outcome: SprtOutcome
+    # From the candidate's perspective.
+    totals: MatchResult
+    llr: float
+    lower_bound: float
+    upper_bound: float
+
+    def games(self) -> int:
+        return self.totals.wins + self.totals.draws + self.totals.losses
+
+
+def expected_score(elo: float) -> float:
+    return 1 / (1 + 10 ** (-elo / 400))
+
+
+def log_likelihood_ratio(totals: MatchResult, elo0: float, elo1: float) -> float:
+    """Generalized SPRT log-likelihood ratio of H1 (elo1) over H0 (elo0).
+
+    Uses the normal approximation to the trinomial score distribution, with
+    the variance estimated from the games so far.
+    """
+    wins = totals.wins + OUTCOME_PSEUDO_COUNT
+    draws = totals.draws + OUTCOME_PSEUDO_COUNT
+    losses = totals.losses + OUTCOME_PSEUDO_COUNT
+    games = wins + draws + losses
+
+    score = (wins + 0.5 * draws) / games
+    variance = (
+        wins * (1 - score) ** 2 + draws * (0.5 - score) ** 2 + losses * score**2
+    ) / games
+
+    s0, s1 = expected_score(elo0), expected_score(elo1)
+    return games * (s1 - s0) * (2 * score - s0 - s1) / (2 * variance)
+
+
+def sprt(
+    candidate: AnyContainer,
+    baseline: AnyContainer,
+    settings: SprtSettings,
+    time_per_move: timedelta = timedelta(milliseconds=100),
+    recorder: Optional[GameRecordSink] = None,
+    on_pair: Optional[Callable[[SprtResult], None]] = None,
+    openings: Sequence[Opening] = (),
+    adjudication: Optional[AdjudicationSettings] = None,
+) -> SprtResult:
+    """Play colour-swapped game pairs until the LLR crosses a bound.
+
+    Pairs start from each of `openings` in turn, if given, and games are
+    adjudicated per `adjudication`. `on_pair`, if given, sees the running
+    state after every pair.
+    """
+    totals = MatchResult()
+    lower, upper = settings.lower_bound(), settings.upper_bound()
+    llr = 0.0
+    num_pairs = 0
+
+    while totals.wins + totals.draws + totals.losses < settings.max_games:
+        opening = openings[num_pairs % len(openings)] if openings else ()
+        num_pairs += 1
+
+        # run_match reports from its first player's perspective.
+        pair = run_match(
+            candidate,
+            baseline,
+            recorder,
+            (0, 1),
+            time_per_move,
+            opening=opening,
+            adjudication=adjudication,
+        )
+        totals.wins += pair.wins
+        totals.draws += pair.draws
+        totals.losses += pair.losses
+
+        llr = log_likelihood_ratio(totals, settings.elo0, settings.elo1)
+
+        if llr >= upper:
+            outcome = SprtOutcome.ACCEPT
+        elif llr <= lower:
+            outcome = SprtOutcome.REJECT
+        else:
+            outcome = SprtOutcome.INCONCLUSIVE
+
+        result = SprtResult(outcome, totals, llr, lower, upper)
+        if on_pair is not None:
+            on_pair(result)
+        if outcome != SprtOutcome.INCONCLUSIVE:
+            return result
+
+    return SprtResult(SprtOutcome.INCONCLUSIVE, totals, llr, lower, upper)
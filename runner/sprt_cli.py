@@ -0,0 +1,99 @@
+import argparse
+from datetime import timedelta
+
+from runner.adjudication import add_adjudication_args, adjudication_from_args
+from runner.engine_pool import EnginePool
+from runner.game_record import GameRecordWriter
+from runner.openings import add_opening_args, openings_from_args
+from runner.sprt import SprtResult, SprtSettings, sprt
+from runner.transport import add_transport_args
+
+
+def print_progress(result: SprtResult):
+    totals = result.totals
+    print(
+        f"games={result.games()} W={totals.wins} D={totals.draws} "
+        f"L={totals.losses} LLR={result.llr:.2f} "
+        f"[{result.lower_bound:.2f}, {result.upper_bound:.2f}]"
+    )
+
+
+def main(args: argparse.Namespace):
+    settings = SprtSettings(
+        elo0=args.elo0,
+        elo1=args.elo1,
+        alpha=args.alpha,
+        beta=args.beta,
+        max_games=args.max_games,
+    )
+    writer = GameRecordWriter(args.record) if args.record else None
+
+    with EnginePool(transport=args.transport) as pool:
+        result = sprt(
+            pool.engine(args.candidate),
+            pool.engine(args.baseline),
+            settings,
+            time_per_move=timedelta(milliseconds=args.timeout),
+            recorder=writer,
+            on_pair=print_progress if args.verbose else None,
+            openings=openings_from_args(args),
+            adjudication=adjudication_from_args(args),
+        )
+
+    if writer is not None:
+        writer.close()
+
+    print_progress(result)
+    print(f"Result: {result.outcome.value}")
+
+
+def parse_args() -> argparse.Namespace:
+    parser = argparse.ArgumentParser(
+        formatter_class=argparse.ArgumentDefaultsHelpFormatter,
+        description="Sequential probability ratio test of a candidate engine \
+                        against a baseline. accept means the candidate is at \
+                        least elo1 stronger, reject that it is at most elo0 \
+                        stronger.",
+    )
+
+    parser.add_argument(
+        "--candidate", "-c", nargs="+", required=True, help="The new engine"
+    )
+    parser.add_argument(
+        "--baseline", "-b", nargs="+", required=True, help="The engine to beat"
+    )
+    parser.add_argument("--elo0", type=float, default=0, help="Elo under H0")
+    parser.add_argument("--elo1", type=float, default=5, help="Elo under H1")
+    parser.add_argument(
+        "--alpha", type=float, default=0.05, help="False positive rate"
+    )
+    parser.add_argument(
+        "--beta", type=float, default=0.05, help="False negative rate"
+    )
+    parser.add_argument(
+        "--max-games",
+        type=int,
+        default=20_000,
+        help="Stop with an inconclusive result after this many games",
+    )
+    parser.add_argument(
+        "-t",
+        "--timeout",
+        type=int,
+        default=100,
+        help="The allowed delay between receiving and responding \
+                        to a message",
+    )
+    add_opening_args(parser)
+    add_adjudication_args(parser)
+    add_transport_args(parser)
+    parser.add_argument("--record", help="Append every game to this record file")
+    parser.add_argument(
+        "--verbose", "-v", action="store_true", help="Print the LLR after every pair"
+    )
+
+    return parser.parse_args()
+
+
+if __name__ == "__main__":
+    main(parse_args())
@@ -0,0 +1,331 @@
+import argparse
+import mmap
+import os
+import select
+import socket
+import struct
+import subprocess
+import time
+from typing import Callable, Dict, List, Optional, Protocol, Tuple
+
+from runner.codec import Buffer
+
+# Tells an engine started by the runner how to reach it, as
+# "<kind>:<comma-separated file descriptors>". Engines started without it
+# talk over stdin and stdout, as the protocol has always had them do.
+TRANSPORT_ENV = "CONNECT4_TRANSPORT"
+
+STDIO = "stdio"
+UNIX = "unix"
+SHM = "shm"
+TRANSPORTS = (STDIO, UNIX, SHM)
+
+READ_CHUNK_SIZE = 4096
+
+# Shared-memory layout: two rings, runner to engine then engine to runner.
+# Each is RING_HEADER followed by RING_CAPACITY bytes of data. The counts
+# are running totals, so the ring is empty when they are equal.
+# bytes written, bytes read, writer has closed
+RING_HEADER = struct.Struct("<QQI4x")
+RING_CAPACITY = 1 << 16
+RING_SIZE = RING_HEADER.size + RING_CAPACITY
+_COUNT = struct.Struct("<Q")
+_READ_COUNT_OFFSET = 8
+_CLOSED_OFFSET = 16
+
+# How often a reader blocked on shared memory checks that its peer is alive.
+LIVENESS_INTERVAL = 0.05
+
+
+class Transport(Protocol):
+    """A byte stream to or from an engine; framing is left to the codec."""
+
+    def send(self, data: Buffer) -> None: ...
+
+    def recv(self, timeout: Optional[float] = None) -> Optional[bytes]:
+        """Some bytes, b"" once the peer has gone, or None if nothing
+        arrives within `timeout` seconds."""
+        ...
+
+    def close(self) -> None:
+        """Tell the peer no more data is coming."""
+        ...
+
+
+def _wait_readable(fd: int, timeout: Optional[float]) -> bool:
+    if timeout is None:
+        return True
+    ready, _, _ = select.select([fd], [], [], timeout)
+    return bool(ready)
+
+
+class PipeTransport:
+    def __init__(self, read_fd: int, write_fd: int):
+        self._read_fd = read_fd
+        self._write_fd = write_fd
+
+    def send(self, data: Buffer):
+        os.write(self._write_fd, data)
+
+    def recv(self, timeout: Optional[float] = None) -> Optional[bytes]:
+        if not _wait_readable(self._read_fd, timeout):
+            return None
+        return os.read(self._read_fd, READ_CHUNK_SIZE)
+
+    def close(self):
+        os.close(self._write_fd)
+
+
+class _OwnedPipeTransport(PipeTransport):
+    """PipeTransport over a Popen's own stdin and stdout."""
+
+    def __init__(self, process: subprocess.Popen[bytes]):
+        assert process.stdin and process.stdout
+        super().__init__(process.stdout.fileno(), process.stdin.fileno())
+        self._stdin = process.stdin
+
+    def close(self):
+        try:
+            self._stdin.close()
+        except BrokenPipeError:
+            pass
+
+
+class SocketTransport:
+    def __init__(self, sock: socket.socket):
+        self._socket = sock
+
+    def send(self, data: Buffer):
+        self._socket.sendall(data)
+
+    def recv(self, timeout: Optional[float] = None) -> Optional[bytes]:
+        if not _wait_readable(self._socket.fileno(), timeout):
+            return None
+        try:
+            return self._socket.recv(READ_CHUNK_SIZE)
+        except ConnectionResetError:
+            return b""
+
+    def close(self):
+        try:
+            self._socket.shutdown(socket.SHUT_WR)
+        except OSError:
+            pass
+
+
+class _Ring:
+    """One direction of a SharedMemoryTransport: a single-producer,
+    single-consumer byte ring inside a shared mapping."""
+
+    def __init__(self, memory: mmap.mmap, offset: int):
+        self._memory = memory
+        self._header = offset
+        self._data = offset + RING_HEADER.size
+
+    def _counts(self) -> Tuple[int, int, int]:
+        return RING_HEADER.unpack_from(self._memory, self._header)
+
+    def has_room(self, size: int) -> bool:
+        written, read, _ = self._counts()
+        return RING_CAPACITY - (written - read) >= size
+
+    def write(self, data: Buffer):
+        """Append `data`, which the caller has checked there is room for."""
+        written, _, _ = self._counts()
+        start = written % RING_CAPACITY
+        first = min(len(data), RING_CAPACITY - start)
+        memory, base = self._memory, self._data
+        memory[base + start : base + start + first] = data[:first]
+        memory[base : base + len(data) - first] = data[first:]
+        # Publish the data only once it is all in place.
+        _COUNT.pack_into(memory, self._header, written + len(data))
+
+    def read(self) -> Optional[bytes]:
+        """Everything unread; b"" if the writer has closed, None if empty."""
+        written, read, closed = self._counts()
+        if written == read:
+            return b"" if closed else None
+
+        start = read % RING_CAPACITY
+        end = start + (written - read)
+        memory, base = self._memory, self._data
+        if end <= RING_CAPACITY:
+            data = memory[base + start : base + end]
+        else:
+            data = memory[base + start : base + RING_CAPACITY] + memory[
+                base : base + end - RING_CAPACITY
+            ]
+        _COUNT.pack_into(memory, self._header + _READ_COUNT_OFFSET, written)
+        return data
+
+    def mark_closed(self):
+        struct.pack_into("<I", self._memory, self._header + _CLOSED_OFFSET, 1)
+
+
+class SharedMemoryTransport:
+    """Messages through rings in shared memory, with eventfds to wake the
+    reader, so a message costs one small syscall each way instead of a pipe
+    write and read.
+
+    Shared memory has no end-of-stream of its own: the writer sets a closed
+    flag, and a blocked reader checks `peer_alive` every LIVENESS_INTERVAL.
+    """
+
+    def __init__(
+        self,
+        memory: mmap.mmap,
+        outgoing: int,
+        incoming: int,
+        send_event: int,
+        recv_event: int,
+        peer_alive: Callable[[], bool],
+    ):
+        self._memory = memory
+        self._outgoing = _Ring(memory, outgoing * RING_SIZE)
+        self._incoming = _Ring(memory, incoming * RING_SIZE)
+        self._send_event = send_event
+        self._recv_event = recv_event
+        self._peer_alive = peer_alive
+        self._poller = select.poll()
+        self._poller.register(recv_event, select.POLLIN)
+
+    def send(self, data: Buffer):
+        while not self._outgoing.has_room(len(data)):
+            # Messages are tiny, so the ring only fills if the reader is far
+            # behind or gone; poll for room rather than add a second signal.
+            if not self._peer_alive():
+                raise BrokenPipeError("The other end of the transport has exited")
+            time.sleep(0.0001)
+        self._outgoing.write(data)
+        os.eventfd_write(self._send_event, 1)
+
+    def recv(self, timeout: Optional[float] = None) -> Optional[bytes]:
+        deadline = None if timeout is None else time.monotonic() + timeout
+        while True:
+            data = self._incoming.read()
+            if data is not None:
+                return data
+
+            wait = LIVENESS_INTERVAL
+            if deadline is not None:
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    return None
+                wait = min(wait, remaining)
+
+            if self._poller.poll(wait * 1000):
+                try:
+                    os.eventfd_read(self._recv_event)
+                except BlockingIOError:
+                    pass
+            elif not self._peer_alive():
+                # Anything sent just before the peer went is still returned.
+                return self._incoming.read() or b""
+
+    def close(self):
+        self._outgoing.mark_closed()
+        os.eventfd_write(self._send_event, 1)
+
+    def __del__(self):
+        # The mapping goes with its mmap object, but the eventfds are bare
+        # descriptors, and a long tournament replaces many engines.
+        for fd in (self._send_event, self._recv_event):
+            try:
+                os.close(fd)
+            except OSError:
+                pass
+
+
+def spawn(
+    args: List[str], transport: str = STDIO
+) -> Tuple[subprocess.Popen[bytes], Transport]:
+    """Start an engine and connect to it over `transport`."""
+    if transport == STDIO:
+        process = subprocess.Popen(
+            args,
+            stdin=subprocess.PIPE,
+            stdout=subprocess.PIPE,
+            bufsize=0,
+            start_new_session=True,
+        )
+        return process, _OwnedPipeTransport(process)
+
+    env = dict(os.environ)
+    if transport == UNIX:
+        ours, theirs = socket.socketpair(socket.AF_UNIX, socket.SOCK_STREAM)
+        env[TRANSPORT_ENV] = f"{UNIX}:{theirs.fileno()}"
+        with theirs:
+            process = _start(args, env, [theirs.fileno()])
+        return process, SocketTransport(ours)
+
+    if transport == SHM:
+        memory_fd = os.memfd_create("connect4-transport")
+        os.ftruncate(memory_fd, 2 * RING_SIZE)
+        memory = mmap.mmap(memory_fd, 2 * RING_SIZE)
+        to_engine = os.eventfd(0, os.EFD_NONBLOCK)
+        to_runner = os.eventfd(0, os.EFD_NONBLOCK)
+
+        fds = [memory_fd, to_engine, to_runner]
+        env[TRANSPORT_ENV] = f"{SHM}:" + ",".join(str(fd) for fd in fds)
+        try:
+            process = _start(args, env, fds)
+        finally:
+            os.close(memory_fd)
+        return process, SharedMemoryTransport(
+            memory,
+            outgoing=0,
+            incoming=1,
+            send_event=to_engine,
+            recv_event=to_runner,
+            peer_alive=lambda: process.poll() is None,
+        )
+
+    raise ValueError(f"Unknown transport {transport!r}, expected one of {TRANSPORTS}")
+
+
+def _start(
+    args: List[str], env: Dict[str, str], fds: List[int]
+) -> subprocess.Popen[bytes]:
+    return subprocess.Popen(
+        args,
+        stdin=subprocess.DEVNULL,
+        pass_fds=fds,
+        env=env,
+        start_new_session=True,
+    )
+
+
+def add_transport_args(parser: argparse.ArgumentParser):
+    parser.add_argument(
+        "--transport",
+        choices=TRANSPORTS,
+        default=STDIO,
+        help="How to exchange messages with engine processes: stdin/stdout \
+                        pipes, a Unix socket pair, or rings in shared memory. \
+                        Engines must be built on engine_main for unix and shm",
+    )
+
+
+def engine_transport() -> Transport:
+    """The engine's end of whatever transport the runner started it with."""
+    spec = os.environ.get(TRANSPORT_ENV, STDIO)
+    kind, _, fds_text = spec.partition(":")
+    fds = [int(fd) for fd in fds_text.split(",")] if fds_text else []
+
+    if kind == STDIO:
+        return PipeTransport(0, 1)
+    if kind == UNIX:
+        return SocketTransport(socket.socket(fileno=fds[0]))
+    if kind == SHM:
+        memory_fd, to_engine, to_runner = fds
+        parent = os.getppid()
+        return SharedMemoryTransport(
+            mmap.mmap(memory_fd, 2 * RING_SIZE),
+            outgoing=1,
+            incoming=0,
+            send_event=to_runner,
+            recv_event=to_engine,
+            peer_alive=lambda: os.getppid() == parent,
+        )
+
+    raise ValueError(f"Unknown {TRANSPORT_ENV} {spec!r}")
@@ -0,0 +1,116 @@
+import sys
+import unittest
+from datetime import timedelta
+
+import runner.codec as codec
+from engine.game_board import GameBoard, GameState
+from runner.adjudication import AdjudicationSettings, adjudicate
+from runner.engine_container import EngineContainer
+from runner.game_record import EndReason, GameRecord
+from runner.run_one import GameResult, run_one
+
+RANDOM_ENGINE = [sys.executable, "-m", "engine.random_engine"]
+
+
+def board_after(columns: str) -> GameBoard:
+    board = GameBoard()
+    for c in columns:
+        board.make_move(codec.Move(int(c)))
+    return board
+
+
+class AdjudicateTest(unittest.TestCase):
+    def test_immediate_win(self):
+        decided = adjudicate(board_after("001122"), AdjudicationSettings(depth=0))
+
+        assert decided is not None
+        self.assertEqual(decided.result, GameState.PLAYER_1_WIN)
+
+    def test_double_threat(self):
+        # Player 1 holds 2-3-4 along the bottom with both ends open; player 2
+        # to move can only block one.
+        decided = adjudicate(board_after("26364"), AdjudicationSettings(depth=0))
+
+        assert decided is not None
+        self.assertEqual(decided.result, GameState.PLAYER_1_WIN)
+
+    def test_forced_win_needs_depth(self):
+        # Player 1 to move sets up the double threat by playing 3.
+        board = board_after("2646")
+        self.assertIsNone(adjudicate(board, AdjudicationSettings(depth=0)))
+
+        decided = adjudicate(board, AdjudicationSettings(depth=2))
+        assert decided is not None
+        self.assertEqual(decided.result, GameState.PLAYER_1_WIN)
+
+    def test_undecided_opening(self):
+        self.assertIsNone(adjudicate(GameBoard(), AdjudicationSettings(depth=4)))
+
+    def test_forced_draw(self):
+        # Four empty cells left, and the game is drawn with best play.
+        board = board_after("12052305013656112043356360161305644522")
+        self.assertIsNone(adjudicate(board, AdjudicationSettings(depth=2)))
+
+        decided = adjudicate(board, AdjudicationSettings(depth=4))
+        assert decided is not None
+        self.assertEqual(decided.result, GameState.DRAW)
+
+    def test_min_moves(self):
+        board = board_after("26364")
+        self.assertIsNone(
+            adjudicate(board, AdjudicationSettings(depth=0, min_moves=10))
+        )
+
+
+class RunOneAdjudicationTest(unittest.TestCase):
+    def test_records_adjudicated_games(self):
+        player1 = EngineContainer(RANDOM_ENGINE)
+        player2 = EngineContainer(RANDOM_ENGINE)
+        records: list[GameRecord] = []
+        try:
+            result = run_one(
+                player1,
+                player2,
+                timedelta(seconds=5),
+                recorder=records,
+                opening=(2, 6, 3, 6, 4),
+                adjudication=AdjudicationSettings(depth=0),
+            )
+        finally:
+            player1.close()
+            player2.close()
+
+        self.assertEqual(result, GameResult.PLAYER_1_WIN)
+        (record,) = records
+        self.assertEqual(record.reason, EndReason.ADJUDICATED)
+        self.assertEqual(record.result, GameState.PLAYER_1_WIN)
+        self.assertEqual(record.moves, [2, 6, 3, 6, 4])
+
+    def test_containers_reusable_after_mid_game_adjudication(self):
+        player1 = EngineContainer(RANDOM_ENGINE)
+        player2 = EngineContainer(RANDOM_ENGINE)
+        records: list[GameRecord] = []
+        try:
+            for _ in range(2):
+                run_one(
+                    player1,
+                    player2,
+                    timedelta(seconds=5),
+                    recorder=records,
+                    adjudication=AdjudicationSettings(depth=0),
+                )
+        finally:
+            player1.close()
+            player2.close()
+
+        first, second = records
+        self.assertEqual(first.reason, EndReason.ADJUDICATED)
+        self.assertGreater(len(first.moves), 0)
+        # No reply to the first game is left to be read as part of the second.
+        self.assertEqual(second.reason, EndReason.ADJUDICATED)
+        self.assertEqual(second.result, first.result)
+        self.assertEqual(second.moves, first.moves)
+
+
+if __name__ == "__main__":
+    unittest.main()
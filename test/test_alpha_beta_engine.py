@@ -0,0 +1,124 @@
+from datetime import timedelta
+import sys
+import time
+import unittest
+
+from engine.alpha_beta_engine import AlphaBetaEngine
+from engine.engine_base import EngineBase
+from runner.codec import Move, Params, Player
+from runner.engine_container import EngineContainer
+from runner.game_record import EndReason, GameRecord
+from runner.run_one import GameResult, run_one
+
+
+def make_engine(player: Player, moves: list[int], ms: int = 200) -> AlphaBetaEngine:
+    return AlphaBetaEngine.make(
+        Params(
+            your_player=player,
+            time_per_move=timedelta(milliseconds=ms),
+            moves=[Move(m) for m in moves],
+        )
+    )
+
+
+class AlphaBetaEngineTest(unittest.TestCase):
+    def test_takes_immediate_win(self):
+        engine = make_engine(Player.PLAYER_1, [0, 1, 0, 1, 0, 1])
+
+        self.assertEqual(engine.get_move(), Move(0))
+
+    def test_blocks_immediate_loss(self):
+        engine = make_engine(Player.PLAYER_2, [0, 6, 1, 6, 2])
+
+        self.assertEqual(engine.get_move(), Move(3))
+
+    def test_opens_in_center(self):
+        engine = make_engine(Player.PLAYER_1, [])
+
+        self.assertEqual(engine.get_move(), Move(3))
+
+    def test_move_budget_charges_startup_only_when_cold(self):
+        engine = make_engine(Player.PLAYER_1, [], ms=1000)
+        warm = engine.move_budget(timedelta(milliseconds=1000))
+        # Running inside a long-lived process costs the first move nothing.
+        self.assertAlmostEqual(warm, 0.885)
+
+        EngineBase.cold_process = True
+        self.assertLess(engine.move_budget(timedelta(milliseconds=1000)), warm)
+        self.assertFalse(EngineBase.cold_process)
+        self.assertEqual(engine.move_budget(timedelta(milliseconds=1000)), warm)
+
+    def test_respects_deadline(self):
+        engine = make_engine(Player.PLAYER_1, [], ms=100)
+        budget = engine.move_budget(timedelta(milliseconds=100))
+
+        start = time.perf_counter()
+        engine.get_move()
+        elapsed = time.perf_counter() - start
+
+        # The clock is checked every few hundred nodes, and a loaded machine
+        # may not schedule us promptly, so allow well past the budget.
+        self.assertLess(elapsed, budget + 0.25)
+        self.assertGreater(engine.completed_depth, 0)
+
+    def test_ponder_work_is_kept(self):
+        # Budgets at the 1ms floor, so get_move gets nowhere on its own.
+        engine = make_engine(Player.PLAYER_1, [], ms=10)
+        first_move = engine.get_move()
+        engine.on_move(first_move)
+
+        stop_at = time.perf_counter() + 0.3
+        engine.ponder(lambda: time.perf_counter() > stop_at)
+        pondered_depth = engine.completed_depth
+
+        assert engine.predicted_move is not None
+        self.assertGreater(pondered_depth, 0)
+
+        # Without the transposition table, only the pondered depth itself can
+        # get the search that far.
+        AlphaBetaEngine._tt = None
+        engine.on_move(engine.predicted_move)
+        engine.get_move()
+
+        AlphaBetaEngine._tt = None
+        fresh = make_engine(
+            Player.PLAYER_1, [first_move.column, engine.predicted_move.column], ms=10
+        )
+        fresh.get_move()
+
+        self.assertGreaterEqual(engine.completed_depth, pondered_depth)
+        self.assertGreater(engine.completed_depth, fresh.completed_depth)
+
+    def test_ponder_stops_when_asked(self):
+        engine = make_engine(Player.PLAYER_2, [3])
+
+        start = time.perf_counter()
+        engine.ponder(lambda: time.perf_counter() - start > 0.05)
+
+        self.assertLess(time.perf_counter() - start, 0.2)
+
+
+class PonderSubprocessTest(unittest.TestCase):
+    def test_plays_a_game_with_ponder(self):
+        # Pondering runs between moves in the engine process, with the
+        # runner's messages read on engine_main's MessageReader thread.
+        engine = EngineContainer(
+            [sys.executable, "-m", "engine.alpha_beta_engine", "--ponder"]
+        )
+        opponent = EngineContainer([sys.executable, "-m", "engine.random_engine"])
+        records: list[GameRecord] = []
+        try:
+            result = run_one(
+                engine, opponent, timedelta(milliseconds=500), recorder=records
+            )
+        finally:
+            engine.close()
+            opponent.close()
+
+        (record,) = records
+        self.assertEqual(record.reason, EndReason.COMPLETED)
+        self.assertEqual(result, GameResult.PLAYER_1_WIN)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,63 @@
+import asyncio
+import sys
+import time
+import unittest
+from datetime import timedelta
+
+from runner.async_engine_container import AsyncEngineContainer
+from runner.run_one import GameResult, async_run_one
+
+RANDOM_ENGINE = [sys.executable, "-m", "engine.random_engine"]
+HUNG_ENGINE = [sys.executable, "-c", "import time; time.sleep(60)"]
+CRASHING_ENGINE = [sys.executable, "-c", "pass"]
+
+
+async def play(p1_args: list[str], p2_args: list[str], ms: int) -> GameResult:
+    player1 = await AsyncEngineContainer.start(p1_args)
+    player2 = await AsyncEngineContainer.start(p2_args)
+    try:
+        return await async_run_one(player1, player2, timedelta(milliseconds=ms))
+    finally:
+        await player1.kill()
+        await player2.kill()
+
+
+class AsyncRunOneTest(unittest.TestCase):
+    def test_hung_engine_forfeits_at_deadline(self):
+        start = time.perf_counter()
+        result = asyncio.run(play(HUNG_ENGINE, RANDOM_ENGINE, ms=300))
+
+        self.assertEqual(result, GameResult.PLAYER_2_WIN)
+        self.assertLess(time.perf_counter() - start, 5)
+
+    def test_crashed_engine_forfeits(self):
+        result = asyncio.run(play(RANDOM_ENGINE, CRASHING_ENGINE, ms=5000))
+
+        self.assertEqual(result, GameResult.PLAYER_1_WIN)
+
+    def test_engine_dead_before_game_start_forfeits(self):
+        async def play_dead() -> GameResult:
+            player1 = await AsyncEngineContainer.start(RANDOM_ENGINE)
+            player2 = await AsyncEngineContainer.start(CRASHING_ENGINE)
+            try:
+                while player2.alive():
+                    await asyncio.sleep(0.01)
+                return await async_run_one(player1, player2, timedelta(seconds=5))
+            finally:
+                await player1.kill()
+                await player2.kill()
+
+        self.assertEqual(asyncio.run(play_dead()), GameResult.PLAYER_1_WIN)
+
+    def test_concurrent_games_on_one_loop(self):
+        async def many() -> list[GameResult]:
+            return await asyncio.gather(
+                *(play(RANDOM_ENGINE, RANDOM_ENGINE, ms=5000) for _ in range(4))
+            )
+
+        # RandomEngine is deterministic: the first player fills the bottom row.
+        self.assertEqual(asyncio.run(many()), [GameResult.PLAYER_1_WIN] * 4)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,118 @@
+from random import Random
+import unittest
+
+from engine.batch_board import BatchBoard, NO_MOVE, NO_MOVE_BYTE
+from engine.game_board import Coord, GameBoard, GameState, NUM_COLS, NUM_ROWS
+from runner.codec import Move, Player
+
+
+def legal_mask(board: GameBoard) -> int:
+    if board.state() != GameState.ONGOING:
+        return 0
+    return sum(1 << c for c in board.all_moves())
+
+
+class BatchBoardTest(unittest.TestCase):
+    def test_matches_game_board(self):
+        rng = Random(0)
+        num_boards = 300
+
+        boards = [GameBoard() for _ in range(num_boards)]
+        batch = BatchBoard(num_boards)
+
+        for _ in range(NUM_COLS * NUM_ROWS + 1):
+            columns = []
+            for board in boards:
+                if board.state() == GameState.ONGOING:
+                    col = rng.choice(board.all_moves())
+                    board.make_move(Move(col))
+                    columns.append(col)
+                else:
+                    columns.append(NO_MOVE)
+
+            batch.apply_moves(columns)
+
+            self.assertEqual(list(batch.states()), [b.state().value for b in boards])
+            self.assertEqual(
+                list(batch.legal_move_masks()), [legal_mask(b) for b in boards]
+            )
+            for i, board in enumerate(boards):
+                self.assertEqual(batch.side_to_move(i), board.side_to_move())
+
+        p1, p2 = batch.bitboards()
+        for i, board in enumerate(boards):
+            self.assertEqual(p1[i], board.bitboard(Player.PLAYER_1))
+            self.assertEqual(p2[i], board.bitboard(Player.PLAYER_2))
+
+        self.assertTrue(any(b.state() == GameState.PLAYER_1_WIN for b in boards))
+        self.assertTrue(any(b.state() == GameState.PLAYER_2_WIN for b in boards))
+
+    def test_draw(self):
+        columns = []
+        for pair in [(0, 1), (2, 3), (4, 5)]:
+            columns += [pair[0], pair[1]] * 3 + [pair[1], pair[0]] * 3
+        columns += [6] * 6
+
+        batch = BatchBoard.from_move_lists([columns, columns[:-1]])
+
+        self.assertEqual(batch.state(0), GameState.DRAW)
+        self.assertEqual(batch.state(1), GameState.ONGOING)
+        self.assertEqual(list(batch.legal_move_masks()), [0, 1 << 6])
+
+    def test_illegal_moves(self):
+        batch = BatchBoard.from_move_lists([[0] * NUM_ROWS, [0, 1, 0, 1, 0, 1, 0]])
+
+        with self.assertRaises(ValueError):
+            batch.apply_moves([0, NO_MOVE])
+        with self.assertRaises(ValueError):
+            batch.apply_moves([NO_MOVE, 2])
+        with self.assertRaises(ValueError):
+            batch.apply_moves([NUM_COLS, NO_MOVE])
+
+        batch.apply_moves([1, NO_MOVE])
+
+    def test_from_board_and_column_bytes(self):
+        rng = Random(1)
+        start = GameBoard()
+        for col in [3, 3, 4, 2, 2]:
+            start.make_move(Move(col))
+
+        num_boards = 100
+        batch = BatchBoard.from_board(start, num_boards)
+        lists = BatchBoard.from_move_lists([start.history()] * num_boards)
+
+        for _ in range(NUM_COLS * NUM_ROWS):
+            masks = lists.legal_move_masks()
+            self.assertEqual(batch.legal_move_masks(), masks)
+            self.assertEqual(batch.states(), lists.states())
+
+            columns = [
+                rng.choice([c for c in range(NUM_COLS) if mask >> c & 1])
+                if mask
+                else NO_MOVE
+                for mask in masks
+            ]
+            batch.apply_column_bytes(
+                bytes(NO_MOVE_BYTE if c == NO_MOVE else c for c in columns)
+            )
+            lists.apply_moves(columns)
+
+        self.assertEqual(batch.bitboards(), lists.bitboards())
+        with self.assertRaises(ValueError):
+            batch.apply_column_bytes(bytes([0] * num_boards))
+
+    def test_grid(self):
+        batch = BatchBoard.from_move_lists([[3, 3, 4]])
+        board = GameBoard()
+        for col in [3, 3, 4]:
+            board.make_move(Move(col))
+
+        for row in range(NUM_ROWS):
+            for col in range(NUM_COLS):
+                piece = board.piece_at(Coord(row=row, col=col))
+                expected = {None: 0, Player.PLAYER_1: 1, Player.PLAYER_2: 2}[piece]
+                self.assertEqual(batch.grid(0)[NUM_ROWS - 1 - row][col], expected)
+
+
+if __name__ == "__main__":
+    unittest.main()
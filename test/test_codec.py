@@ -47,6 +47,133 @@ class CodecTest(unittest.TestCase):
         self.assertEqual(game_params.your_player, codec.Player.PLAYER_1)
         self.assertEqual(codec.ParamsMsg.make(game_params).encode(), game_start)
 
+    def test_encode_into_reused_buffer(self):
+        params = codec.Params(
+            your_player=codec.Player.PLAYER_2,
+            time_per_move=datetime.timedelta(milliseconds=250),
+            moves=[codec.Move(3), codec.Move(4)],
+        )
+        params_msg = codec.ParamsMsg.make(params)
+        move_msg = codec.MoveMsg.make(codec.Move(5))
+
+        buffer = bytearray(64)
+        end = params_msg.encode_into(buffer)
+        end = move_msg.encode_into(buffer, end)
+
+        self.assertEqual(bytes(buffer[:end]), params_msg.encode() + move_msg.encode())
+        self.assertEqual(codec.decode(memoryview(buffer)[:end]), params)
+
+    def test_send_buffer(self):
+        send_buffer = codec.SendBuffer(size=8)
+        move_msg = codec.MoveMsg.make(codec.Move(5), 3)
+        params_msg = codec.ParamsMsg.make(
+            codec.Params(
+                your_player=codec.Player.PLAYER_1,
+                time_per_move=datetime.timedelta(milliseconds=100),
+                moves=[codec.Move(c % 7) for c in range(20)],
+            )
+        )
+
+        self.assertEqual(send_buffer.encode(move_msg), move_msg.encode())
+        # Longer than the buffer, which grows to fit.
+        self.assertEqual(send_buffer.encode(params_msg), params_msg.encode())
+        self.assertEqual(send_buffer.encode(move_msg), move_msg.encode())
+
+    def test_game_id(self):
+        # MakeMove with the game id flag, length 6, game 0x0102, column 4.
+        move_raw = b"\x81\x06\x00\x02\x01\x04"
+
+        self.assertEqual(codec.decode_frame(move_raw), (0x0102, codec.Move(4)))
+        self.assertEqual(codec.MoveMsg.make(codec.Move(4), 0x0102).encode(), move_raw)
+
+        buffer = bytearray(8)
+        end = codec.MoveMsg.make(codec.Move(4), 0x0102).encode_into(buffer, 1)
+        self.assertEqual(bytes(buffer[1:end]), move_raw)
+
+        params = codec.Params(
+            your_player=codec.Player.PLAYER_2,
+            time_per_move=datetime.timedelta(milliseconds=250),
+            moves=[codec.Move(3)],
+        )
+        params_raw = codec.ParamsMsg.make(params, 7).encode()
+        self.assertEqual(params_raw[0], codec.GAME_ID_FLAG)
+        self.assertEqual(codec.decode_frame(params_raw), (7, params))
+        self.assertEqual(codec.decode_buffer(BytesIO(params_raw + move_raw)), params)
+
+    def test_version_1_frames_have_no_game_id(self):
+        self.assertEqual(codec.decode_frame(b"\x01\x04\x00\x06"), (None, codec.Move(6)))
+
+
+class FrameDecoderTest(unittest.TestCase):
+    PARAMS = codec.Params(
+        your_player=codec.Player.PLAYER_1,
+        time_per_move=datetime.timedelta(milliseconds=100),
+        moves=[codec.Move(1), codec.Move(0), codec.Move(2)],
+    )
+    STREAM = (
+        codec.ParamsMsg.make(PARAMS).encode()
+        + codec.MoveMsg.make(codec.Move(6)).encode()
+        + codec.MoveMsg.make(codec.Move(0)).encode()
+    )
+
+    def expected(self):
+        return [self.PARAMS, codec.Move(6), codec.Move(0)]
+
+    def test_coalesced_frames(self):
+        decoder = codec.FrameDecoder()
+
+        self.assertEqual(decoder.feed(self.STREAM), self.expected())
+        self.assertEqual(decoder.pending_bytes(), 0)
+
+    def test_split_frames(self):
+        decoder = codec.FrameDecoder()
+
+        messages = []
+        for i in range(len(self.STREAM)):
+            messages += decoder.feed(self.STREAM[i : i + 1])
+
+        self.assertEqual(messages, self.expected())
+        self.assertEqual(decoder.pending_bytes(), 0)
+
+    def test_arbitrary_chunking(self):
+        for chunk_size in range(2, len(self.STREAM) + 1):
+            decoder = codec.FrameDecoder()
+
+            messages = []
+            for i in range(0, len(self.STREAM), chunk_size):
+                messages += decoder.feed(self.STREAM[i : i + chunk_size])
+
+            self.assertEqual(messages, self.expected())
+
+    def test_partial_frame_is_held(self):
+        decoder = codec.FrameDecoder()
+
+        self.assertEqual(decoder.feed(self.STREAM[:-1]), self.expected()[:2])
+        self.assertEqual(decoder.pending_bytes(), codec.MoveMsg.LENGTH - 1)
+        self.assertEqual(decoder.feed(self.STREAM[-1:]), [codec.Move(0)])
+
+    def test_interleaved_game_ids(self):
+        stream = (
+            codec.ParamsMsg.make(self.PARAMS, 3).encode()
+            + codec.MoveMsg.make(codec.Move(6), 0).encode()
+            + codec.MoveMsg.make(codec.Move(2)).encode()
+            + codec.MoveMsg.make(codec.Move(0), 3).encode()
+        )
+        expected = [
+            (3, self.PARAMS),
+            (0, codec.Move(6)),
+            (None, codec.Move(2)),
+            (3, codec.Move(0)),
+        ]
+
+        decoder = codec.FrameDecoder()
+        frames = []
+        for i in range(len(stream)):
+            frames += decoder.feed_frames(stream[i : i + 1])
+
+        self.assertEqual(frames, expected)
+        self.assertEqual(decoder.pending_bytes(), 0)
+
 
 if __name__ == "__main__":
     unittest.main()
@@ -0,0 +1,101 @@
+import unittest
+
+import runner.codec as codec
+from engine.alpha_beta_engine import CENTER_FIRST
+from engine.mcts_engine import forced_column
+from engine.random_engine import RandomEngine
+from runner.elo_cli import (
+    RatingAdjustmentSettings,
+    compute_elo,
+    compute_elo_multiplexed,
+    compute_elo_parallel,
+)
+from runner.game_record import GameRecord
+from runner.in_process import InProcessEngine
+
+
+class CenterEngine(RandomEngine):
+    """Plays the most central open column."""
+
+    def get_move(self):
+        return codec.Move(
+            next(c for c in CENTER_FIRST if self._board.column_space(c) > 0)
+        )
+
+
+class ThreatEngine(CenterEngine):
+    """CenterEngine that also takes wins and blocks losses."""
+
+    def get_move(self):
+        column = forced_column(self._board)
+        if column is not None:
+            return codec.Move(column)
+        return super().get_move()
+
+
+# Deterministic engines of different strength, so every game's result is
+# fixed and only the order matches are folded in can change the ratings.
+ENGINE_ARGS = {
+    0: ["py:engine.random_engine:RandomEngine"],
+    1: [f"py:{__name__}:CenterEngine"],
+    2: [f"py:{__name__}:ThreatEngine"],
+}
+OPENINGS = [(0,), (3,), (6,), (2, 4)]
+GAMES = 18
+
+
+class ComputeEloTest(unittest.TestCase):
+    def setUp(self):
+        settings = RatingAdjustmentSettings()
+        self.records: list[GameRecord] = []
+        engines = {
+            engine_id: InProcessEngine.from_args(args)
+            for engine_id, args in ENGINE_ARGS.items()
+        }
+        self.ratings = compute_elo(
+            engines, settings, GAMES, self.records, openings=OPENINGS
+        )
+
+        elos = {rating.elo for rating in self.ratings.values()}
+        self.assertEqual(len(elos), len(ENGINE_ARGS))
+
+    def assert_same_as_sequential(self, ratings, records):
+        self.assertEqual(
+            {engine_id: r.elo for engine_id, r in ratings.items()},
+            {engine_id: r.elo for engine_id, r in self.ratings.items()},
+        )
+        # Everything but the think times, which vary from run to run.
+        self.assertEqual(
+            [(r.player1, r.player2, r.result, r.moves) for r in records],
+            [(r.player1, r.player2, r.result, r.moves) for r in self.records],
+        )
+
+    def test_parallel_matches_sequential(self):
+        records: list[GameRecord] = []
+        ratings = compute_elo_parallel(
+            ENGINE_ARGS,
+            RatingAdjustmentSettings(),
+            GAMES,
+            jobs=3,
+            recorder=records,
+            openings=OPENINGS,
+        )
+
+        self.assert_same_as_sequential(ratings, records)
+
+    def test_multiplexed_matches_sequential(self):
+        records: list[GameRecord] = []
+        ratings = compute_elo_multiplexed(
+            ENGINE_ARGS,
+            RatingAdjustmentSettings(),
+            GAMES,
+            jobs=3,
+            recorder=records,
+            openings=OPENINGS,
+        )
+
+        self.assert_same_as_sequential(ratings, records)
+
+
+if __name__ == "__main__":
+    unittest.main()
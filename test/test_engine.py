@@ -1,8 +1,23 @@
 from engine.game_board import GameBoard, Coord, GameState
 from runner.codec import Move, Player
+from random import Random
 import unittest
 
 
+def board_snapshot(b: GameBoard):
+    return (
+        b.state(),
+        b.side_to_move(),
+        b.bitboard(Player.PLAYER_1),
+        b.bitboard(Player.PLAYER_2),
+        b.all_moves(),
+        [b.column_space(c) for c in range(7)],
+        b.num_moves(),
+        list(b.history()),
+        str(b),
+    )
+
+
 class EngineTest(unittest.TestCase):
     def test_straight_victory(self):
         b = GameBoard()
@@ -100,6 +115,105 @@ class EngineTest(unittest.TestCase):
 
         self.assertEqual(b.state(), GameState.PLAYER_2_WIN)
 
+    def test_horizontal_victory(self):
+        b = GameBoard()
+
+        for col in range(3, 7):
+            b.make_move(Move(col))
+
+            if col != 6:
+                b.make_move(Move(col))
+
+        self.assertEqual(b.state(), GameState.PLAYER_1_WIN)
+
+    def test_no_wrap_between_columns(self):
+        b = GameBoard()
+
+        """
+        The top three cells of column 0 and the bottom cell of column 1 are
+        not connected on the board.
+
+        X
+        X
+        X
+        O
+        O   X       O
+        O X X       O
+        """
+
+        for move in [1, 0, 2, 0, 2, 0, 0, 6, 0, 6, 0]:
+            b.make_move(Move(move))
+
+        self.assertEqual(b.state(), GameState.ONGOING)
+        self.assertEqual(b.piece_at(Coord(row=5, col=0)), Player.PLAYER_1)
+        self.assertEqual(b.piece_at(Coord(row=0, col=1)), Player.PLAYER_1)
+        self.assertIsNone(b.piece_at(Coord(row=1, col=1)))
+
+    def test_draw(self):
+        b = GameBoard()
+
+        # Fill columns in pairs shifted by two rows so nobody connects four.
+        for pair in [(0, 1), (2, 3), (4, 5)]:
+            for _ in range(3):
+                b.make_move(Move(pair[0]))
+                b.make_move(Move(pair[1]))
+            for _ in range(3):
+                b.make_move(Move(pair[1]))
+                b.make_move(Move(pair[0]))
+        for _ in range(6):
+            b.make_move(Move(6))
+
+        self.assertEqual(b.state(), GameState.DRAW)
+        self.assertEqual(b.all_moves(), [])
+
+    def test_unmake_restores_previous_position(self):
+        rng = Random(0)
+
+        for _ in range(200):
+            b = GameBoard()
+            while b.state() == GameState.ONGOING:
+                before = board_snapshot(b)
+                move = Move(rng.choice(b.all_moves()))
+
+                b.make_move(move)
+                b.unmake_move()
+                self.assertEqual(board_snapshot(b), before)
+
+                b.make_move(move)
+
+    def test_unmake_whole_game(self):
+        rng = Random(1)
+
+        for _ in range(200):
+            b = GameBoard()
+            snapshots = []
+            while b.state() == GameState.ONGOING:
+                snapshots.append(board_snapshot(b))
+                b.make_move(Move(rng.choice(b.all_moves())))
+
+            while snapshots:
+                b.unmake_move()
+                self.assertEqual(board_snapshot(b), snapshots.pop())
+
+            self.assertEqual(b.history(), [])
+            self.assertEqual(b.zobrist_hash(), 0)
+
+    def test_zobrist_transpositions(self):
+        a = GameBoard()
+        for move in [3, 2, 4, 2]:
+            a.make_move(Move(move))
+
+        b = GameBoard()
+        for move in [4, 2, 3, 2]:
+            b.make_move(Move(move))
+
+        c = GameBoard()
+        for move in [3, 2, 2, 4]:
+            c.make_move(Move(move))
+
+        self.assertEqual(a.zobrist_hash(), b.zobrist_hash())
+        self.assertNotEqual(a.zobrist_hash(), c.zobrist_hash())
+
 
 if __name__ == "__main__":
     unittest.main()
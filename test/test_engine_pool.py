@@ -0,0 +1,50 @@
+import sys
+import unittest
+from datetime import timedelta
+
+from runner.engine_pool import EnginePool
+from runner.run_one import GameResult, run_one
+
+RANDOM_ENGINE = [sys.executable, "-m", "engine.random_engine"]
+HUNG_ENGINE = [sys.executable, "-c", "import time; time.sleep(60)"]
+CRASHING_ENGINE = [sys.executable, "-c", "pass"]
+
+
+class EnginePoolTest(unittest.TestCase):
+    def test_healthy_engine_is_kept(self):
+        with EnginePool() as pool:
+            player1 = pool.engine(RANDOM_ENGINE)
+            player2 = pool.engine(RANDOM_ENGINE)
+
+            for _ in range(3):
+                self.assertEqual(run_one(player1, player2), GameResult.PLAYER_1_WIN)
+
+            self.assertEqual(player1.respawns, 0)
+            self.assertEqual(player2.respawns, 0)
+
+    def test_hung_engine_is_replaced(self):
+        with EnginePool() as pool:
+            hung = pool.engine(HUNG_ENGINE)
+            opponent = pool.engine(RANDOM_ENGINE)
+
+            result = run_one(hung, opponent, timedelta(milliseconds=200))
+
+            self.assertEqual(result, GameResult.PLAYER_2_WIN)
+            self.assertFalse(hung.healthy())
+
+            run_one(hung, opponent, timedelta(milliseconds=200))
+            self.assertEqual(hung.respawns, 1)
+
+    def test_crashed_engine_is_replaced(self):
+        with EnginePool() as pool:
+            crashing = pool.engine(CRASHING_ENGINE)
+            opponent = pool.engine(RANDOM_ENGINE)
+
+            self.assertEqual(run_one(opponent, crashing), GameResult.PLAYER_1_WIN)
+            self.assertEqual(run_one(opponent, crashing), GameResult.PLAYER_1_WIN)
+            self.assertGreaterEqual(crashing.respawns, 1)
+            self.assertTrue(opponent.healthy())
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,124 @@
+import os
+import struct
+import tempfile
+import unittest
+
+from engine.game_board import GameState
+from runner.game_record import (
+    FILE_HEADER,
+    MAGIC,
+    V1_GAME_HEADER,
+    EndReason,
+    GameRecord,
+    GameRecordWriter,
+    MAX_THINK_TIME_UNITS,
+    THINK_TIME_UNIT_US,
+    read_records,
+)
+
+
+class GameRecordTest(unittest.TestCase):
+    def setUp(self):
+        fd, self.path = tempfile.mkstemp(suffix=".c4gr")
+        os.close(fd)
+        os.remove(self.path)
+
+    def tearDown(self):
+        if os.path.exists(self.path):
+            os.remove(self.path)
+
+    def test_round_trip(self):
+        records = [
+            GameRecord(
+                player1=0,
+                player2=1,
+                result=GameState.PLAYER_1_WIN,
+                moves=[3, 3, 4, 4, 5, 5, 6],
+                think_times_us=[100, 200, 300, 400, 500, 600, 700],
+            ),
+            GameRecord(
+                player1=7,
+                player2=2,
+                result=GameState.PLAYER_2_WIN,
+                reason=EndReason.TIMEOUT,
+                moves=[0, 6],
+                think_times_us=[12_300, 45_600],
+            ),
+            GameRecord(player1=1, player2=0, result=GameState.DRAW),
+            GameRecord(
+                player1=0,
+                player2=1,
+                result=GameState.DRAW,
+                reason=EndReason.TIMEOUT,
+                moves=[3, 3, 2, 1],
+                think_times_us=[0, 0, 0, 900],
+                opening_length=3,
+            ),
+        ]
+
+        with GameRecordWriter(self.path) as writer:
+            for record in records[:2]:
+                writer.append(record)
+
+        # Reopening appends rather than truncating.
+        with GameRecordWriter(self.path) as writer:
+            for record in records[2:]:
+                writer.append(record)
+
+        self.assertEqual(list(read_records(self.path)), records)
+
+    def test_moves_packed_two_per_byte(self):
+        record = GameRecord(
+            player1=0,
+            player2=1,
+            result=GameState.PLAYER_1_WIN,
+            moves=[1, 2, 3],
+            think_times_us=[0, 0, 0],
+        )
+
+        # Fixed header, a uint16 think time per move, then two bytes of moves.
+        self.assertEqual(len(record.encode()), 8 + 2 * 3 + 2)
+
+    def test_think_time_saturates(self):
+        record = GameRecord(
+            player1=0,
+            player2=1,
+            result=GameState.PLAYER_1_WIN,
+            moves=[0],
+            think_times_us=[10**9],
+        )
+
+        with GameRecordWriter(self.path) as writer:
+            writer.append(record)
+
+        (decoded,) = read_records(self.path)
+        self.assertEqual(
+            decoded.think_times_us, [MAX_THINK_TIME_UNITS * THINK_TIME_UNIT_US]
+        )
+
+    def test_reads_version_1(self):
+        with open(self.path, "wb") as f:
+            f.write(FILE_HEADER.pack(MAGIC, 1))
+            f.write(V1_GAME_HEADER.pack(4, 5, GameState.PLAYER_2_WIN.value, 0, 2))
+            f.write(struct.pack("<2H", 10, 20) + bytes([0x63]))
+
+        (decoded,) = read_records(self.path)
+
+        self.assertEqual(decoded.moves, [3, 6])
+        self.assertEqual(decoded.think_times_us, [1_000, 2_000])
+        self.assertEqual(decoded.opening_length, 0)
+
+        # New games are not appended to an old file.
+        with self.assertRaises(ValueError):
+            GameRecordWriter(self.path)
+
+    def test_rejects_other_files(self):
+        with open(self.path, "wb") as f:
+            f.write(b"not a record file")
+
+        with self.assertRaises(ValueError):
+            list(read_records(self.path))
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,114 @@
+import sys
+import time
+import unittest
+from datetime import timedelta
+
+import runner.codec as codec
+from engine.random_engine import RandomEngine
+from runner.elo_cli import RatingAdjustmentSettings, compute_elo_parallel
+from runner.engine_container import EngineContainer
+from runner.engine_pool import EnginePool
+from runner.game_record import EndReason, GameRecord
+from runner.in_process import InProcessEngine, is_in_process, load_engine_class
+from runner.run_one import GameResult, run_one
+
+RANDOM_ENGINE = ["py:engine.random_engine:RandomEngine"]
+
+
+class CrashingEngine(RandomEngine):
+    def get_move(self) -> codec.Move:
+        raise RuntimeError("boom")
+
+
+class UnstartableEngine(RandomEngine):
+    @classmethod
+    def make(cls, params: codec.Params):
+        raise RuntimeError("boom")
+
+
+class SlowEngine(RandomEngine):
+    def get_move(self) -> codec.Move:
+        time.sleep(0.05)
+        return super().get_move()
+
+
+class InProcessEngineTest(unittest.TestCase):
+    def test_spec(self):
+        self.assertTrue(is_in_process(RANDOM_ENGINE))
+        self.assertFalse(is_in_process(["python", "-m", "engine.random_engine"]))
+        self.assertIs(load_engine_class(RANDOM_ENGINE[0]), RandomEngine)
+
+        with self.assertRaises(ValueError):
+            load_engine_class("py:engine.random_engine")
+        with self.assertRaises(ValueError):
+            load_engine_class("py:engine.game_board:GameBoard")
+
+    def test_self_play(self):
+        player1 = InProcessEngine(RandomEngine)
+        player2 = InProcessEngine(RandomEngine)
+        records: list[GameRecord] = []
+
+        for _ in range(3):
+            result = run_one(player1, player2, recorder=records, opening=(3,))
+            self.assertEqual(result, GameResult.PLAYER_1_WIN)
+
+        self.assertEqual(records[0].reason, EndReason.COMPLETED)
+        self.assertEqual(records[0].moves[:2], [3, 0])
+
+    def test_crash_forfeits(self):
+        crashing = InProcessEngine(CrashingEngine)
+        opponent = InProcessEngine(RandomEngine)
+        records: list[GameRecord] = []
+
+        result = run_one(crashing, opponent, recorder=records)
+
+        self.assertEqual(result, GameResult.PLAYER_2_WIN)
+        self.assertEqual(records[0].reason, EndReason.DISCONNECTED)
+        self.assertFalse(crashing.healthy())
+
+    def test_opponent_failing_to_start_leaves_no_move_unread(self):
+        player1 = EngineContainer([sys.executable, "-m", "engine.random_engine"])
+        records: list[GameRecord] = []
+        try:
+            result = run_one(
+                player1, InProcessEngine(UnstartableEngine), recorder=records
+            )
+            self.assertEqual(result, GameResult.PLAYER_1_WIN)
+            self.assertEqual(records[0].reason, EndReason.DISCONNECTED)
+
+            # Player 1 never got the abandoned game, so it is still in sync.
+            run_one(player1, InProcessEngine(RandomEngine), recorder=records)
+        finally:
+            player1.close()
+
+        self.assertEqual(records[1].reason, EndReason.COMPLETED)
+        self.assertEqual(records[1].moves[:2], [0, 0])
+
+    def test_timeout_forfeits(self):
+        slow = InProcessEngine(SlowEngine)
+        opponent = InProcessEngine(RandomEngine)
+
+        result = run_one(opponent, slow, timedelta(milliseconds=10))
+
+        self.assertEqual(result, GameResult.PLAYER_1_WIN)
+
+    def test_pool_runs_specs_in_process(self):
+        with EnginePool() as pool:
+            engine = pool.engine(RANDOM_ENGINE)
+            self.assertIsInstance(engine, InProcessEngine)
+
+    def test_parallel_workers(self):
+        ratings = compute_elo_parallel(
+            {0: RANDOM_ENGINE, 1: RANDOM_ENGINE},
+            RatingAdjustmentSettings(),
+            allowed_games=8,
+            jobs=2,
+        )
+
+        # Identical engines split every match evenly.
+        self.assertEqual(ratings[0].elo, RatingAdjustmentSettings().initial_elo)
+        self.assertEqual(ratings[1].elo, RatingAdjustmentSettings().initial_elo)
+
+
+if __name__ == "__main__":
+    unittest.main()
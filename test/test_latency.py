@@ -0,0 +1,85 @@
+import unittest
+from datetime import timedelta
+from random import Random
+
+from runner.latency import (
+    MAX_VALUE_US,
+    NUM_BUCKETS,
+    LatencyHistogram,
+    LatencyTelemetry,
+    bucket_index,
+    bucket_upper_bound,
+)
+
+
+class BucketTest(unittest.TestCase):
+    def test_values_land_in_their_bucket(self):
+        for value in [*range(300), 1_000, 99_999, 100_000, 2**30 + 7, MAX_VALUE_US]:
+            index = bucket_index(value)
+            self.assertLess(index, NUM_BUCKETS)
+            self.assertLessEqual(value, bucket_upper_bound(index))
+            if index > 0:
+                self.assertGreater(value, bucket_upper_bound(index - 1))
+
+    def test_relative_error(self):
+        for value in range(16, 1_000_000, 997):
+            upper = bucket_upper_bound(bucket_index(value))
+            self.assertLessEqual(upper - value, value / 16)
+
+
+class LatencyHistogramTest(unittest.TestCase):
+    def test_percentiles(self):
+        histogram = LatencyHistogram()
+        samples = [Random(0).randrange(100_000) for _ in range(10_000)]
+        for sample in samples:
+            histogram.record(sample)
+
+        ordered = sorted(samples)
+        for fraction in (0.5, 0.95, 0.99):
+            exact = ordered[round(fraction * len(ordered)) - 1]
+            self.assertAlmostEqual(
+                histogram.percentile(fraction), exact, delta=exact / 16
+            )
+        self.assertEqual(histogram.percentile(1.0), max(samples))
+        self.assertEqual(histogram.min_us, min(samples))
+
+    def test_merge(self):
+        first, second, both = LatencyHistogram(), LatencyHistogram(), LatencyHistogram()
+        for value in range(0, 5_000, 7):
+            first.record(value)
+            both.record(value)
+        for value in range(3, 50_000, 11):
+            second.record(value)
+            both.record(value)
+
+        first.merge(second)
+
+        self.assertEqual(first.summary(0.5, 0.99), both.summary(0.5, 0.99))
+
+    def test_empty(self):
+        self.assertEqual(LatencyHistogram().summary(0.5), {"count": 0})
+
+
+class LatencyTelemetryTest(unittest.TestCase):
+    def test_near_timeouts_and_json(self):
+        telemetry = LatencyTelemetry()
+        deadline = timedelta(milliseconds=100)
+
+        telemetry.record_move(0, 1, 50_000, deadline)
+        telemetry.record_move(0, 3, 95_000, deadline)
+        telemetry.record_move(1, 2, 10_000, deadline)
+        telemetry.record_timeout(1)
+
+        summary = telemetry.to_json({0: "first"})["engines"]
+
+        self.assertEqual([e["name"] for e in summary], ["first", "1"])
+        self.assertEqual(summary[0]["moves"], 2)
+        self.assertEqual(summary[0]["near_timeouts"], 1)
+        self.assertEqual(summary[0]["deadline_margin"]["min_ms"], 5)
+        self.assertEqual(sorted(summary[0]["think_by_ply"]), ["1", "3"])
+        self.assertEqual(summary[1]["timeouts"], 1)
+        self.assertEqual(summary[1]["near_timeouts"], 0)
+
+
+if __name__ == "__main__":
+    unittest.main()
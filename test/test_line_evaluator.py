@@ -0,0 +1,80 @@
+from random import Random
+import unittest
+
+from engine.game_board import GameBoard, GameState, has_four
+from engine.line_evaluator import (
+    LINES,
+    LINES_THROUGH_CELL,
+    LineEvaluator,
+    line_score,
+)
+from runner.codec import Move, Player
+
+
+class LineEvaluatorTest(unittest.TestCase):
+    def assert_matches_rescan(self, evaluator: LineEvaluator, board: GameBoard):
+        self.assertEqual(evaluator.score(Player.PLAYER_1), line_score(board))
+        self.assertEqual(evaluator.score(Player.PLAYER_2), -line_score(board))
+        for player in Player:
+            self.assertEqual(
+                evaluator.has_four(player), has_four(board.bitboard(player))
+            )
+
+    def test_lines(self):
+        self.assertEqual(len(set(LINES)), 69)
+        # The centre cells of the bottom row and of the third row.
+        self.assertEqual(len(LINES_THROUGH_CELL[3 * 7]), 7)
+        self.assertEqual(len(LINES_THROUGH_CELL[3 * 7 + 2]), 13)
+
+    def test_matches_rescan_after_random_moves(self):
+        rng = Random(0)
+        for _ in range(200):
+            board = GameBoard()
+            evaluator = LineEvaluator(board)
+
+            # Wander forwards and backwards through a game.
+            for _ in range(60):
+                if board.state() == GameState.ONGOING and (
+                    not board.history() or rng.random() < 0.7
+                ):
+                    board.make_move(Move(rng.choice(board.all_moves())))
+                else:
+                    board.unmake_move()
+                self.assert_matches_rescan(evaluator, board)
+
+            while board.history():
+                board.unmake_move()
+            self.assertEqual(evaluator.score(Player.PLAYER_1), 0)
+
+    def test_attach_mid_game(self):
+        board = GameBoard()
+        for c in "3342215":
+            board.make_move(Move(int(c)))
+
+        evaluator = LineEvaluator(board)
+        self.assert_matches_rescan(evaluator, board)
+
+        board.make_move(Move(0))
+        self.assert_matches_rescan(evaluator, board)
+
+        evaluator.detach()
+        board.make_move(Move(6))
+        self.assertNotEqual(evaluator.score(Player.PLAYER_1), line_score(board))
+
+    def test_win_check(self):
+        board = GameBoard()
+        evaluator = LineEvaluator(board)
+        for c in "303030":
+            board.make_move(Move(int(c)))
+        self.assertFalse(evaluator.has_four(Player.PLAYER_1))
+
+        board.make_move(Move(3))
+        self.assertTrue(evaluator.has_four(Player.PLAYER_1))
+        self.assertFalse(evaluator.has_four(Player.PLAYER_2))
+
+        board.unmake_move()
+        self.assertFalse(evaluator.has_four(Player.PLAYER_1))
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,147 @@
+from concurrent.futures import ThreadPoolExecutor
+from datetime import timedelta
+from random import Random
+import time
+import unittest
+
+from engine.batch_board import NO_MOVE_BYTE
+from engine.game_board import GameBoard, GameState, NUM_COLS
+from engine.mcts_engine import (
+    MctsEngine,
+    forced_column,
+    playout_score,
+    random_columns,
+)
+from engine.random_engine import RandomEngine
+from runner.codec import Move, Params, Player
+from runner.in_process import InProcessEngine
+from runner.run_one import GameResult, run_one
+
+# A complete random game that ends in a draw.
+DRAWN_GAME = "331650114266141231434452363064260555520200"
+
+
+def board_after(moves: str) -> GameBoard:
+    board = GameBoard()
+    for c in moves:
+        board.make_move(Move(int(c)))
+    return board
+
+
+def engine_after(moves: str, ms: int = 100) -> MctsEngine:
+    return MctsEngine.make(
+        Params(
+            your_player=Player.PLAYER_1 if len(moves) % 2 == 0 else Player.PLAYER_2,
+            time_per_move=timedelta(milliseconds=ms),
+            moves=[Move(int(c)) for c in moves],
+        )
+    )
+
+
+class MctsEngineTest(unittest.TestCase):
+    def test_random_columns_are_legal(self):
+        rng = Random(0)
+        masks = bytes(range(1 << NUM_COLS)) * 50
+
+        seen = [set() for _ in range(1 << NUM_COLS)]
+        for mask, column in zip(masks, random_columns(masks, rng)):
+            if mask == 0:
+                self.assertEqual(column, NO_MOVE_BYTE)
+            else:
+                self.assertTrue(mask >> column & 1)
+                seen[mask].add(column)
+
+        # Every legal column of every mask gets picked.
+        for mask in range(1, 1 << NUM_COLS):
+            self.assertEqual(
+                seen[mask], {c for c in range(NUM_COLS) if mask >> c & 1}
+            )
+
+    def test_playout_score_is_exact_when_forced(self):
+        rng = Random(0)
+
+        # One cell left, and filling it draws.
+        self.assertEqual(playout_score(board_after(DRAWN_GAME[:-1]), 64, rng), 0.5)
+
+    def test_playout_score_matches_single_playouts(self):
+        # From the start, the batched playouts should agree with playing out
+        # GameBoards one by one, within sampling error.
+        rng = Random(1)
+        board = GameBoard()
+        num_playouts = 2000
+
+        batched = playout_score(board, num_playouts, rng)
+
+        total = 0.0
+        for _ in range(num_playouts):
+            game = GameBoard()
+            while game.state() == GameState.ONGOING:
+                game.make_move(Move(rng.choice(game.all_moves())))
+            # The first player to move is the opponent of the "last mover".
+            total += {
+                GameState.PLAYER_2_WIN: 1.0,
+                GameState.DRAW: 0.5,
+                GameState.PLAYER_1_WIN: 0.0,
+            }[game.state()]
+
+        self.assertAlmostEqual(batched, total / num_playouts, delta=0.05)
+
+    def test_forced_column(self):
+        self.assertIsNone(forced_column(board_after("")))
+        self.assertIsNone(forced_column(board_after("3030")))
+        # Winning beats blocking.
+        self.assertEqual(forced_column(board_after("303030")), 3)
+        # Player 2 must block player 1's column.
+        self.assertEqual(forced_column(board_after("03030")), 0)
+        # Player 2 has three along the bottom row.
+        self.assertEqual(forced_column(board_after("60515266")), 3)
+
+    def test_takes_immediate_win(self):
+        # Both sides have three in a column; player 1 is to move.
+        engine = engine_after("303030")
+        self.assertEqual(engine.get_move(), Move(3))
+
+    def test_blocks_immediate_loss(self):
+        # Player 2 has three along the bottom row; only column 3 stops it.
+        engine = engine_after("60515266")
+        self.assertEqual(engine.get_move(), Move(3))
+
+    def test_reports_rollouts(self):
+        engine = engine_after("")
+        engine.get_move()
+
+        self.assertGreater(engine.leaves, 0)
+        self.assertEqual(engine.rollouts % engine.playouts_per_leaf, 0)
+        self.assertGreater(engine.rollouts_per_second, 0)
+
+    def test_beats_random_engine(self):
+        mcts = InProcessEngine(MctsEngine)
+        random = InProcessEngine(RandomEngine)
+
+        self.assertEqual(
+            run_one(mcts, random, timedelta(milliseconds=100)),
+            GameResult.PLAYER_1_WIN,
+        )
+        self.assertEqual(
+            run_one(random, mcts, timedelta(milliseconds=100)),
+            GameResult.PLAYER_2_WIN,
+        )
+
+    def test_searches_on_several_threads(self):
+        # Each engine searches its own tree, so concurrent searches do not
+        # overwrite each other's nodes.
+        openings = ["", "0000", "333333", "0123456"]
+        engines = [engine_after(moves) for moves in openings]
+
+        def search(engine: MctsEngine) -> int:
+            return engine.search(time.perf_counter() + 0.2)
+
+        with ThreadPoolExecutor(len(engines)) as pool:
+            columns = list(pool.map(search, engines))
+
+        for moves, column in zip(openings, columns):
+            self.assertIn(column, board_after(moves).all_moves())
+
+
+if __name__ == "__main__":
+    unittest.main()
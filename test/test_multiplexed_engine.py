@@ -0,0 +1,113 @@
+import sys
+import unittest
+from concurrent.futures import ThreadPoolExecutor
+from datetime import timedelta
+
+import runner.codec as codec
+from runner.elo_cli import RatingAdjustmentSettings, compute_elo_multiplexed
+from runner.game_record import EndReason, GameRecord
+from runner.multiplexed_engine import MultiplexedEngine
+from runner.run_one import GameResult, run_one
+
+RANDOM_ENGINE = [sys.executable, "-m", "engine.random_engine"]
+HUNG_ENGINE = [sys.executable, "-c", "import time; time.sleep(60)"]
+
+
+class MultiplexedEngineTest(unittest.TestCase):
+    def test_interleaved_games(self):
+        engine = MultiplexedEngine(RANDOM_ENGINE)
+        try:
+            first, second = engine.channel(), engine.channel()
+            self.assertNotEqual(first.game_id, second.game_id)
+
+            # The second game has column 0 full, and player 2 to move.
+            first_params = codec.Params(
+                your_player=codec.Player.PLAYER_1,
+                time_per_move=timedelta(seconds=5),
+                moves=[],
+            )
+            second_params = codec.Params(
+                your_player=codec.Player.PLAYER_2,
+                time_per_move=timedelta(seconds=5),
+                moves=[codec.Move(0)] * 6 + [codec.Move(6)],
+            )
+            first.send_game_params(first_params)
+            second.send_game_params(second_params)
+
+            self.assertEqual(second.read_message(timedelta(seconds=5)), codec.Move(1))
+            self.assertEqual(first.read_message(timedelta(seconds=5)), codec.Move(0))
+
+            second.send_move(codec.Move(1))
+            first.send_move(codec.Move(0))
+            self.assertEqual(first.read_message(timedelta(seconds=5)), codec.Move(0))
+            self.assertEqual(second.read_message(timedelta(seconds=5)), codec.Move(1))
+        finally:
+            engine.close()
+
+    def test_concurrent_run_one(self):
+        player1 = MultiplexedEngine(RANDOM_ENGINE)
+        player2 = MultiplexedEngine(RANDOM_ENGINE)
+
+        def play(_: int) -> GameResult:
+            channel1, channel2 = player1.channel(), player2.channel()
+            try:
+                return run_one(channel1, channel2, timedelta(seconds=5))
+            finally:
+                channel1.close()
+                channel2.close()
+
+        try:
+            with ThreadPoolExecutor(max_workers=16) as pool:
+                results = list(pool.map(play, range(64)))
+        finally:
+            player1.close()
+            player2.close()
+
+        self.assertEqual(results, [GameResult.PLAYER_1_WIN] * 64)
+
+    def test_timeout_retires_game_id(self):
+        engine = MultiplexedEngine(HUNG_ENGINE)
+        try:
+            channel = engine.channel()
+            old_id = channel.game_id
+            channel.send_game_params(
+                codec.Params(
+                    your_player=codec.Player.PLAYER_1,
+                    time_per_move=timedelta(milliseconds=50),
+                    moves=[],
+                )
+            )
+            with self.assertRaises(TimeoutError):
+                channel.read_message(timedelta(milliseconds=50))
+            self.assertFalse(channel.healthy())
+
+            channel.send_game_params(
+                codec.Params(
+                    your_player=codec.Player.PLAYER_2,
+                    time_per_move=timedelta(milliseconds=50),
+                    moves=[],
+                )
+            )
+            self.assertNotEqual(channel.game_id, old_id)
+            self.assertTrue(channel.healthy())
+        finally:
+            engine.kill()
+
+    def test_compute_elo_multiplexed(self):
+        records: list[GameRecord] = []
+        ratings = compute_elo_multiplexed(
+            {0: RANDOM_ENGINE, 1: RANDOM_ENGINE},
+            RatingAdjustmentSettings(),
+            allowed_games=16,
+            jobs=4,
+            recorder=records,
+            time_per_move=timedelta(seconds=5),
+        )
+
+        self.assertEqual(len(records), 16)
+        self.assertTrue(all(r.reason == EndReason.COMPLETED for r in records))
+        self.assertEqual(ratings[0].elo, RatingAdjustmentSettings().initial_elo)
+
+
+if __name__ == "__main__":
+    unittest.main()
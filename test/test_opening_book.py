@@ -0,0 +1,75 @@
+import os
+import tempfile
+import unittest
+from datetime import timedelta
+
+from engine.alpha_beta_engine import AlphaBetaEngine
+from engine.game_board import GameBoard, mirror_key
+from engine.opening_book import OpeningBook, write_book
+from runner.codec import Move, Params, Player
+
+
+def board_after(columns: list[int]) -> GameBoard:
+    board = GameBoard()
+    for col in columns:
+        board.make_move(Move(col))
+    return board
+
+
+class OpeningBookTest(unittest.TestCase):
+    def setUp(self):
+        fd, self.path = tempfile.mkstemp(suffix=".book")
+        os.close(fd)
+
+        write_book(
+            self.path,
+            [
+                (board_after([]), Move(3)),
+                (board_after([0]), Move(1)),
+                (board_after([2, 3]), Move(5)),
+            ],
+        )
+        self.book = OpeningBook(self.path)
+
+    def tearDown(self):
+        self.book.close()
+        os.remove(self.path)
+
+    def test_lookup(self):
+        self.assertEqual(len(self.book), 3)
+        self.assertEqual(self.book.lookup(board_after([])), Move(3))
+        self.assertEqual(self.book.lookup(board_after([0])), Move(1))
+        self.assertEqual(self.book.lookup(board_after([2, 3])), Move(5))
+        self.assertIsNone(self.book.lookup(board_after([3])))
+
+    def test_mirrored_lookup(self):
+        self.assertEqual(self.book.lookup(board_after([6])), Move(5))
+        self.assertEqual(self.book.lookup(board_after([4, 3])), Move(1))
+
+    def test_mirror_key(self):
+        board = board_after([0, 1, 1, 5])
+        mirrored = board_after([6, 5, 5, 1])
+
+        self.assertEqual(mirror_key(board.position_key()), mirrored.position_key())
+        self.assertEqual(
+            mirror_key(mirror_key(board.position_key())), board.position_key()
+        )
+
+    def test_engine_consults_book(self):
+        engine = AlphaBetaEngine.make(
+            Params(
+                your_player=Player.PLAYER_2,
+                time_per_move=timedelta(milliseconds=100),
+                moves=[Move(6)],
+            )
+        )
+
+        AlphaBetaEngine.opening_book = self.book
+        try:
+            self.assertEqual(engine.get_move(), Move(5))
+        finally:
+            AlphaBetaEngine.opening_book = None
+
+
+if __name__ == "__main__":
+    unittest.main()
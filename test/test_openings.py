@@ -0,0 +1,119 @@
+import os
+import sys
+import tempfile
+import unittest
+from datetime import timedelta
+
+import runner.codec as codec
+from engine.game_board import GameState, mirror_key
+from runner.elo_cli import match_opening
+from runner.engine_container import EngineContainer
+from runner.game_record import EndReason, GameRecord
+from runner.openings import (
+    format_opening,
+    generate_openings,
+    load_openings,
+    parse_opening,
+    replay,
+    write_openings,
+)
+from runner.run_one import run_one
+
+RANDOM_ENGINE = [sys.executable, "-m", "engine.random_engine"]
+
+
+class OpeningsTest(unittest.TestCase):
+    def test_parse_and_format(self):
+        self.assertEqual(parse_opening("3323"), (3, 3, 2, 3))
+        self.assertEqual(format_opening((3, 3, 2, 3)), "3323")
+        self.assertEqual(parse_opening(""), ())
+
+        with self.assertRaises(ValueError):
+            parse_opening("37")
+        with self.assertRaises(ValueError):
+            parse_opening("3a")
+
+    def test_replay_rejects_bad_openings(self):
+        self.assertEqual(replay((3, 3, 2)).num_moves(), 3)
+
+        with self.assertRaises(ValueError):
+            replay((0,) * 7)
+        with self.assertRaises(ValueError):
+            replay((0, 1, 0, 1, 0, 1, 0))
+
+    def test_load_openings(self):
+        fd, path = tempfile.mkstemp(suffix=".txt")
+        os.close(fd)
+        try:
+            with open(path, "w") as f:
+                f.write("# suite\n33\n\n  2 \n")
+            self.assertEqual(load_openings(path), [(3, 3), (2,)])
+
+            write_openings(path, [(3, 3), ()])
+            with open(path, "a") as f:
+                f.write("0000000\n")
+            with self.assertRaisesRegex(ValueError, ":3:"):
+                load_openings(path)
+        finally:
+            os.remove(path)
+
+    def test_generated_openings_are_distinct_and_quiet(self):
+        openings = generate_openings(4)
+
+        keys = set()
+        for opening in openings:
+            board = replay(opening)
+            self.assertEqual(board.num_moves(), 4)
+            key = board.position_key()
+            keys.add(min(key, mirror_key(key)))
+
+            for col in board.all_moves():
+                board.make_move(codec.Move(col))
+                self.assertEqual(board.state(), GameState.ONGOING)
+                board.unmake_move()
+
+        self.assertEqual(len(keys), len(openings))
+
+    def test_sampling_is_reproducible(self):
+        sample = generate_openings(4, count=10)
+        self.assertEqual(len(sample), 10)
+        self.assertEqual(sample, generate_openings(4, count=10))
+        self.assertTrue(set(sample) <= set(generate_openings(4)))
+
+    def test_match_opening_cycles(self):
+        openings = [(3,), (2,), (4,)]
+        self.assertEqual(
+            [match_opening(openings, i) for i in range(5)],
+            [(3,), (2,), (4,), (3,), (2,)],
+        )
+        self.assertEqual(match_opening([], 7), ())
+
+
+class RunOneOpeningTest(unittest.TestCase):
+    def test_engines_start_from_the_opening(self):
+        # After an odd-length opening player 2 moves first.
+        for opening in [(3, 3), (3,)]:
+            player1 = EngineContainer(RANDOM_ENGINE)
+            player2 = EngineContainer(RANDOM_ENGINE)
+            records: list[GameRecord] = []
+            try:
+                run_one(
+                    player1,
+                    player2,
+                    timedelta(seconds=5),
+                    recorder=records,
+                    opening=opening,
+                )
+            finally:
+                player1.close()
+                player2.close()
+
+            (record,) = records
+            self.assertEqual(record.reason, EndReason.COMPLETED)
+            self.assertEqual(record.opening_length, len(opening))
+            self.assertEqual(tuple(record.moves[: len(opening)]), opening)
+            self.assertEqual(record.think_times_us[: len(opening)], [0] * len(opening))
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,64 @@
+import math
+import unittest
+from random import Random
+
+from engine.game_board import GameState
+from runner.rating_fit import ResultTable, fit_bradley_terry
+
+
+class RatingFitTest(unittest.TestCase):
+    def test_two_player_closed_form(self):
+        table = ResultTable()
+        for _ in range(30):
+            table.add_game(0, 1, GameState.PLAYER_1_WIN)
+        for _ in range(10):
+            table.add_game(1, 0, GameState.PLAYER_1_WIN)
+        for _ in range(20):
+            table.add_game(0, 1, GameState.DRAW)
+
+        ratings = fit_bradley_terry(table, prior_draws=0)
+
+        # Scores of 40 and 20 out of 60: the ML strength ratio is 2.
+        self.assertAlmostEqual(
+            ratings[0].elo - ratings[1].elo, 400 * math.log10(2), places=6
+        )
+        self.assertAlmostEqual(ratings[0].elo + ratings[1].elo, 3000, places=6)
+
+    def test_recovers_true_ratings(self):
+        true_elo = {0: 0, 1: 100, 2: 250, 3: -200}
+        rng = Random(0)
+
+        table = ResultTable()
+        for _ in range(6000):
+            a, b = rng.sample(sorted(true_elo), 2)
+            p = 1 / (1 + 10 ** ((true_elo[b] - true_elo[a]) / 400))
+            won = rng.random() < p
+            result = GameState.PLAYER_1_WIN if won else GameState.PLAYER_2_WIN
+            table.add_game(a, b, result)
+
+        ratings = fit_bradley_terry(table, initial_elo=0, prior_draws=0)
+        offset = sum(true_elo.values()) / len(true_elo)
+
+        for engine_id, elo in true_elo.items():
+            fitted = ratings[engine_id]
+            self.assertLess(fitted.lower, elo - offset)
+            self.assertGreater(fitted.upper, elo - offset)
+            self.assertLess(fitted.upper - fitted.lower, 60)
+
+    def test_clean_sweep_stays_finite(self):
+        table = ResultTable()
+        for _ in range(10):
+            table.add_game(0, 1, GameState.PLAYER_1_WIN)
+            table.add_game(1, 0, GameState.PLAYER_2_WIN)
+
+        ratings = fit_bradley_terry(table)
+
+        self.assertTrue(math.isfinite(ratings[0].elo))
+        self.assertGreater(ratings[0].elo, ratings[1].elo)
+
+    def test_empty_table(self):
+        self.assertEqual(fit_bradley_terry(ResultTable()), {})
+
+
+if __name__ == "__main__":
+    unittest.main()
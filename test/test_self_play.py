@@ -0,0 +1,182 @@
+import glob
+import os
+import tempfile
+import unittest
+from array import array
+from random import Random
+
+from engine.game_board import GameBoard, GameState, Player
+from engine.random_engine import RandomEngine
+from engine.self_play import (
+    SHARD_GLOB,
+    GameSamples,
+    SelfPlaySettings,
+    ShardWriter,
+    generate,
+    play_game,
+)
+from engine.training_data import (
+    SIDE_CODES,
+    KeySet,
+    Sample,
+    Shard,
+    dedup_key,
+    position_bitboards,
+    read_shard,
+    write_shard,
+)
+from runner.codec import Move
+
+RANDOM_ENGINE = "py:engine.random_engine:RandomEngine"
+
+
+def random_board(rng: Random, max_moves: int = 42) -> GameBoard:
+    board = GameBoard()
+    while board.state() == GameState.ONGOING and board.num_moves() < max_moves:
+        board.make_move(Move(rng.choice(board.all_moves())))
+    return board
+
+
+def read_all(directory: str) -> list[Shard]:
+    paths = sorted(glob.glob(os.path.join(directory, SHARD_GLOB)))
+    return [read_shard(path) for path in paths]
+
+
+class TrainingDataTest(unittest.TestCase):
+    def test_shard_round_trip(self):
+        shard = Shard()
+        rng = Random(0)
+        for _ in range(500):
+            board = random_board(rng, rng.randrange(30))
+            shard.append(
+                Sample(
+                    position=board.position_key(),
+                    side_to_move=board.side_to_move(),
+                    result=rng.choice(list(GameState)),
+                    move=rng.randrange(7),
+                )
+            )
+
+        with tempfile.TemporaryDirectory() as directory:
+            path = os.path.join(directory, "shard")
+            write_shard(path, shard)
+            self.assertEqual(read_shard(path), shard)
+            self.assertEqual(os.listdir(directory), ["shard"])
+
+            with open(path, "r+b") as f:
+                f.write(b"XXXX")
+            with self.assertRaises(ValueError):
+                read_shard(path)
+
+    def test_position_bitboards(self):
+        rng = Random(1)
+        for _ in range(200):
+            board = random_board(rng, rng.randrange(43))
+            self.assertEqual(
+                position_bitboards(board.position_key()),
+                (board.bitboard(Player.PLAYER_1), board.bitboard(Player.PLAYER_2)),
+            )
+
+    def test_key_set(self):
+        rng = Random(2)
+        keys = KeySet(capacity=16)
+        expected: set[int] = set()
+
+        for _ in range(5000):
+            key = rng.randrange(1, 1 << 12)
+            self.assertEqual(keys.add(key), key not in expected)
+            expected.add(key)
+
+        self.assertEqual(len(keys), len(expected))
+        for key in range(1, 1 << 12):
+            self.assertEqual(key in keys, key in expected)
+
+
+class SelfPlayTest(unittest.TestCase):
+    def test_play_game(self):
+        rng = Random(3)
+        settings = SelfPlaySettings(engine=RANDOM_ENGINE, explore=0.3)
+
+        for _ in range(20):
+            positions, sides, moves, result = play_game(RandomEngine, settings, rng)
+            self.assertEqual(len(positions), 8 * len(sides))
+            self.assertEqual(len(sides), len(moves))
+            self.assertNotEqual(result, GameState.ONGOING.value)
+
+    def test_resume_fills_short_shard(self):
+        rng = Random(5)
+        boards = [random_board(rng, rng.randrange(30)) for _ in range(8)]
+        keys = {dedup_key(board.position_key()): board for board in boards}
+        boards = list(keys.values())[:7]
+
+        def game(games: list[GameBoard]) -> GameSamples:
+            positions = array("Q", [board.position_key() for board in games])
+            sides = bytes(SIDE_CODES[board.side_to_move()] for board in games)
+            return positions.tobytes(), sides, bytes(len(games)), 1
+
+        with tempfile.TemporaryDirectory() as directory:
+            writer = ShardWriter(directory, shard_size=3)
+            writer.add_game(game(boards[:5]))
+            writer.close()
+            self.assertEqual([len(s) for s in read_all(directory)], [3, 2])
+
+            writer = ShardWriter(directory, shard_size=3)
+            self.assertEqual((writer.shards, writer.positions), (1, 5))
+            writer.add_game(game(boards[5:]))
+            writer.close()
+
+            shards = read_all(directory)
+            self.assertEqual([len(s) for s in shards], [3, 3, 1])
+            self.assertEqual(
+                [p for shard in shards for p in shard.positions],
+                [board.position_key() for board in boards],
+            )
+
+    def test_generate_and_resume(self):
+        settings = SelfPlaySettings(engine=RANDOM_ENGINE, explore=0.3)
+
+        with tempfile.TemporaryDirectory() as directory:
+            writer = generate(
+                directory,
+                settings,
+                target_positions=500,
+                jobs=2,
+                shard_size=100,
+                seed=4,
+                report_interval=1e9,
+            )
+            first = read_all(directory)
+            self.assertGreaterEqual(writer.positions, 500)
+            self.assertEqual(sum(len(s) for s in first), writer.positions)
+            self.assertTrue(all(len(s) == 100 for s in first[:-1]))
+
+            writer = generate(
+                directory,
+                settings,
+                target_positions=800,
+                jobs=2,
+                shard_size=100,
+                seed=4,
+                report_interval=1e9,
+            )
+            shards = read_all(directory)
+            self.assertEqual(shards[: len(first) - 1], first[:-1])
+            self.assertGreaterEqual(sum(len(s) for s in shards), 800)
+            self.assertTrue(all(len(s) == 100 for s in shards[:-1]))
+
+        keys = [dedup_key(p) for shard in shards for p in shard.positions]
+        self.assertEqual(len(keys), len(set(keys)))
+
+        for shard in shards:
+            for sample in shard.samples():
+                player1, player2 = position_bitboards(sample.position)
+                # Player 1 moves first, so is to move with equal piece counts.
+                self.assertEqual(
+                    sample.side_to_move == Player.PLAYER_1,
+                    player1.bit_count() == player2.bit_count(),
+                )
+                self.assertNotEqual(sample.result, GameState.ONGOING)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,135 @@
+import os
+import tempfile
+import unittest
+
+from engine.game_board import GameBoard, GameState, NUM_CELLS
+from engine.solved_store import SolvedStore
+from engine.solver import Solver
+from runner.codec import Move
+
+
+def board_after(columns: str) -> GameBoard:
+    board = GameBoard()
+    for c in columns:
+        board.make_move(Move(int(c)))
+    return board
+
+
+def minimax(board: GameBoard) -> int:
+    """Score by exhaustive search, for checking the solver on small trees."""
+    best = -NUM_CELLS
+    for col in board.all_moves():
+        board.make_move(Move(col))
+        if board.state() == GameState.DRAW:
+            score = 0
+        elif board.state() != GameState.ONGOING:
+            score = (NUM_CELLS + 2 - board.num_moves()) // 2
+        else:
+            score = -minimax(board)
+        board.unmake_move()
+        best = max(best, score)
+    return best
+
+
+# Late positions and their scores for the side to move.
+POSITIONS = [
+    ("1141465142351133000452254232560240330", -1),
+    ("6311230624536630055022462362131455", 1),
+    ("12052305013656112043356360161305644522", 0),
+    ("54103562445044620455205216262110306", -1),
+]
+
+
+class SolverTest(unittest.TestCase):
+    def test_known_scores(self):
+        solver = Solver(tt_bytes=1 << 20)
+        for moves, score in POSITIONS:
+            self.assertEqual(solver.solve(board_after(moves)), score, moves)
+
+    def test_matches_minimax(self):
+        solver = Solver(tt_bytes=1 << 20)
+        for moves, _ in POSITIONS:
+            board = board_after(moves)
+            self.assertEqual(solver.solve(board), minimax(board), moves)
+
+    def test_analyze(self):
+        solver = Solver(tt_bytes=1 << 20)
+        board = board_after(POSITIONS[1][0])
+        scores = solver.analyze(board)
+
+        self.assertEqual(len(scores), 7)
+        self.assertEqual(max(s for s in scores if s is not None), 1)
+        best = solver.best_move(board)
+        self.assertEqual(scores[best], 1)
+
+        board.make_move(Move(best))
+        self.assertEqual(solver.solve(board), -1)
+
+    def test_immediate_win(self):
+        solver = Solver(tt_bytes=1 << 20)
+        board = board_after("001122")
+
+        self.assertEqual(solver.solve(board), (NUM_CELLS + 1 - 6) // 2)
+        self.assertEqual(solver.nodes, 0)
+
+    def test_finished_game(self):
+        with self.assertRaises(ValueError):
+            Solver(tt_bytes=1 << 20).solve(board_after("0101010"))
+
+
+class SolvedStoreTest(unittest.TestCase):
+    def setUp(self):
+        fd, self.path = tempfile.mkstemp(suffix=".solved")
+        os.close(fd)
+        os.remove(self.path)
+
+    def tearDown(self):
+        os.remove(self.path)
+
+    def test_put_and_get(self):
+        with SolvedStore(self.path) as store:
+            self.assertIsNone(store.get(42))
+            store.put(42, -7)
+            store.put(43, 0)
+            store.put(42, 5)
+
+            self.assertEqual(len(store), 2)
+            self.assertEqual(store.get(42), 5)
+            self.assertEqual(store.get(43), 0)
+
+    def test_persists_and_grows(self):
+        with SolvedStore(self.path) as store:
+            for key in range(1, 100_000):
+                store.put(key, key % 43 - 21)
+
+        with SolvedStore(self.path) as store:
+            self.assertEqual(len(store), 99_999)
+            self.assertEqual(store.get(1), -20)
+            self.assertEqual(store.get(99_999), 99_999 % 43 - 21)
+            self.assertIsNone(store.get(100_000))
+
+    def test_solver_reuses_store(self):
+        moves, score = POSITIONS[0]
+        with SolvedStore(self.path) as store:
+            solver = Solver(store, tt_bytes=1 << 20)
+            self.assertEqual(solver.solve(board_after(moves)), score)
+
+        with SolvedStore(self.path) as store:
+            solver = Solver(store, tt_bytes=1 << 20)
+            self.assertEqual(solver.solve(board_after(moves)), score)
+            self.assertEqual(solver.nodes, 0)
+
+    def test_mirror_shares_entry(self):
+        moves, score = POSITIONS[0]
+        mirrored = "".join(str(6 - int(c)) for c in moves)
+        with SolvedStore(self.path) as store:
+            solver = Solver(store, tt_bytes=1 << 20)
+            solver.solve(board_after(moves))
+            solver.nodes = 0
+
+            self.assertEqual(solver.solve(board_after(mirrored)), score)
+            self.assertEqual(solver.nodes, 0)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,92 @@
+import math
+import sys
+import unittest
+from datetime import timedelta
+from unittest import mock
+
+from runner.elo_cli import MatchResult, run_match
+from runner.engine_pool import EnginePool
+from runner.sprt import (
+    SprtOutcome,
+    SprtSettings,
+    expected_score,
+    log_likelihood_ratio,
+    sprt,
+)
+
+
+class SprtStatisticsTest(unittest.TestCase):
+    def test_bounds(self):
+        settings = SprtSettings(alpha=0.05, beta=0.1)
+        self.assertAlmostEqual(settings.lower_bound(), math.log(0.1 / 0.95))
+        self.assertAlmostEqual(settings.upper_bound(), math.log(0.9 / 0.05))
+
+    def test_expected_score(self):
+        self.assertEqual(expected_score(0), 0.5)
+        self.assertAlmostEqual(expected_score(400), 10 / 11)
+
+    def test_llr_sign(self):
+        strong = log_likelihood_ratio(MatchResult(60, 40, 100), 0, 10)
+        weak = log_likelihood_ratio(MatchResult(40, 60, 100), 0, 10)
+        self.assertGreater(strong, 0)
+        self.assertLess(weak, 0)
+
+    def test_llr_grows_with_evidence(self):
+        few = log_likelihood_ratio(MatchResult(6, 4, 10), 0, 10)
+        many = log_likelihood_ratio(MatchResult(600, 400, 1000), 0, 10)
+        self.assertGreater(many, few)
+
+
+class SprtLoopTest(unittest.TestCase):
+    def run_sprt(self, pair: MatchResult, settings: SprtSettings):
+        with mock.patch("runner.sprt.run_match", return_value=pair) as run_match:
+            result = sprt(mock.sentinel.candidate, mock.sentinel.baseline, settings)
+        return result, run_match
+
+    def test_accepts_stronger_candidate(self):
+        result, run_match = self.run_sprt(MatchResult(wins=2), SprtSettings())
+
+        self.assertEqual(result.outcome, SprtOutcome.ACCEPT)
+        self.assertEqual(result.totals.losses, 0)
+        self.assertGreaterEqual(result.llr, result.upper_bound)
+        # Early stopping: far fewer than max_games.
+        self.assertLess(result.games(), 100)
+        self.assertEqual(
+            run_match.call_args.args[:2],
+            (mock.sentinel.candidate, mock.sentinel.baseline),
+        )
+
+    def test_rejects_weaker_candidate(self):
+        result, _ = self.run_sprt(MatchResult(losses=2), SprtSettings())
+
+        self.assertEqual(result.outcome, SprtOutcome.REJECT)
+        self.assertLessEqual(result.llr, result.lower_bound)
+
+    def test_inconclusive_at_max_games(self):
+        result, run_match = self.run_sprt(
+            MatchResult(wins=1, losses=1), SprtSettings(max_games=40)
+        )
+
+        self.assertEqual(result.outcome, SprtOutcome.INCONCLUSIVE)
+        self.assertEqual(result.games(), 40)
+        self.assertEqual(run_match.call_count, 20)
+
+
+class RunMatchPerspectiveTest(unittest.TestCase):
+    def test_result_is_from_first_players_view(self):
+        # An engine that never replies forfeits both games.
+        working = [sys.executable, "-m", "engine.random_engine"]
+        hung = [sys.executable, "-c", "import time; time.sleep(60)"]
+
+        with EnginePool() as pool:
+            result = run_match(
+                pool.engine(working),
+                pool.engine(hung),
+                time_per_move=timedelta(milliseconds=500),
+            )
+
+        self.assertEqual(result, MatchResult(wins=2))
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,122 @@
+import mmap
+import sys
+import unittest
+from datetime import timedelta
+
+import runner.codec as codec
+from runner.engine_container import EngineContainer
+from runner.engine_pool import EnginePool
+from runner.multiplexed_engine import MultiplexedEngine
+from runner.run_one import GameResult, run_one
+from runner.transport import RING_CAPACITY, RING_SIZE, TRANSPORTS, _Ring, spawn
+
+RANDOM_ENGINE = [sys.executable, "-m", "engine.random_engine"]
+HUNG_ENGINE = [sys.executable, "-c", "import time; time.sleep(60)"]
+CRASHING_ENGINE = [sys.executable, "-c", "pass"]
+
+
+class RingTest(unittest.TestCase):
+    def test_wraps_around(self):
+        ring = _Ring(mmap.mmap(-1, RING_SIZE), 0)
+        # Writes that do not divide the capacity straddle the end eventually.
+        message = bytes(range(251))
+
+        for _ in range(3 * RING_CAPACITY // len(message)):
+            self.assertTrue(ring.has_room(len(message)))
+            ring.write(message)
+            self.assertEqual(ring.read(), message)
+
+        self.assertIsNone(ring.read())
+
+    def test_fills_up(self):
+        ring = _Ring(mmap.mmap(-1, RING_SIZE), 0)
+
+        ring.write(bytes(RING_CAPACITY - 1))
+        self.assertFalse(ring.has_room(2))
+        self.assertEqual(len(ring.read() or b""), RING_CAPACITY - 1)
+        self.assertTrue(ring.has_room(RING_CAPACITY))
+
+    def test_close_after_data(self):
+        ring = _Ring(mmap.mmap(-1, RING_SIZE), 0)
+
+        ring.write(b"last words")
+        ring.mark_closed()
+        self.assertEqual(ring.read(), b"last words")
+        self.assertEqual(ring.read(), b"")
+
+
+class TransportTest(unittest.TestCase):
+    def test_games_over_every_transport(self):
+        for transport in TRANSPORTS:
+            with self.subTest(transport=transport):
+                player1 = EngineContainer(RANDOM_ENGINE, transport)
+                player2 = EngineContainer(RANDOM_ENGINE, transport)
+                try:
+                    for _ in range(3):
+                        self.assertEqual(
+                            run_one(player1, player2, timedelta(seconds=5)),
+                            GameResult.PLAYER_1_WIN,
+                        )
+                finally:
+                    player1.close()
+                    player2.close()
+
+    def test_engine_exits_when_closed(self):
+        for transport in TRANSPORTS:
+            with self.subTest(transport=transport):
+                process, connection = spawn(RANDOM_ENGINE, transport)
+                connection.close()
+                self.assertEqual(process.wait(timeout=5), 0)
+
+    def test_exited_engine(self):
+        for transport in TRANSPORTS:
+            with self.subTest(transport=transport):
+                engine = EngineContainer(CRASHING_ENGINE, transport)
+                try:
+                    with self.assertRaises(EOFError):
+                        engine.read_message(timedelta(seconds=5))
+                finally:
+                    engine.close()
+
+    def test_hung_engine(self):
+        for transport in TRANSPORTS:
+            with self.subTest(transport=transport):
+                engine = EngineContainer(HUNG_ENGINE, transport)
+                try:
+                    with self.assertRaises(TimeoutError):
+                        engine.read_message(timedelta(milliseconds=100))
+                    self.assertFalse(engine.healthy())
+                finally:
+                    engine.kill()
+
+    def test_multiplexed_over_shared_memory(self):
+        engine = MultiplexedEngine(RANDOM_ENGINE, "shm")
+        try:
+            channel = engine.channel()
+            channel.send_game_params(
+                codec.Params(
+                    your_player=codec.Player.PLAYER_1,
+                    time_per_move=timedelta(seconds=5),
+                    moves=[],
+                )
+            )
+            self.assertEqual(
+                channel.read_message(timedelta(seconds=5)), codec.Move(0)
+            )
+        finally:
+            engine.close()
+
+    def test_pool_replaces_hung_engine(self):
+        with EnginePool(transport="unix") as pool:
+            hung = pool.engine(HUNG_ENGINE)
+            opponent = pool.engine(RANDOM_ENGINE)
+
+            result = run_one(hung, opponent, timedelta(milliseconds=200))
+            self.assertEqual(result, GameResult.PLAYER_2_WIN)
+
+            run_one(hung, opponent, timedelta(milliseconds=200))
+            self.assertEqual(hung.respawns, 1)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,67 @@
+from engine.transposition_table import Bound, NO_MOVE, TranspositionTable
+import unittest
+
+
+class TranspositionTableTest(unittest.TestCase):
+    def test_store_and_probe(self):
+        tt = TranspositionTable(max_bytes=1 << 12)
+
+        self.assertIsNone(tt.probe(1234))
+
+        tt.store(1234, depth=5, score=-7, bound=Bound.LOWER, move=3)
+        entry = tt.probe(1234)
+
+        assert entry is not None
+        self.assertEqual(entry.depth, 5)
+        self.assertEqual(entry.score, -7)
+        self.assertEqual(entry.bound, Bound.LOWER)
+        self.assertEqual(entry.move, 3)
+
+    def test_memory_cap(self):
+        tt = TranspositionTable(max_bytes=1000)
+
+        self.assertLessEqual(tt.size_bytes(), 1000)
+        self.assertEqual(len(tt) & (len(tt) - 1), 0)
+
+    def test_depth_preferred_replacement(self):
+        tt = TranspositionTable(max_bytes=1 << 12)
+        colliding = 7 + len(tt)
+
+        tt.store(7, depth=8, score=1, bound=Bound.EXACT, move=2)
+        tt.store(colliding, depth=3, score=2, bound=Bound.EXACT, move=4)
+
+        self.assertIsNotNone(tt.probe(7))
+        self.assertIsNone(tt.probe(colliding))
+
+        tt.store(colliding, depth=9, score=2, bound=Bound.EXACT, move=4)
+
+        self.assertIsNone(tt.probe(7))
+        self.assertIsNotNone(tt.probe(colliding))
+
+    def test_stale_generation_is_replaced(self):
+        tt = TranspositionTable(max_bytes=1 << 12)
+        colliding = 7 + len(tt)
+
+        tt.store(7, depth=8, score=1, bound=Bound.EXACT, move=2)
+        tt.new_search()
+        tt.store(colliding, depth=1, score=2, bound=Bound.UPPER)
+
+        entry = tt.probe(colliding)
+        assert entry is not None
+        self.assertEqual(entry.move, NO_MOVE)
+        self.assertIsNone(tt.probe(7))
+
+    def test_same_key_keeps_best_move(self):
+        tt = TranspositionTable(max_bytes=1 << 12)
+
+        tt.store(7, depth=8, score=1, bound=Bound.EXACT, move=2)
+        tt.store(7, depth=2, score=0, bound=Bound.UPPER)
+
+        entry = tt.probe(7)
+        assert entry is not None
+        self.assertEqual(entry.depth, 2)
+        self.assertEqual(entry.move, 2)
+
+
+if __name__ == "__main__":
+    unittest.main()